@@ -0,0 +1,74 @@
+"""
+Search a position with the engine on one or more processes.
+
+With --speedup, the same fixed-depth search is repeated with 1, 2, 4, ... up to --workers
+processes and the time-to-depth speedup against a single process is reported.
+Only the logic package is imported, so this runs without pygame or a display.
+
+Usage (from the pychess directory):
+    python analyse.py --fen "<FEN>" --time 5 --workers 8
+    python analyse.py --depth 5 --workers 32 --speedup --json
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from logic.chess_logic import ChessLogic
+from logic.fen import STARTING_FEN
+from logic.instrumentation import setup_from_environment
+from logic.parallel_search import ParallelSearcher, measure_speedup
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Analyse a position with the ChessLogic search engine")
+    parser.add_argument("--fen", default=STARTING_FEN, help="position to search (default: starting position)")
+    parser.add_argument("--depth", type=int, help="search depth (default: 4 without --time)")
+    parser.add_argument("--time", type=float, help="time budget in seconds")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: one per CPU)")
+    parser.add_argument("--table-entries", type=int, default=1 << 20,
+                        help="shared transposition table size (default: 1048576)")
+    parser.add_argument("--backend", default="bitboard", help="ChessLogic position backend (default: bitboard)")
+    parser.add_argument("--speedup", action="store_true",
+                        help="compare fixed-depth search times for 1, 2, 4, ... workers")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+    setup_from_environment()
+
+    try:
+        logic = ChessLogic.from_fen(args.fen, args.backend)
+    except ValueError as error:
+        parser.error(str(error))
+    workers = args.workers or os.cpu_count() or 1
+
+    if args.speedup:
+        counts = [1]
+        while counts[-1] * 2 < workers:
+            counts.append(counts[-1] * 2)
+        if workers > 1:
+            counts.append(workers)
+        reports = measure_speedup(logic, args.depth or 4, counts, args.backend, args.table_entries)
+        if args.json:
+            print(json.dumps(reports, indent=2))
+        else:
+            print(f"{'workers':>8}{'seconds':>10}{'nodes':>12}{'nodes/s':>12}{'speedup':>9}  best")
+            for report in reports:
+                print(f"{report['workers']:>8}{report['seconds']:>10.3f}{report['nodes']:>12}{report['nps']:>12}"
+                      f"{report['speedup']:>9.2f}  {report['best_move']} ({report['score']})")
+        return 0
+
+    with ParallelSearcher(workers, args.table_entries, args.backend) as searcher:
+        result = searcher.search(logic, args.depth, args.time)
+    report = {"best_move": result.best_move, "pv": result.pv, "score": result.score, "depth": result.depth,
+              "nodes": result.nodes, "seconds": round(result.seconds, 4), "workers": workers}
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"best {result.best_move}  score {result.score}  depth {result.depth}  nodes {result.nodes}  "
+              f"{result.seconds:.3f}s  pv {' '.join(result.pv)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
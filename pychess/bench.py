@@ -0,0 +1,431 @@
+"""
+Microbenchmarks for the ChessLogic rules engine and the board renderer, with baselines.
+
+Every metric is a cost, so lower is better:
+
+    play_move_us          play_move per ply, replaying recorded games from the starting position
+    is_checkmate_us       is_checkmate for both colours of crowded middlegame positions and of
+                          positions with a side in check (some of them mate)
+    is_stalemate_us       is_stalemate for the same positions
+    construct_us          ChessLogic() for a new game
+    from_fen_us           ChessLogic.from_fen of the middlegame positions
+    memory_new_game_b     Bytes allocated per new ChessLogic instance
+    memory_played_game_b  Bytes allocated per ChessLogic instance after replaying a recorded game
+    draw_full_ms          Board.draw repainting the whole board
+    draw_move_ms          Board.draw after a move (only the changed squares)
+
+Timings are the best of many short repeats, which is the least noisy statistic on a busy machine.
+The is_checkmate and is_stalemate calls get freshly built games every time, so no cached
+state from an earlier call is timed.
+Board.draw renders off-screen with SDL's dummy video driver; pygame is imported for those
+metrics only and they are skipped with --no-render or when pygame is missing.
+
+--save writes the results as a baseline; --compare reads one and exits with status 1 when a
+metric is more than --threshold percent (per metric: --metric-threshold NAME=PERCENT) above it
+and the rise is also more than --noise-floor microseconds. The floor keeps the percentage of
+metrics of a few microseconds, where jitter alone moves them by tens of percent, from failing
+the comparison on unchanged code.
+
+Usage (from the pychess directory):
+    python bench.py --save baseline.json
+    python bench.py --compare baseline.json --threshold 15
+    python bench.py --games games.txt --backend list --json
+"""
+
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+from logic.chess_logic import ChessLogic
+from logic.instrumentation import setup_from_environment
+from logic.move_encoding import to_coordinate_move
+from replay import read_games
+
+"""
+Crowded middlegame positions: most pieces still on the board, pins, checks and open lines
+"""
+MIDDLEGAME_POSITIONS = [
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+    "r1bq1rk1/pp2bppp/2n1pn2/2pp4/2PP4/2N1PN2/PP2BPPP/R1BQ1RK1 w - - 0 8",
+    "r2q1rk1/1b1nbppp/pp1ppn2/8/2PNP3/2N1BP2/PP1QB1PP/R4RK1 b - - 2 11",
+    "2rq1rk1/pb1nbppp/1p2pn2/2pp4/2PP4/1PN1PN2/PB1QBPPP/2R2RK1 w - - 0 12",
+]
+
+"""
+Positions with the side to move in check, so is_checkmate has to look for an escape: three mates,
+a check that can be blocked or answered by a king move, and one where only the king can move
+"""
+CHECK_POSITIONS = [
+    "rnb1kbnr/pppp1ppp/8/4p3/6Pq/5P2/PPPPP2P/RNBQKBNR w KQkq - 1 3",
+    "r1bqkb1r/pppp1Qpp/2n2n2/4p3/2B1P3/8/PPPP1PPP/RNB1K1NR b KQkq - 0 4",
+    "6rk/5Npp/8/8/8/8/5PPP/6K1 b - - 0 1",
+    "rnbqkbnr/ppp2ppp/3p4/1B2p3/4P3/8/PPPP1PPP/RNBQK1NR b KQkq - 1 3",
+    "rnbqk1nr/pppp1ppp/8/4p3/1b1P4/8/PPP1PPPP/RNBQKBNR w KQkq - 1 3",
+    "r1bqk2r/pppp1Bpp/2n2n2/2b1p3/4P3/5N2/PPPP1PPP/RNBQK2R b KQkq - 0 4",
+]
+
+GENERATED_GAMES = 20
+GENERATED_PLIES = 80
+SEED = 2024
+
+MIN_REPEAT_SECONDS = 0.01  # Fast benchmarks loop until a repeat takes this long, so timer resolution does not dominate
+REPEATS = 50
+MIN_ROUNDS_SECONDS = 3.0  # Repeats continue past REPEATS until the rounds span this long, to outlast slow spells
+NOISE_FLOOR_US = 2.0  # Rises of a timing below this many microseconds never count as a regression
+
+# Unit suffix of a metric name -> microseconds per unit (memory metrics have no noise floor)
+_MICROSECONDS = {"_us": 1.0, "_ms": 1000.0}
+
+METRICS = ("play_move_us", "is_checkmate_us", "is_stalemate_us", "construct_us", "from_fen_us",
+           "memory_new_game_b", "memory_played_game_b", "draw_full_ms", "draw_move_ms")
+
+
+def generate_games(count: int = GENERATED_GAMES, plies: int = GENERATED_PLIES, seed: int = SEED) -> list[list[str]]:
+    """
+    Record reproducible games of random legal moves, the default input when no games file is given
+
+    Args:
+        count (int): Number of games
+        plies (int): Longest game, shorter if it ends before
+        seed (int): Random seed, the same seed always records the same games
+
+    Returns:
+        list[list[str]]: Moves of each game in play_move notation
+    """
+    generator = random.Random(seed)
+    games = []
+    for _ in range(count):
+        logic = ChessLogic("bitboard")
+        moves = []
+        for _ in range(plies):
+            legal = logic.generate_legal_moves()
+            if not legal or logic.result != "":
+                break
+            move = generator.choice(sorted(legal))
+            moves.append(logic.move_to_notation(move))
+            logic.play_legal_move(move)
+        games.append(moves)
+    return games
+
+
+def load_games(path: str) -> list[list[str]]:
+    """
+    Moves of the games in a move-list file (replay.py format) that start from the starting position
+
+    Castling tokens are expanded and illegal tails dropped, so every returned move plays.
+    """
+    games = []
+    with open(path) as source:
+        for _, fen, tokens, _ in read_games(source):
+            if fen is not None:
+                continue
+            logic = ChessLogic("bitboard")
+            moves = []
+            for token in tokens:
+                move = to_coordinate_move(token, logic.turn)
+                if logic.play_move(move) == "":
+                    break
+                moves.append(move)
+            games.append(moves)
+    return games
+
+
+def best_times(benchmarks: dict, repeats: int) -> dict[str, float]:
+    """
+    Seconds per call of every benchmark: the fastest of several repeats, each looping over enough
+    calls to last MIN_REPEAT_SECONDS, with the garbage collector paused
+
+    The repeats are interleaved (one of every benchmark per round), so a slow spell of the machine
+    costs each benchmark one repeat rather than all repeats of one benchmark, and rounds continue
+    until they span at least MIN_ROUNDS_SECONDS.
+
+    Args:
+        benchmarks (dict): Name -> (function, setup). With a setup function, function is called with
+            a fresh result of setup() every time; those are built before each repeat starts, so building
+            them is not timed. setup may be None.
+        repeats (int): Least number of timed repeats of each benchmark
+
+    Returns:
+        dict[str, float]: Name -> seconds per call
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        loops = {}
+        for name, (function, setup) in benchmarks.items():
+            arguments = (setup(),) if setup is not None else ()
+            start = time.perf_counter()
+            function(*arguments)
+            loops[name] = max(1, math.ceil(MIN_REPEAT_SECONDS / max(time.perf_counter() - start, 1e-9)))
+        best = {name: float("inf") for name in benchmarks}
+        rounds = 0
+        first_round = time.perf_counter()
+        while rounds < repeats or time.perf_counter() - first_round < MIN_ROUNDS_SECONDS:
+            rounds += 1
+            for name, (function, setup) in benchmarks.items():
+                calls = [(setup(),) for _ in range(loops[name])] if setup is not None else [()] * loops[name]
+                start = time.perf_counter()
+                for arguments in calls:
+                    function(*arguments)
+                best[name] = min(best[name], time.perf_counter() - start)
+    finally:
+        if enabled:
+            gc.enable()
+    return {name: best[name] / loops[name] for name in benchmarks}
+
+
+def allocated_bytes(function, instances: int) -> float:
+    """
+    Bytes still allocated per instance after building a number of instances with function
+    """
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        kept = [function() for _ in range(instances)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    del kept
+    return (after - before) / instances
+
+
+def bench_logic(games: list[list[str]], backend: str, repeats: int) -> dict[str, float]:
+    """
+    Rules engine metrics (see the module docstring)
+    """
+    results = {}
+    plies = sum(len(moves) for moves in games)
+
+    def replay_games():
+        for moves in games:
+            logic = ChessLogic(backend)
+            for move in moves:
+                logic.play_move(move)
+
+    positions = MIDDLEGAME_POSITIONS + CHECK_POSITIONS
+    calls = len(positions) * 2
+
+    def games_to_test():
+        return [ChessLogic.from_fen(fen, backend) for fen in positions]
+
+    def checkmates(logics):
+        for logic in logics:
+            logic.is_checkmate("w")
+            logic.is_checkmate("b")
+
+    def stalemates(logics):
+        for logic in logics:
+            logic.is_stalemate("w")
+            logic.is_stalemate("b")
+
+    seconds = best_times({
+        "construct": (lambda: ChessLogic(backend), None),
+        "replay": (replay_games, None),
+        "checkmates": (checkmates, games_to_test),
+        "stalemates": (stalemates, games_to_test),
+        "from_fen": (lambda: [ChessLogic.from_fen(fen, backend) for fen in MIDDLEGAME_POSITIONS], None),
+    }, repeats)
+    results["play_move_us"] = (seconds["replay"] - seconds["construct"] * len(games)) / plies * 1e6
+    results["is_checkmate_us"] = seconds["checkmates"] / calls * 1e6
+    results["is_stalemate_us"] = seconds["stalemates"] / calls * 1e6
+    results["construct_us"] = seconds["construct"] * 1e6
+    results["from_fen_us"] = seconds["from_fen"] / len(MIDDLEGAME_POSITIONS) * 1e6
+
+    longest = max(games, key=len)
+
+    def played_game():
+        logic = ChessLogic(backend)
+        for move in longest:
+            logic.play_move(move)
+        return logic
+
+    results["memory_new_game_b"] = allocated_bytes(lambda: ChessLogic(backend), 200)
+    results["memory_played_game_b"] = allocated_bytes(played_game, 20)
+    return results
+
+
+def bench_draw(games: list[list[str]], backend: str, repeats: int) -> dict[str, float]:
+    """
+    Board.draw frame times, rendered off-screen (see the module docstring)
+    """
+    os.environ["SDL_VIDEODRIVER"] = "dummy"  # Off-screen, also on machines with a display
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    import pygame
+
+    from display.classes.Board import Board
+
+    pygame.init()
+    try:
+        screen = pygame.display.set_mode((600, 600))
+        font = pygame.font.SysFont(None, 50)
+        logic = ChessLogic(backend)
+        board = Board(600, 600, logic)
+        board.draw(screen, font)  # Renders the background once, as the first frame of the GUI does
+
+        def full_frame():
+            board.invalidate()
+            board.draw(screen, font)
+
+        moves = max(games, key=len)
+
+        def move_frames():
+            # Every frame after a move, then the position is restored with the same number of frames
+            for move in moves:
+                logic.play_move(move)
+                board.draw(screen, font)
+            while logic.unmake_move() is not None:
+                board.draw(screen, font)
+
+        seconds = best_times({"full": (full_frame, None), "move": (move_frames, None)}, repeats)
+        return {
+            "draw_full_ms": seconds["full"] * 1e3,
+            "draw_move_ms": seconds["move"] / (2 * len(moves)) * 1e3,
+        }
+    finally:
+        pygame.quit()
+
+
+def run(games: list[list[str]], backend: str = "bitboard", repeats: int = REPEATS, render: bool = True) -> dict[str, float]:
+    """
+    Run every benchmark
+
+    Args:
+        games (list[list[str]]): Recorded games, moves in play_move notation
+        backend (str): ChessLogic position backend
+        repeats (int): Timed repeats of each benchmark, the best counts
+        render (bool): Also time Board.draw (needs pygame)
+
+    Returns:
+        dict[str, float]: Metric name -> value, in METRICS order
+    """
+    results = bench_logic(games, backend, repeats)
+    if render:
+        try:
+            results.update(bench_draw(games, backend, repeats))
+        except ImportError as error:
+            print(f"Skipping Board.draw: {error}", file=sys.stderr)
+    return {name: round(results[name], 3) for name in METRICS if name in results}
+
+
+def compare(results: dict[str, float], baseline: dict[str, float], threshold: float,
+            metric_thresholds: dict[str, float], noise_floor_us: float = NOISE_FLOOR_US) -> list[dict]:
+    """
+    Compare results with a baseline
+
+    Args:
+        results (dict[str, float]): Metrics of this run
+        baseline (dict[str, float]): Metrics of the baseline run
+        threshold (float): Percentage a metric may rise above its baseline
+        metric_thresholds (dict[str, float]): Percentages overriding threshold for single metrics
+        noise_floor_us (float): Timings must also rise by more than this many microseconds to regress
+
+    Returns:
+        list[dict]: metric, baseline, current, change (percent, None without a baseline value), allowed
+            percentage and whether it regressed, for every metric of this run. A timing rise within
+            noise_floor_us is never a regression.
+    """
+    rows = []
+    for name, current in results.items():
+        allowed = metric_thresholds.get(name, threshold)
+        before = baseline.get(name)
+        change = None if not before else (current - before) / before * 100
+        unit = _MICROSECONDS.get(name[name.rfind("_"):])
+        within_noise = unit is not None and before is not None and (current - before) * unit <= noise_floor_us
+        rows.append({
+            "metric": name,
+            "baseline": before,
+            "current": current,
+            "change": None if change is None else round(change, 1),
+            "allowed": allowed,
+            "regressed": change is not None and change > allowed and not within_noise,
+        })
+    return rows
+
+
+def environment() -> dict:
+    """
+    Where the numbers were measured; baselines only compare well on the same machine and Python
+    """
+    return {"python": platform.python_version(), "implementation": platform.python_implementation(),
+            "machine": platform.machine(), "system": platform.system()}
+
+
+def _metric_threshold(value: str) -> tuple[str, float]:
+    name, _, percent = value.partition("=")
+    if name not in METRICS:
+        raise argparse.ArgumentTypeError(f"unknown metric {name!r}")
+    try:
+        return name, float(percent)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected NAME=PERCENT, got {value!r}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Microbenchmarks for ChessLogic and Board.draw")
+    parser.add_argument("--games", help="move-list file of recorded games (default: reproducible random games)")
+    parser.add_argument("--backend", default="bitboard", help="ChessLogic position backend (default: bitboard)")
+    parser.add_argument("--repeats", type=int, default=REPEATS,
+                        help=f"timed repeats, the best counts (default: {REPEATS})")
+    parser.add_argument("--no-render", action="store_true", help="skip the Board.draw benchmarks")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a baseline")
+    parser.add_argument("--compare", metavar="PATH", help="compare with a baseline, status 1 on a regression")
+    parser.add_argument("--threshold", type=float, default=15.0,
+                        help="percentage a metric may rise above the baseline (default: 15)")
+    parser.add_argument("--metric-threshold", action="append", type=_metric_threshold, default=[],
+                        metavar="NAME=PERCENT", help="threshold for one metric, may be repeated")
+    parser.add_argument("--noise-floor", type=float, default=NOISE_FLOOR_US, metavar="MICROSECONDS",
+                        help=f"smallest rise of a timing that can regress (default: {NOISE_FLOOR_US:g})")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+    setup_from_environment()
+
+    games = load_games(args.games) if args.games else generate_games()
+    if not any(games):
+        parser.error("no playable games")
+    results = run(games, args.backend, max(args.repeats, 1), not args.no_render)
+
+    if args.save:
+        with open(args.save, "w") as output:
+            json.dump({"environment": environment(), "backend": args.backend, "metrics": results}, output, indent=2)
+            output.write("\n")
+
+    rows = None
+    if args.compare:
+        with open(args.compare) as source:
+            baseline = json.load(source)
+        if baseline.get("environment") != environment():
+            print(f"Warning: baseline measured on {baseline.get('environment')}", file=sys.stderr)
+        if baseline.get("backend", args.backend) != args.backend:
+            print(f"Warning: baseline measured with the {baseline['backend']} backend", file=sys.stderr)
+        rows = compare(results, baseline.get("metrics", {}), args.threshold, dict(args.metric_threshold),
+                       args.noise_floor)
+
+    if args.json:
+        print(json.dumps(rows if rows is not None else results, indent=2))
+    elif rows is not None:
+        print(f"{'metric':<22}{'baseline':>12}{'current':>12}{'change':>9}{'allowed':>9}  result")
+        for row in rows:
+            before = "-" if row["baseline"] is None else f"{row['baseline']:.3f}"
+            change = "-" if row["change"] is None else f"{row['change']:+.1f}%"
+            print(f"{row['metric']:<22}{before:>12}{row['current']:>12.3f}{change:>9}{row['allowed']:>8.0f}%  "
+                  f"{'REGRESSED' if row['regressed'] else 'ok'}")
+    else:
+        print(f"{'metric':<22}{'value':>12}")
+        for name, value in results.items():
+            print(f"{name:<22}{value:>12.3f}")
+
+    return 1 if rows is not None and any(row["regressed"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Build and query the opening explorer index (see logic/opening_book.py).
+
+The corpus is either a move-list file in any format replay.py reads, or a binary game
+store written with logic/game_store.py (recognised by its .idx file next to it).
+
+Usage (from the pychess directory):
+    python book.py build games.txt --output book.bin --plies 20
+    python book.py query book.bin --fen "<FEN>"
+    python book.py query book.bin --moves e2e4 e7e5
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from logic.chess_logic import ChessLogic
+from logic.fen import STARTING_FEN
+from logic.game_store import GameStore
+from logic.instrumentation import setup_from_environment
+from logic.move_encoding import decode_move
+from logic.opening_book import OpeningBook, build_book
+from replay import read_games
+
+# PGN result -> ChessLogic.result
+LOGIC_RESULTS = {"1-0": "w", "0-1": "b", "1/2-1/2": "d"}
+
+
+def text_games(path: str, backend: str):
+    """
+    Games of a move-list file, in the form build_book takes
+
+    Args:
+        path (str): Move-list file, '-' for stdin
+        backend (str): ChessLogic position backend
+    """
+    source = sys.stdin if path == "-" else open(path)
+    try:
+        for _, fen, moves, declared in read_games(source):
+            try:
+                logic = ChessLogic.from_fen(fen or STARTING_FEN, backend)
+            except ValueError:
+                continue
+            yield logic, moves, LOGIC_RESULTS.get(declared)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+
+def stored_games(path: str, backend: str, max_plies: int):
+    """
+    Games of a binary game store, in the form build_book takes. Only the plies the book needs are decoded.
+
+    Args:
+        path (str): Game store data file
+        backend (str): ChessLogic position backend
+        max_plies (int): Number of plies to decode per game
+    """
+    with GameStore(path) as store:
+        for number in range(len(store)):
+            fen, codes, result = store.game(number)
+            logic = ChessLogic.from_fen(fen or STARTING_FEN, backend)
+            moves = [logic.move_to_notation(decode_move(code)) for code in codes[:max_plies]]
+            codes.release()
+            yield logic, moves, result or None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Opening explorer index for ChessLogic")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="aggregate a game corpus into a book file")
+    build.add_argument("input", help="move-list file ('-' for stdin) or game store")
+    build.add_argument("--output", required=True, help="book file to write")
+    build.add_argument("--plies", type=int, default=20, help="plies of every game to index (default: 20)")
+    build.add_argument("--max-entries", type=int, default=1 << 20,
+                       help="(position, move) pairs held in memory before spilling a sorted run (default: 1048576)")
+    build.add_argument("--backend", default="bitboard", help="ChessLogic position backend (default: bitboard)")
+
+    query = commands.add_parser("query", help="show the book moves of a position")
+    query.add_argument("book", help="book file")
+    query.add_argument("--fen", default=STARTING_FEN, help="position to look up (default: starting position)")
+    query.add_argument("--moves", nargs="*", default=[], help="moves to play from the position first")
+    query.add_argument("--json", action="store_true", help="print the results as JSON")
+
+    args = parser.parse_args(argv)
+    setup_from_environment()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        if os.path.exists(args.input + ".idx"):
+            games = stored_games(args.input, args.backend, args.plies)
+        else:
+            games = text_games(args.input, args.backend)
+        summary = build_book(games, args.output, args.plies, args.max_entries)
+        seconds = time.perf_counter() - start
+        print(f"{summary['games']} games, {summary['records']} records, {summary['runs']} runs merged, "
+              f"{seconds:.1f}s", file=sys.stderr)
+        return 0
+
+    try:
+        logic = ChessLogic.from_fen(args.fen, "bitboard")
+    except ValueError as error:
+        parser.error(str(error))
+    for move in args.moves:
+        if logic.play_move(move) == "":
+            parser.error(f"Illegal move: {move}")
+
+    with OpeningBook(args.book) as book:
+        start = time.perf_counter()
+        moves = book.probe(logic)
+        seconds = time.perf_counter() - start
+        rows = [{"move": logic.move_to_notation(move.move), "games": move.games, "white_wins": move.white_wins,
+                 "black_wins": move.black_wins, "draws": move.draws, "score": round(move.score(logic.turn), 3)}
+                for move in moves]
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"{'move':<8}{'games':>10}{'white':>8}{'draw':>8}{'black':>8}{'score':>8}")
+        for row in rows:
+            print(f"{row['move']:<8}{row['games']:>10}{row['white_wins']:>8}{row['draws']:>8}{row['black_wins']:>8}"
+                  f"{row['score']:>8.3f}")
+        print(f"{len(rows)} moves, probed in {seconds * 1e6:.0f} us", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Test client for server.py: plays random games concurrently and reports throughput and
+move latency as the clients see them, next to the server's own figures.
+
+Usage (from the pychess directory):
+    python client.py --port 8765 --games 1000 --connections 50
+    python client.py --local --games 200          # starts a server in this process
+    python client.py --port 8765 --stats          # only print the server's stats
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from logic.game_server import GameClient, GameServer, run_load
+from logic.instrumentation import setup_from_environment
+
+
+async def server_stats(host: str, port: int) -> dict:
+    client = await GameClient.connect(host, port)
+    try:
+        return await client.request("stats")
+    finally:
+        await client.close()
+
+
+async def run(args) -> dict:
+    server = None
+    host, port = args.host, args.port
+    if args.local:
+        server = GameServer(max_games=max(args.connections, 1))
+        await server.start(host, 0)
+        port = server.port
+    try:
+        if args.stats:
+            return {"server": await server_stats(host, port)}
+        client = await run_load(host, port, args.games, args.connections, args.plies, args.seed)
+        return {"client": client, "server": await server_stats(host, port)}
+    finally:
+        if server is not None:
+            await server.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test client for server.py")
+    parser.add_argument("--host", default="127.0.0.1", help="server host (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="server port (default: 8765)")
+    parser.add_argument("--local", action="store_true", help="start a server in this process on a free port")
+    parser.add_argument("--games", type=int, default=200, help="games to play (default: 200)")
+    parser.add_argument("--connections", type=int, default=50, help="concurrent connections (default: 50)")
+    parser.add_argument("--plies", type=int, default=80, help="plies before a game is abandoned (default: 80)")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for the moves")
+    parser.add_argument("--stats", action="store_true", help="only print the server's stats")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+    setup_from_environment()
+
+    try:
+        results = asyncio.run(run(args))
+    except ConnectionError as error:
+        print(f"Cannot reach the server: {error}", file=sys.stderr)
+        return 1
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return 0
+    for side, figures in results.items():
+        print(f"{side}:")
+        for name, value in figures.items():
+            if name not in ("ok",):
+                print(f"  {name:<18}{value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
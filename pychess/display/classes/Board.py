@@ -3,10 +3,14 @@ import pygame
 from display.classes.Square import Square
 from display.classes.Piece import Piece
 
+from logic.background import BackgroundWorker
 from logic.chess_logic import ChessLogic
+from logic.instrumentation import get_logger, timed
+
+logger = get_logger("display")
 
 class Board:
-    def __init__(self, width: int, height: int, logic: ChessLogic):
+    def __init__(self, width: int, height: int, logic: ChessLogic, worker: BackgroundWorker | None = None):
         """
         Object representing the Chess Board
 
@@ -15,6 +19,8 @@ class Board:
             height (int): The height of the Chess Board
             logic (ChessLogic): ChessLogic object which implements the Chess Game Logic 
                 (i.e. Board Representation, Move Making Logic)
+            worker (BackgroundWorker | None): Worker that plays the moves off the GUI thread, None to
+                call play_move directly from handle_click
         """
         self.width = width
         self.height = height
@@ -23,10 +29,20 @@ class Board:
         self.selected_piece = None
 
         self.logic = logic
+        self.worker = worker
         self.squares: list[Square] = self.generate_squares()
+        self.grid: list[list[Square]] = [self.squares[row * 8:row * 8 + 8] for row in range(8)]  # grid[y][x]
+
+        self.selected: tuple[int, int] | None = None  # (x, y) of the selected piece
+        self.destinations: dict[tuple[int, int], tuple] = {}  # (x, y) -> legal move of the selected piece there
+
+        self.background: pygame.Surface | None = None  # Empty board, rendered on first draw
+        self.dirty_squares: set[Square] = set()  # Squares to repaint on the next draw
+        self.result_rect: pygame.Rect | None = None  # Result message on screen, None if not shown
+        self.full_redraw = True
 
-        self.start_pos = ""
-        self.end_pos = ""
+        # With a worker, deltas are handed over on the GUI thread by worker.poll()
+        (worker if worker is not None else logic).subscribe(self.apply_delta)
 
     def generate_squares(self):
         """
@@ -53,15 +69,114 @@ class Board:
         Returns:
             Square | None: Square Object for Relative Position or None if invalid coordinates supplied
         """ 
-        for square in self.squares:
-            if (square.x, square.y) == (pos[0], pos[1]):
-                return square
+        x, y = pos
+        if 0 <= x < 8 and 0 <= y < 8:
+            return self.grid[y][x]
+        return None
+
+    def apply_delta(self, delta):
+        """
+        ChessLogic subscriber: move the pieces of the squares a move (or take-back) changed
+
+        Args:
+            delta (MoveDelta): Changes published by ChessLogic, see logic/move_delta.py
+        """
+        self.clear_selection()  # Its moves belong to the previous position
+        for row, col, piece in delta.changes:
+            self.place_piece(col, row, piece)
+
+    def place_piece(self, x: int, y: int, piece: str):
+        """
+        Put a piece on a square, or clear it, and schedule the square for repainting
+
+        Args:
+            x (int): Relative x position of the square
+            y (int): Relative y position of the square
+            piece (str): Fen Notation of the piece, '' to clear the square
+        """
+        square = self.grid[y][x]
+        square.set_occuping_piece(Piece(piece, self.tile_width, self.tile_height) if piece != "" else None)
+        self.dirty_squares.add(square)
+
+    def set_highlight(self, x: int, y: int, highlight: bool):
+        """
+        Turn the highlight of a square on or off
+
+        Args:
+            x (int): Relative x position of the square
+            y (int): Relative y position of the square
+            highlight (bool): True to highlight the square
+        """
+        square = self.grid[y][x]
+        if square.highlight != highlight:
+            square.highlight = highlight
+            self.dirty_squares.add(square)
+
+    def legal_moves(self) -> set:
+        """
+        Legal moves of the current position, from ChessLogic's per-position cache
+
+        Returns:
+            set: Move tuples, see ChessLogic.legal_move_set
+        """
+        if self.worker is not None:
+            with self.worker.lock:  # The worker may be playing a move on the game
+                return self.logic.legal_move_set()
+        return self.logic.legal_move_set()
+
+    def engine_to_move(self) -> bool:
+        """
+        Checks if the worker's engine plays the side to move, in which case clicks are ignored
+
+        Returns:
+            bool: True if the engine is to move, False otherwise (always False without a worker)
+        """
+        if self.worker is None or self.worker.engine_color is None:
+            return False
+        with self.worker.lock:  # The worker may be playing a move on the game
+            return self.worker.engine_color == self.logic.turn
+
+    def select(self, x: int, y: int):
+        """
+        Select the piece on a square and highlight its legal destinations.
+        Nothing is selected if the piece has no legal move, there is no piece of the side to move,
+        or the engine plays the side to move.
+
+        Args:
+            x (int): Relative x position of the square
+            y (int): Relative y position of the square
+        """
+        self.clear_selection()
+        if self.logic.result != "" or self.engine_to_move():
+            return
+        for move in self.legal_moves():
+            if move[0] == y and move[1] == x:
+                destination = (move[3], move[2])
+                if destination not in self.destinations or move[4] == "q":  # Promote to a queen by clicking
+                    self.destinations[destination] = move
+        if self.destinations:
+            self.selected = (x, y)
+            for destination_x, destination_y in self.destinations:
+                self.set_highlight(destination_x, destination_y, True)
+            logger.debug("Selected %s: %d destinations", self.grid[y][x].get_coord(), len(self.destinations))
+
+    def clear_selection(self):
+        """
+        Drop the selected piece and the highlights of its destinations
+        """
+        for x, y in self.destinations:
+            self.set_highlight(x, y, False)
+        self.destinations = {}
+        self.selected = None
+
     
     def handle_click(self, mx: int, my: int):
         """
-        Pygame Event Handler for when user clicks the board. 
-        
-        Calls the ChessLogic play_move function if a move has been parsed.
+        Pygame Event Handler for when user clicks the board.
+
+        A click on a piece of the side to move selects it and highlights its legal destinations;
+        a click on one of them plays the move. Any other click only changes the selection, so
+        misclicks never reach the move validation.
 
         Args:
             mx (int): Absolute x coordinate of click
@@ -70,56 +185,140 @@ class Board:
         x = mx // self.tile_width
         y = my // self.tile_height
         clicked_square = self.get_square_from_pos((x, y))
+        if clicked_square is None:
+            return
+        logger.debug("Clicked on: %s", clicked_square.get_coord())
+        if self.engine_to_move():
+            self.clear_selection()  # The selection may predate a takeback that handed the move to the engine
+            return
 
-        if clicked_square is not None:
-            print(f"Clicked on: {clicked_square.get_coord()}")  # Debugging Output
-            if self.start_pos == "":
-                self.start_pos = clicked_square.get_coord()
-                print(f"Start Position Set: {self.start_pos}")  # Debugging Output
-            elif self.end_pos == "":
-                self.end_pos = clicked_square.get_coord()
-                print(f"End Position Set: {self.end_pos}")  # Debugging Output
+        move = self.destinations.get((x, y))
+        if move is None:
+            if self.selected == (x, y):
+                self.clear_selection()
+            else:
+                self.select(x, y)
+            return
 
-                if self.start_pos != self.end_pos:
-                    move_string = f"{self.start_pos}{self.end_pos}"
-                    print(f"Attempting Move: {move_string}")  # Debugging Output
-                    self.logic.play_move(move_string)  # Send move to ChessLogic
+        self.clear_selection()
+        move_string = self.logic.move_to_notation(move)
+        logger.debug("Playing Move: %s", move_string)
+        if self.worker is not None:
+            self.worker.submit_move(move_string)  # Played on the worker thread
+        else:
+            self.logic.play_legal_move(move)  # Already validated by the lookup in destinations
 
-                # Reset for next move input
-                self.start_pos = ""
-                self.end_pos = ""
+    def handle_key(self, key: int):
+        """
+        Pygame Event Handler for key presses: the left and right arrow keys take back and replay
+        one move of the game, Home and End go to its start and end (see ChessLogic.seek)
 
-    
-    def draw(self, display, font):
+        Args:
+            key (int): Pygame key code
+        """
+        if self.worker is not None:
+            with self.worker.lock:  # The worker may be playing a move on the game
+                ply, end = len(self.logic.move_history), self.logic.line_length
+        else:
+            ply, end = len(self.logic.move_history), self.logic.line_length
+        target = {pygame.K_LEFT: ply - 1, pygame.K_RIGHT: ply + 1, pygame.K_HOME: 0, pygame.K_END: end}.get(key)
+        if target is None or target == ply:
+            return
+        logger.debug("Seeking from ply %d to %d", ply, target)
+        if self.worker is not None:
+            self.worker.seek(target)  # The board follows through the deltas poll() hands over
+        else:
+            self.logic.seek(target)
+
+    def invalidate(self):
+        """
+        Make the next draw repaint the whole board, e.g. after the window was uncovered
+        """
+        self.full_redraw = True
+
+    def render_background(self) -> pygame.Surface:
+        """
+        Render the empty board once, so squares can be repainted with a single blit
+
+        Returns:
+            pygame.Surface: Surface the size of the board with every square drawn without a piece
+        """
+        background = pygame.Surface((self.width, self.height))
+        for square in self.squares:
+            pygame.draw.rect(background, square.draw_color, square.rect)
+        if pygame.display.get_surface() is not None:
+            background = background.convert()
+        return background
+
+    @timed("Board.draw")
+    def draw(self, display, font) -> list[pygame.Rect]:
         """
         Draws the Board, with result message if applicable, on Pygame Screen
 
+        Only squares whose piece or highlight changed since the last call are repainted.
+
         Args:
             display: Pygame Screen Object
             font: Pygame Font Object
+
+        Returns:
+            list[pygame.Rect]: Areas of the screen that changed, for pygame.display.update
         """
-        self.squares = self.generate_squares()
-        for square in self.squares:
-            square.draw(display)
+        if self.background is None:
+            self.background = self.render_background()
+        if self.result_rect is not None and self.logic.result == "":
+            self.full_redraw = True  # The message has to be erased, e.g. after a move was taken back
+
+        if self.full_redraw:
+            display.blit(self.background, (0, 0))
+            for square in self.squares:
+                square.draw(display, self.background)
+            self.dirty_squares.clear()
+            self.result_rect = None
+            self.full_redraw = False
+            dirty = [pygame.Rect(0, 0, self.width, self.height)]
+        else:
+            dirty = [square.rect for square in self.dirty_squares]
+            for square in self.dirty_squares:
+                square.draw(display, self.background)
+            self.dirty_squares.clear()
+
         if self.logic.result != "":
-            white = (255, 255, 255)
-            black = (0, 0, 0)
-            red = (255, 0, 0)
-            gray = (200, 200, 200)
-
-            message = "Draw"
-            if self.logic.result == "w":
-                message = "White wins"
-            elif self.logic.result == "b":
-                message = "Black wins"
-            text_surface = font.render(message, True, white)
-            text_rect = text_surface.get_rect(center=(self.width // 2, self.height // 2))
-            rect_width = text_rect.width + 40
-            rect_height = text_rect.height + 20
-            rect_x = text_rect.x - 20
-            rect_y = text_rect.y - 10
-
-            pygame.draw.rect(display, gray, (rect_x, rect_y, rect_width, rect_height))
-            pygame.draw.rect(display, red, (rect_x, rect_y, rect_width, rect_height), 3)
-
-            display.blit(text_surface, text_rect)
+            if self.result_rect is None or self.result_rect.collidelist(dirty) != -1:
+                self.result_rect = self.draw_result(display, font)
+                dirty.append(self.result_rect)
+        return dirty
+
+    def draw_result(self, display, font) -> pygame.Rect:
+        """
+        Draws the result message in the middle of the board
+
+        Args:
+            display: Pygame Screen Object
+            font: Pygame Font Object
+
+        Returns:
+            pygame.Rect: Area covered by the message
+        """
+        white = (255, 255, 255)
+        black = (0, 0, 0)
+        red = (255, 0, 0)
+        gray = (200, 200, 200)
+
+        message = "Draw"
+        if self.logic.result == "w":
+            message = "White wins"
+        elif self.logic.result == "b":
+            message = "Black wins"
+        text_surface = font.render(message, True, white)
+        text_rect = text_surface.get_rect(center=(self.width // 2, self.height // 2))
+        rect_width = text_rect.width + 40
+        rect_height = text_rect.height + 20
+        rect_x = text_rect.x - 20
+        rect_y = text_rect.y - 10
+
+        pygame.draw.rect(display, gray, (rect_x, rect_y, rect_width, rect_height))
+        pygame.draw.rect(display, red, (rect_x, rect_y, rect_width, rect_height), 3)
+
+        display.blit(text_surface, text_rect)
+        return pygame.Rect(rect_x, rect_y, rect_width, rect_height)
@@ -1,5 +1,4 @@
-import pygame
-import os
+from display.classes.SpriteCache import sprite_cache
 
 class Piece:
     def __init__(self, fen_notation: str, tile_width: int, tile_height: int):
@@ -10,17 +9,5 @@ class Piece:
                 tile_width (int): Width of Tile Piece is Displayed in
                 tile_height (int): Height of Tile Piece is Displayed in
         """
-        color = "w"
-        if fen_notation.islower():
-            color = "b"
-        piece = fen_notation.lower()
-        piece_map = {
-            "p": "pawn",
-            "r": "rook",
-            "n": "knight",
-            "b": "bishop",
-            "q": "queen",
-            "k": "king"
-        }
-        self.img = pygame.image.load(os.path.join("display/imgs/", f"{color}_{piece_map[piece]}.png"))
-        self.img = pygame.transform.scale(self.img, (tile_width - 10, tile_height - 10))
\ No newline at end of file
+        self.fen_notation = fen_notation
+        self.img = sprite_cache.get(fen_notation, tile_width - 10, tile_height - 10)
@@ -0,0 +1,79 @@
+import pygame
+import os
+
+IMAGE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "imgs")
+
+PIECE_NAMES = {
+    "p": "pawn",
+    "r": "rook",
+    "n": "knight",
+    "b": "bishop",
+    "q": "queen",
+    "k": "king"
+}
+
+class SpriteCache:
+    def __init__(self, max_sizes: int = 2):
+        """
+        Piece images, read from disk once and scaled once per tile size
+
+        Scaled images are kept for the max_sizes most recently used sizes; when the window is
+        resized to a new size, the images of the oldest size are dropped.
+
+        Args:
+            max_sizes (int): Number of image sizes to keep
+        """
+        self.max_sizes = max_sizes
+        self.originals: dict[str, pygame.Surface] = {}
+        self.sizes: dict[tuple[int, int], dict[str, pygame.Surface]] = {}  # Insertion order = least recently used first
+
+    def get(self, fen_notation: str, width: int, height: int) -> pygame.Surface:
+        """
+        Image of a piece at the given size
+
+        Args:
+            fen_notation (str): Fen Notation for piece i.e. R -> white rook, r -> black rook
+            width (int): Width of the image
+            height (int): Height of the image
+
+        Returns:
+            pygame.Surface: Shared image, must not be drawn on
+        """
+        size = (width, height)
+        images = self.sizes.pop(size, None)
+        if images is None:
+            images = {}
+            while len(self.sizes) >= self.max_sizes:
+                del self.sizes[next(iter(self.sizes))]
+        self.sizes[size] = images  # Mark as most recently used
+
+        image = images.get(fen_notation)
+        if image is None:
+            image = pygame.transform.scale(self.load(fen_notation), size)
+            if pygame.display.get_surface() is not None:
+                image = image.convert_alpha()  # Match the screen format so blits need no conversion
+            images[fen_notation] = image
+        return image
+
+    def load(self, fen_notation: str) -> pygame.Surface:
+        """
+        Full size image of a piece, read from display/imgs on first use
+
+        Args:
+            fen_notation (str): Fen Notation for piece
+
+        Returns:
+            pygame.Surface: Unscaled image
+        """
+        image = self.originals.get(fen_notation)
+        if image is None:
+            color = "b" if fen_notation.islower() else "w"
+            path = os.path.join(IMAGE_DIRECTORY, f"{color}_{PIECE_NAMES[fen_notation.lower()]}.png")
+            image = pygame.image.load(path)
+            self.originals[fen_notation] = image
+        return image
+
+"""
+Cache shared by every Piece
+"""
+sprite_cache = SpriteCache()
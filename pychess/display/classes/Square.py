@@ -54,15 +54,18 @@ class Square:
         """
         self.occupying_piece = piece
     
-    def draw(self, display):
+    def draw(self, display, background: pygame.Surface | None = None):
         """
         Draw the Square on Pygame Screen
 
         Args:
             display: Pygame Screen Object
+            background (pygame.Surface | None): Pre-rendered empty board to copy the square from
         """
         if self.highlight:
             pygame.draw.rect(display, self.highlight_color, self.rect)
+        elif background is not None:
+            display.blit(background, self.rect, self.rect)
         else:
             pygame.draw.rect(display, self.draw_color, self.rect)
         
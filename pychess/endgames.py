@@ -0,0 +1,88 @@
+"""
+Generate and probe endgame tablebases (see logic/tablebase.py).
+
+Tables of the endings reachable by captures and promotions are generated too, so
+"generate KPK" also writes KQK, KRK, KBK and KNK.
+
+Usage (from the pychess directory):
+    python endgames.py generate KQK KRK KPK --directory tablebases
+    python endgames.py probe --directory tablebases --fen "8/8/8/4k3/8/8/4P3/4K3 w - - 0 1"
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from logic.chess_logic import ChessLogic
+from logic.instrumentation import setup_from_environment
+from logic.tablebase import DRAW, LOSS, TABLE_SUFFIX, WIN, Tablebases, generate_table, parse_material
+
+WDL_NAMES = {WIN: "win", DRAW: "draw", LOSS: "loss"}
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Endgame tablebases for ChessLogic")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="build tables by retrograde analysis")
+    generate.add_argument("materials", nargs="+", help="material signatures, e.g. KQK KRK KPK KQKR")
+    generate.add_argument("--directory", default="tablebases", help="where tables are written (default: tablebases)")
+    generate.add_argument("--force", action="store_true", help="regenerate tables that already exist")
+
+    probe = commands.add_parser("probe", help="look up a position")
+    probe.add_argument("--directory", default="tablebases", help="where tables are read (default: tablebases)")
+    probe.add_argument("--fen", required=True, help="position to look up")
+    probe.add_argument("--json", action="store_true", help="print the result as JSON")
+
+    args = parser.parse_args(argv)
+    setup_from_environment()
+
+    if args.command == "generate":
+        try:
+            for material in args.materials:
+                parse_material(material)
+        except ValueError as error:
+            parser.error(str(error))
+        os.makedirs(args.directory, exist_ok=True)
+        tablebases = Tablebases(None if args.force else args.directory)
+        for material in args.materials:
+            white, black, _ = parse_material(material)
+            if tablebases.table(white + black) is None:
+                start = time.perf_counter()
+                generate_table(material, tablebases, lambda message: print(message, file=sys.stderr))
+                print(f"{white + black}: generated in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        for table in tablebases.tables.values():
+            if table is not None and table.path is None:
+                table.save(os.path.join(args.directory, table.material + TABLE_SUFFIX))
+        tablebases.close()
+        return 0
+
+    try:
+        logic = ChessLogic.from_fen(args.fen, "bitboard")
+    except ValueError as error:
+        parser.error(str(error))
+    tablebases = Tablebases(args.directory)
+    start = time.perf_counter()
+    result = tablebases.probe(logic)
+    seconds = time.perf_counter() - start
+    if result is None:
+        print("Position not covered by the tables", file=sys.stderr)
+        return 1
+    wdl, plies = result
+    best = tablebases.best_move(logic)
+    row = {"result": WDL_NAMES[wdl], "plies_to_mate": plies if wdl != DRAW else None,
+           "best_move": logic.move_to_notation(best[0]) if best is not None else None}
+    tablebases.close()
+    if args.json:
+        print(json.dumps(row, indent=2))
+    else:
+        mate = f", mate in {plies} plies" if wdl != DRAW else ""
+        print(f"{row['result']} for {'white' if logic.turn == 'w' else 'black'}{mate}, best move {row['best_move']}")
+        print(f"probed in {seconds * 1e6:.0f} us", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""
+Incrementally maintained king squares and attack maps for ChessLogic.
+
+Squares use the same 0-63 numbering as logic/bitboard.py (row * 8 + col).
+"""
+
+from logic.bitboard import iter_bits, piece_attacks
+
+SLIDERS = "BRQbrq"
+
+
+class AttackMap:
+    __slots__ = ("mailbox", "occupancy", "occupied", "attacks_from", "attackers_to", "attacked", "attack_counts",
+                 "king_squares")
+
+    def __init__(self, position):
+        """
+        Attack information for every piece on the board, kept in sync one square at a time
+
+        attacks_from -> attacks_from[square] is the bitboard of squares attacked by the piece on square
+
+        attackers_to -> attackers_to[square] is the bitboard of pieces (both colours) attacking square
+
+        attacked -> attacked[color] is the bitboard of squares attacked by at least one piece of color
+
+        king_squares -> king_squares[color] is the square index of that king, None if it is missing
+
+        Args:
+            position: Position backend to build the maps from
+        """
+        self.mailbox = [""] * 64
+        self.occupancy = {"w": 0, "b": 0}
+        self.occupied = 0
+        self.attacks_from = [0] * 64
+        self.attackers_to = [0] * 64
+        self.attacked = {"w": 0, "b": 0}
+        self.attack_counts = {"w": [0] * 64, "b": [0] * 64}  # Number of attackers per square, per colour
+        self.king_squares = {"w": None, "b": None}
+
+        for row in range(8):
+            for col in range(8):
+                piece = position.piece_at(row, col)
+                if piece != "":
+                    self._place(row * 8 + col, piece)
+
+        # Fill the maps in one pass instead of diffing against empty attack sets
+        for square in iter_bits(self.occupied):
+            piece = self.mailbox[square]
+            color = "w" if piece.isupper() else "b"
+            counts = self.attack_counts[color]
+            attacks = piece_attacks(square, piece, self.occupied)
+            self.attacks_from[square] = attacks
+            self.attacked[color] |= attacks
+            for target in iter_bits(attacks):
+                self.attackers_to[target] |= 1 << square
+                counts[target] += 1
+
+    def update(self, square: int, piece: str):
+        """
+        Record that square now holds piece.
+
+        Besides the piece itself, only sliding pieces whose rays run through square
+        are recomputed, as they are the only ones whose reach depends on it.
+
+        Args:
+            square (int): Square index that changed
+            piece (str): New piece letter, or '' if the square was cleared
+        """
+        old_piece = self.mailbox[square]
+        if old_piece == piece:
+            return
+
+        # A capture keeps the square occupied, so no ray through it changes
+        sliders = []
+        if old_piece == "" or piece == "":
+            mailbox = self.mailbox
+            sliders = [source for source in iter_bits(self.attackers_to[square]) if mailbox[source] in SLIDERS]
+
+        if old_piece != "":
+            self._set_attacks(square, 0)
+            self._remove(square, old_piece)
+        if piece != "":
+            self._place(square, piece)
+            self._set_attacks(square, piece_attacks(square, piece, self.occupied))
+
+        for source in sliders:
+            self._set_attacks(source, piece_attacks(source, self.mailbox[source], self.occupied))
+
+    def is_attacked(self, square: int, by_color: str) -> bool:
+        """
+        Checks if any piece of by_color attacks square
+
+        Args:
+            square (int): Square index
+            by_color (str): 'w' for white, 'b' for black.
+
+        Returns:
+            bool: True if the square is attacked, False otherwise.
+        """
+        return (self.attacked[by_color] >> square) & 1 == 1
+
+    def attackers(self, square: int, by_color: str) -> int:
+        """
+        Bitboard of the pieces of by_color attacking square
+
+        Args:
+            square (int): Square index
+            by_color (str): 'w' for white, 'b' for black.
+
+        Returns:
+            int: Bitboard of attacking pieces
+        """
+        return self.attackers_to[square] & self.occupancy[by_color]
+
+    def is_king_attacked(self, color: str) -> bool:
+        """
+        Checks if the king of color is attacked by the other colour
+
+        Args:
+            color (str): 'w' for white, 'b' for black.
+
+        Returns:
+            bool: True if the king is in check, False otherwise (or if there is no king).
+        """
+        king_square = self.king_squares[color]
+        if king_square is None:
+            return False
+        return (self.attacked["b" if color == "w" else "w"] >> king_square) & 1 == 1
+
+    def _place(self, square: int, piece: str):
+        bit = 1 << square
+        color = "w" if piece.isupper() else "b"
+        self.mailbox[square] = piece
+        self.occupancy[color] |= bit
+        self.occupied |= bit
+        if piece in "Kk":
+            self.king_squares[color] = square
+
+    def _remove(self, square: int, piece: str):
+        bit = 1 << square
+        color = "w" if piece.isupper() else "b"
+        self.mailbox[square] = ""
+        self.occupancy[color] &= ~bit
+        self.occupied &= ~bit
+        if piece in "Kk" and self.king_squares[color] == square:
+            self.king_squares[color] = None
+
+    def _set_attacks(self, source: int, attacks: int):
+        """
+        Replace the attack set of the piece on source, touching only the squares that changed
+        """
+        old_attacks = self.attacks_from[source]
+        if old_attacks == attacks:
+            return
+        color = "w" if self.mailbox[source].isupper() else "b"
+        counts = self.attack_counts[color]
+        attackers_to = self.attackers_to
+        source_bit = 1 << source
+
+        for square in iter_bits(old_attacks & ~attacks):
+            attackers_to[square] ^= source_bit
+            counts[square] -= 1
+            if counts[square] == 0:
+                self.attacked[color] ^= 1 << square
+        for square in iter_bits(attacks & ~old_attacks):
+            attackers_to[square] |= source_bit
+            counts[square] += 1
+            if counts[square] == 1:
+                self.attacked[color] |= 1 << square
+        self.attacks_from[source] = attacks
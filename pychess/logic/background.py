@@ -0,0 +1,243 @@
+"""
+Background worker that plays moves and runs the engine off the GUI thread.
+
+The worker thread owns the game while it handles a request: it validates and plays
+submitted moves, then lets the engine answer if it plays the side to move. Everything it
+produces (move results and the MoveDeltas published by ChessLogic) goes into a queue
+that the GUI thread drains with poll(), so the GUI only ever touches its own objects.
+
+Engine thinking runs on the worker thread (mode="thread") or on a pool of processes
+(mode="process", see logic/parallel_search.py), which keeps the search from competing
+with the render loop for the GIL.
+"""
+
+import queue
+import threading
+
+from logic.chess_logic import ChessLogic
+from logic.engine import Searcher
+from logic.instrumentation import get_logger
+
+logger = get_logger("background")
+
+WORKER_MODES = ("thread", "process")
+
+
+class BackgroundWorker:
+    def __init__(self, logic: ChessLogic, engine_color: str | None = None, think_time: float = 1.0,
+                 mode: str = "thread", workers: int = 0, on_result=None, book=None, tablebases=None):
+        """
+        Start the worker thread
+
+        Args:
+            logic (ChessLogic): Game to play on. While the worker runs, other threads must only read it
+                under lock (or not at all).
+            engine_color (str | None): 'w' or 'b' for the side the engine plays, None for no engine
+            think_time (float): Engine time budget per move in seconds
+            mode (str): "thread" to search on the worker thread, "process" to search on worker processes
+            workers (int): Search processes in "process" mode, 0 for one per CPU
+            on_result: Function called with no arguments on the worker thread whenever a result is queued,
+                e.g. to wake up an event loop. Must be thread-safe.
+            book (OpeningBook | None): Opening book the engine plays from without searching while in book
+            tablebases (Tablebases | None): Endgame tables the engine plays perfectly from. In "process" mode
+                the workers open their own copy of tablebases.directory.
+
+        Raises:
+            ValueError: If mode is unknown
+        """
+        if mode not in WORKER_MODES:
+            raise ValueError(f"Unknown worker mode: {mode}")
+        self.logic = logic
+        self.engine_color = engine_color
+        self.think_time = think_time
+        self.mode = mode
+        self.on_result = on_result
+        self.book = book
+        self.tablebases = tablebases
+
+        self.lock = threading.Lock()  # Held by the worker while it changes logic
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.generation = 0  # Increased by cancel(); requests from older generations are dropped
+        self._subscribers = []
+        self._searcher = None  # Searcher or ParallelSearcher while the engine is thinking
+        self._parallel_searcher = None
+
+        if mode == "process":
+            from logic.parallel_search import ParallelSearcher
+            self._parallel_searcher = ParallelSearcher(
+                workers, tablebase_directory=tablebases.directory if tablebases is not None else None)
+
+        logic.subscribe(self._queue_delta)
+        self.thread = threading.Thread(target=self._run, name="pychess-worker", daemon=True)
+        self.thread.start()
+
+    def subscribe(self, callback):
+        """
+        Call callback with every MoveDelta of the game, on the thread that calls poll()
+
+        Args:
+            callback: Function taking one MoveDelta argument
+        """
+        self._subscribers.append(callback)
+
+    def submit_move(self, move: str):
+        """
+        Play a move in the background, cancelling whatever the worker is still doing.
+        The outcome is reported by poll() as ("move", move, notation), notation being '' if the move was rejected.
+
+        Args:
+            move (str): Move in play_move notation
+        """
+        self.cancel()
+        self._submit("move", move)
+
+    def request_engine_move(self):
+        """
+        Let the engine move in the background if it plays the side to move
+        """
+        self._submit("think", None)
+
+    def seek(self, ply: int) -> bool:
+        """
+        Go to a ply of the game (see ChessLogic.seek) right away, cancelling whatever the worker
+        is still doing. The MoveDeltas of the change are passed on by poll() as usual, and if the
+        engine plays the side to move at the new ply it starts thinking.
+
+        Args:
+            ply (int): Number of moves played from the starting position
+
+        Returns:
+            bool: False if the game has no such ply
+        """
+        self.cancel()
+        with self.lock:
+            moved = self.logic.seek(ply)
+        if moved:
+            self.request_engine_move()
+        return moved
+
+    def cancel(self):
+        """
+        Drop queued requests and stop a running engine search as soon as possible
+        """
+        self.generation += 1
+        searcher = self._searcher
+        if searcher is not None:
+            searcher.stop()
+
+    @property
+    def busy(self) -> bool:
+        """
+        True while a submitted request has not been finished
+        """
+        return self.requests.unfinished_tasks > 0
+
+    def poll(self) -> list[tuple]:
+        """
+        Collect what the worker produced since the last call, without blocking.
+        MoveDeltas are passed to the subscribers here, on the calling thread.
+
+        Returns:
+            list[tuple]: ("move", move, notation) for submitted moves and ("engine", notation, SearchResult)
+                for engine moves (SearchResult is None for book moves), in the order they were played
+        """
+        events = []
+        while True:
+            try:
+                kind, payload = self.results.get_nowait()
+            except queue.Empty:
+                return events
+            if kind == "delta":
+                for callback in self._subscribers:
+                    callback(payload)
+            else:
+                events.append(payload)
+
+    def close(self):
+        """
+        Stop the worker thread (and search processes) and detach from the game
+        """
+        self.cancel()
+        self.requests.put(None)
+        self.thread.join()
+        self.logic.unsubscribe(self._queue_delta)
+        if self._parallel_searcher is not None:
+            self._parallel_searcher.close()
+
+    def _submit(self, kind: str, payload):
+        self.requests.put((self.generation, kind, payload))
+
+    def _queue_delta(self, delta):
+        self.results.put(("delta", delta))
+
+    def _post(self, event: tuple):
+        self.results.put(("event", event))
+        if self.on_result is not None:
+            self.on_result()
+
+    def _run(self):
+        while True:
+            request = self.requests.get()
+            if request is None:
+                self.requests.task_done()
+                return
+            generation, kind, payload = request
+            try:
+                if generation == self.generation:
+                    self._handle(generation, kind, payload)
+            except Exception:
+                logger.exception("Background request %s %r failed", kind, payload)
+            finally:
+                self.requests.task_done()
+
+    def _handle(self, generation: int, kind: str, payload):
+        logic = self.logic
+        if kind == "move":
+            with self.lock:
+                notation = logic.play_move(payload)
+            self._post(("move", payload, notation))
+            if notation == "":
+                return
+
+        if self.engine_color != logic.turn or logic.result != "":
+            return
+
+        if self.book is not None:
+            with self.lock:
+                book_move = self.book.choose_move(logic)
+                notation = logic.play_move(book_move) if book_move is not None else ""
+            if notation != "":
+                logger.debug("Engine played %s from the book", notation)
+                self._post(("engine", notation, None))
+                return
+
+        # Search a copy, so the search's own moves are not published to the GUI
+        with self.lock:
+            snapshot = logic.copy()
+            if self._parallel_searcher is not None:
+                searcher = self._parallel_searcher
+                searcher.reset_stop()
+            else:
+                searcher = Searcher(snapshot, tablebases=self.tablebases)
+            # Published before the generation check: a cancel() from here on stops the search
+            self._searcher = searcher
+        try:
+            if generation != self.generation:
+                return  # Cancelled while the move was being played
+            if self._parallel_searcher is not None:
+                result = searcher.search(snapshot, time_limit=self.think_time)
+            else:
+                result = searcher.search(time_limit=self.think_time)
+        finally:
+            self._searcher = None
+
+        if generation != self.generation or result.best_move == "":
+            logger.debug("Engine search cancelled")
+            return
+        with self.lock:
+            if generation != self.generation:
+                return  # Cancelled (e.g. by seek) while the lock was taken
+            notation = logic.play_move(result.best_move)
+        logger.debug("Engine played %s (%s)", notation, result)
+        self._post(("engine", notation, result))
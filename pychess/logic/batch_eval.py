@@ -0,0 +1,295 @@
+"""
+Vectorised evaluation of many positions at once with NumPy.
+
+Positions are stacked into an N x 12 x 8 x 8 array of 0/1 planes, one plane per piece
+in logic/bitboard.py PIECES order (white P N B R Q K, then black p n b r q k), rows and
+columns as on ChessLogic.board (row 0 = rank 8). Every evaluation term is then computed
+for the whole batch with array operations:
+
+    material        white minus black, centipawns (engine PIECE_VALUES)
+    piece_square    white minus black piece-square bonuses (engine PIECE_SQUARE_TABLES)
+    attacks         N x 2 x 8 x 8 number of white / black pieces attacking each square
+    mobility        N x 2 squares reachable by white / black knights, bishops, rooks and
+                    queens, own pieces excluded
+    king_attacks    N x 2 enemy attacks on the squares around the white / black king
+
+material + piece_square is exactly engine.evaluate (from white's point of view), so a
+batch scores the same as the search does one position at a time. The planes can also be
+saved with the side to move and any labels as training data (save_planes / load_planes).
+
+Requires NumPy.
+"""
+
+import numpy as np
+
+from logic.bitboard import BISHOP_DIRECTIONS, KING_OFFSETS, KNIGHT_OFFSETS, PIECES, ROOK_DIRECTIONS
+from logic.engine import PIECE_SQUARE_TABLES, PIECE_VALUES
+
+PLANES = len(PIECES)
+EMPTY = PLANES  # Square code of an empty square
+
+# Byte of a board character -> square code (piece index in PIECES, EMPTY for '.')
+_CODES = np.full(256, EMPTY, dtype=np.uint8)
+for _index, _piece in enumerate(PIECES):
+    _CODES[ord(_piece)] = _index
+_EXPAND_DIGITS = str.maketrans({str(count): "." * count for count in range(1, 9)} | {"/": ""})
+
+# Centipawn value of every plane, negative for black
+_PLANE_VALUES = np.array([PIECE_VALUES[piece.lower()] * (1 if piece.isupper() else -1) for piece in PIECES],
+                         dtype=np.int32)
+
+# Piece-square bonus of every plane and square, black tables mirrored and negated
+_PLANE_SQUARE_VALUES = np.array(
+    [PIECE_SQUARE_TABLES[piece][square] for piece in "pnbrqk" for square in range(64)]
+    + [-PIECE_SQUARE_TABLES[piece][square ^ 56] for piece in "pnbrqk" for square in range(64)],
+    dtype=np.int32).reshape(PLANES, 64)
+
+_WHITE = slice(0, 6)
+_BLACK = slice(6, 12)
+_PAWN, _KNIGHT, _BISHOP, _ROOK, _QUEEN, _KING = range(6)
+
+CHUNK_SIZE = 1024  # Positions whose attacks are computed together, small enough for the working set to stay in cache
+
+
+def codes_to_planes(codes: np.ndarray) -> np.ndarray:
+    """
+    Expand square codes into piece planes
+
+    Args:
+        codes (np.ndarray): N x 64 uint8 array, the index in PIECES of the piece on each square
+            (row * 8 + col order) or EMPTY
+
+    Returns:
+        np.ndarray: N x 12 x 8 x 8 uint8 planes
+    """
+    planes = codes[:, None, :] == np.arange(PLANES, dtype=np.uint8)[None, :, None]
+    return planes.view(np.uint8).reshape(len(codes), PLANES, 8, 8)
+
+
+def planes_from_fens(fens) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Stack positions given in FEN without building a ChessLogic for each
+
+    Args:
+        fens: Iterable of FEN strings (only the placement and side to move fields are read)
+
+    Raises:
+        ValueError: If a placement field does not describe 64 squares
+
+    Returns:
+        tuple: (N x 12 x 8 x 8 uint8 planes, N bool array that is True where white is to move)
+    """
+    boards = []
+    turns = []
+    for fen in fens:
+        fields = fen.split()
+        board = fields[0].translate(_EXPAND_DIGITS)
+        if len(board) != 64:
+            raise ValueError(f"Invalid FEN placement: {fields[0]!r}")
+        boards.append(board)
+        turns.append(len(fields) < 2 or fields[1] == "w")
+    codes = _CODES[np.frombuffer("".join(boards).encode("ascii"), dtype=np.uint8)].reshape(len(boards), 64)
+    return codes_to_planes(codes), np.array(turns, dtype=bool)
+
+
+def planes_from_games(games) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Stack the current positions of ChessLogic games
+
+    Args:
+        games: Iterable of ChessLogic
+
+    Returns:
+        tuple: (N x 12 x 8 x 8 uint8 planes, N bool array that is True where white is to move)
+    """
+    boards = []
+    turns = []
+    for logic in games:
+        boards.append("".join(piece or "." for row in logic.board for piece in row))
+        turns.append(logic.turn == "w")
+    codes = _CODES[np.frombuffer("".join(boards).encode("ascii"), dtype=np.uint8)].reshape(len(boards), 64)
+    return codes_to_planes(codes), np.array(turns, dtype=bool)
+
+
+def material(planes: np.ndarray) -> np.ndarray:
+    """
+    White minus black material of every position, in centipawns (N int32)
+    """
+    return planes.reshape(len(planes), PLANES, 64).sum(axis=2, dtype=np.int32) @ _PLANE_VALUES
+
+
+def piece_square(planes: np.ndarray) -> np.ndarray:
+    """
+    White minus black piece-square bonuses of every position, in centipawns (N int32)
+    """
+    flat = planes.reshape(len(planes), PLANES * 64).astype(np.int32)
+    return flat @ _PLANE_SQUARE_VALUES.reshape(-1)
+
+
+def evaluate_batch(planes: np.ndarray, white_to_move: np.ndarray | None = None) -> np.ndarray:
+    """
+    Static evaluation of every position, the same as engine.evaluate
+
+    Args:
+        planes (np.ndarray): N x 12 x 8 x 8 planes
+        white_to_move (np.ndarray | None): N bools; scores are from the side to move's point of view
+            when given, from white's otherwise
+
+    Returns:
+        np.ndarray: N int32 scores in centipawns
+    """
+    scores = material(planes) + piece_square(planes)
+    if white_to_move is not None:
+        scores = np.where(white_to_move, scores, -scores)
+    return scores
+
+
+def _shift(boards: np.ndarray, row_step: int, col_step: int) -> np.ndarray:
+    # Move every square of N x 8 x 8 boards by (row_step, col_step), dropping what leaves the board
+    shifted = np.zeros_like(boards)
+    shifted[:, max(row_step, 0):8 + min(row_step, 0), max(col_step, 0):8 + min(col_step, 0)] = \
+        boards[:, max(-row_step, 0):8 - max(row_step, 0), max(-col_step, 0):8 - max(col_step, 0)]
+    return shifted
+
+
+def _step_attacks(pieces: np.ndarray, offsets) -> np.ndarray:
+    attacks = np.zeros_like(pieces)
+    for row_step, col_step in offsets:
+        attacks += _shift(pieces, row_step, col_step)
+    return attacks
+
+
+def _slider_attacks(pieces: np.ndarray, empty: np.ndarray, directions) -> np.ndarray:
+    # Walk every ray one square at a time; a ray goes on only through empty squares
+    attacks = np.zeros_like(pieces)
+    for row_step, col_step in directions:
+        front = pieces
+        for _ in range(7):
+            front = _shift(front, row_step, col_step)
+            attacks += front
+            front *= empty
+            if not front.any():
+                break
+    return attacks
+
+
+def _attack_terms(planes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Attack counts (N x 2 x 8 x 8) and mobility (N x 2) of a batch small enough to stay in cache
+    """
+    pieces = planes.astype(np.int8)  # At most 16 attackers per square
+    empty = 1 - pieces.sum(axis=1, dtype=np.int8)
+    attack_counts = np.empty((len(planes), 2, 8, 8), dtype=np.int8)
+    counts = np.empty((len(planes), 2), dtype=np.int32)
+    for color, side in enumerate((_WHITE, _BLACK)):
+        own = pieces[:, side]
+        reach = _step_attacks(own[:, _KNIGHT], KNIGHT_OFFSETS)
+        reach += _slider_attacks(own[:, _BISHOP] + own[:, _QUEEN], empty, BISHOP_DIRECTIONS)
+        reach += _slider_attacks(own[:, _ROOK] + own[:, _QUEEN], empty, ROOK_DIRECTIONS)
+        counts[:, color] = (reach * (1 - own.sum(axis=1, dtype=np.int8))).sum(axis=(1, 2), dtype=np.int32)
+        reach += _step_attacks(own[:, _KING], KING_OFFSETS)
+        # Pawns capture towards the enemy: white ones up the board (row - 1), black ones down
+        reach += _step_attacks(own[:, _PAWN], ((-1, -1), (-1, 1)) if color == 0 else ((1, -1), (1, 1)))
+        attack_counts[:, color] = reach
+    return attack_counts, counts
+
+
+def _batched_attack_terms(planes: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    attack_counts = np.empty((len(planes), 2, 8, 8), dtype=np.int8)
+    counts = np.empty((len(planes), 2), dtype=np.int32)
+    for start in range(0, len(planes), CHUNK_SIZE):
+        chunk = slice(start, start + CHUNK_SIZE)
+        attack_counts[chunk], counts[chunk] = _attack_terms(planes[chunk])
+    return attack_counts, counts
+
+
+def attacks(planes: np.ndarray) -> np.ndarray:
+    """
+    Number of pieces of each colour attacking every square
+
+    Args:
+        planes (np.ndarray): N x 12 x 8 x 8 planes
+
+    Returns:
+        np.ndarray: N x 2 x 8 x 8 int8 counts, white attackers first
+    """
+    return _batched_attack_terms(planes)[0]
+
+
+def mobility(planes: np.ndarray) -> np.ndarray:
+    """
+    Squares reachable by the knights, bishops, rooks and queens of each colour, counted once
+    per piece, squares of the colour's own pieces excluded
+
+    Args:
+        planes (np.ndarray): N x 12 x 8 x 8 planes
+
+    Returns:
+        np.ndarray: N x 2 int32 counts, white first
+    """
+    return _batched_attack_terms(planes)[1]
+
+
+def king_attacks(planes: np.ndarray, attack_counts: np.ndarray | None = None) -> np.ndarray:
+    """
+    Enemy attacks on each king's square and the squares around it, a simple king danger measure
+
+    Args:
+        planes (np.ndarray): N x 12 x 8 x 8 planes
+        attack_counts (np.ndarray | None): attacks(planes), if already computed
+
+    Returns:
+        np.ndarray: N x 2 int32 attack counts against the white king and the black king
+    """
+    if attack_counts is None:
+        attack_counts = attacks(planes)
+    counts = []
+    for king_plane, enemy in ((_KING, 1), (6 + _KING, 0)):
+        king = planes[:, king_plane].astype(np.int8)
+        zone = (king + _step_attacks(king, KING_OFFSETS)) > 0
+        counts.append((attack_counts[:, enemy] * zone).sum(axis=(1, 2), dtype=np.int32))
+    return np.stack(counts, axis=1)
+
+
+def evaluation_terms(planes: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Every evaluation term of every position (see the module docstring)
+
+    Args:
+        planes (np.ndarray): N x 12 x 8 x 8 planes
+
+    Returns:
+        dict[str, np.ndarray]: material, piece_square, attacks, mobility and king_attacks arrays
+    """
+    attack_counts, mobility_counts = _batched_attack_terms(planes)
+    return {
+        "material": material(planes),
+        "piece_square": piece_square(planes),
+        "attacks": attack_counts,
+        "mobility": mobility_counts,
+        "king_attacks": king_attacks(planes, attack_counts),
+    }
+
+
+def save_planes(path: str, planes: np.ndarray, white_to_move: np.ndarray, **labels):
+    """
+    Write planes as training data, compressed, in NumPy .npz format
+
+    Args:
+        path (str): Output file
+        planes (np.ndarray): N x 12 x 8 x 8 planes
+        white_to_move (np.ndarray): N bools
+        **labels: Further N-row arrays to store with them, e.g. scores or game results
+    """
+    np.savez_compressed(path, planes=planes, white_to_move=white_to_move, **labels)
+
+
+def load_planes(path: str) -> dict[str, np.ndarray]:
+    """
+    Read a file written by save_planes
+
+    Returns:
+        dict[str, np.ndarray]: "planes", "white_to_move" and the labels saved with them
+    """
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
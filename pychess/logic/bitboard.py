@@ -0,0 +1,197 @@
+"""
+Bitboard position representation for ChessLogic.
+
+Squares are numbered 0-63 as row * 8 + col, using the same (row, col) layout as
+ChessLogic.board (row 0 is rank 8, col 0 is file a). Bit n of a bitboard is set
+when square n is part of the set.
+"""
+
+PIECES = "PNBRQKpnbrqk"
+
+ROOK_DIRECTIONS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+BISHOP_DIRECTIONS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+KNIGHT_OFFSETS = ((-2, -1), (-2, 1), (-1, -2), (-1, 2), (1, -2), (1, 2), (2, -1), (2, 1))
+KING_OFFSETS = ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+
+
+def _offset_mask(square: int, offsets) -> int:
+    row, col = divmod(square, 8)
+    mask = 0
+    for row_step, col_step in offsets:
+        if 0 <= row + row_step < 8 and 0 <= col + col_step < 8:
+            mask |= 1 << ((row + row_step) * 8 + col + col_step)
+    return mask
+
+
+# Precomputed masks of the squares strictly between two aligned squares
+# (same row, column or diagonal). Unaligned pairs map to 0.
+BETWEEN = [[0] * 64 for _ in range(64)]
+
+# RAYS[direction][square] -> every square from square (exclusive) to the edge of the board
+RAYS = {direction: [0] * 64 for direction in KING_OFFSETS}
+
+for _start in range(64):
+    _start_row, _start_col = divmod(_start, 8)
+    for _row_step, _col_step in KING_OFFSETS:
+        _mask = 0
+        _row, _col = _start_row + _row_step, _start_col + _col_step
+        while 0 <= _row < 8 and 0 <= _col < 8:
+            BETWEEN[_start][_row * 8 + _col] = _mask
+            _mask |= 1 << (_row * 8 + _col)
+            _row += _row_step
+            _col += _col_step
+        RAYS[(_row_step, _col_step)][_start] = _mask
+
+KNIGHT_ATTACKS = [_offset_mask(square, KNIGHT_OFFSETS) for square in range(64)]
+KING_ATTACKS = [_offset_mask(square, KING_OFFSETS) for square in range(64)]
+
+# PAWN_ATTACKS[color][square] -> squares a pawn of that colour on square attacks
+PAWN_ATTACKS = {
+    "w": [_offset_mask(square, ((-1, -1), (-1, 1))) for square in range(64)],
+    "b": [_offset_mask(square, ((1, -1), (1, 1))) for square in range(64)],
+}
+
+
+def slider_attacks(square: int, occupied: int, directions) -> int:
+    """
+    Squares attacked by a sliding piece, stopping at (and including) the first blocker on each ray
+
+    Args:
+        square (int): Square index of the sliding piece
+        occupied (int): Occupancy bitboard
+        directions: Ray directions the piece slides along
+
+    Returns:
+        int: Bitboard of attacked squares
+    """
+    attacks = 0
+    for direction in directions:
+        ray = RAYS[direction][square]
+        blockers = ray & occupied
+        if blockers:
+            # Rays pointing to higher indices hit their lowest blocker first
+            if direction > (0, 0):
+                first = (blockers & -blockers).bit_length() - 1
+            else:
+                first = blockers.bit_length() - 1
+            ray ^= RAYS[direction][first]
+        attacks |= ray
+    return attacks
+
+
+def piece_attacks(square: int, piece: str, occupied: int) -> int:
+    """
+    Squares attacked by a piece standing on square
+
+    Args:
+        square (int): Square index of the piece
+        piece (str): Piece letter
+        occupied (int): Occupancy bitboard, used to stop sliding pieces
+
+    Returns:
+        int: Bitboard of attacked squares, occupied or not
+    """
+    kind = piece.lower()
+    if kind == "p":
+        return PAWN_ATTACKS["w" if piece.isupper() else "b"][square]
+    if kind == "n":
+        return KNIGHT_ATTACKS[square]
+    if kind == "k":
+        return KING_ATTACKS[square]
+    if kind == "b":
+        return slider_attacks(square, occupied, BISHOP_DIRECTIONS)
+    if kind == "r":
+        return slider_attacks(square, occupied, ROOK_DIRECTIONS)
+    return slider_attacks(square, occupied, KING_OFFSETS)
+
+
+def iter_bits(bitboard: int):
+    """
+    Iterate over the square indices of all set bits, lowest first
+
+    Args:
+        bitboard (int): The bitboard to iterate
+
+    Yields:
+        int: Square index of each set bit
+    """
+    while bitboard:
+        lowest = bitboard & -bitboard
+        yield lowest.bit_length() - 1
+        bitboard ^= lowest
+
+
+class BitboardPosition:
+    __slots__ = ("occupancy", "mailbox", "_view")
+
+    def __init__(self, rows: list[list[str]]):
+        """
+        Position stored as a 64 entry mailbox plus one occupancy bitboard per
+        colour, so pieces() walks only the set bits. Attack and move queries
+        run on ChessLogic's AttackMap, which keeps its own bitboards.
+
+        Args:
+            rows (list[list[str]]): 8x8 grid in ChessLogic.board format
+        """
+        self.occupancy = {"w": 0, "b": 0}
+        self.mailbox = [""] * 64
+        self._view = None
+
+        for row in range(8):
+            for col in range(8):
+                if rows[row][col] != "":
+                    self.set_piece(row, col, rows[row][col])
+
+    @property
+    def board(self) -> tuple[tuple[str, ...], ...]:
+        """
+        Read-only 8x8 view of the position in ChessLogic.board format.
+        The view is rebuilt lazily, at most once per change.
+        """
+        if self._view is None:
+            mailbox = self.mailbox
+            self._view = tuple(tuple(mailbox[row * 8:row * 8 + 8]) for row in range(8))
+        return self._view
+
+    def piece_at(self, row: int, col: int) -> str:
+        """
+        Get the piece on a square
+
+        Args:
+            row, col: The square to look up.
+
+        Returns:
+            str: Piece letter, or '' if the square is empty
+        """
+        return self.mailbox[row * 8 + col]
+
+    def set_piece(self, row: int, col: int, piece: str):
+        """
+        Place a piece on a square, replacing whatever was there
+
+        Args:
+            row, col: The square to update.
+            piece (str): Piece letter, or '' to clear the square
+        """
+        square = row * 8 + col
+        bit = 1 << square
+        old_piece = self.mailbox[square]
+        if old_piece != "":
+            self.occupancy["w" if old_piece.isupper() else "b"] ^= bit
+        if piece != "":
+            self.occupancy["w" if piece.isupper() else "b"] |= bit
+        self.mailbox[square] = piece
+        self._view = None
+
+    def pieces(self, color: str) -> list[tuple[int, int, str]]:
+        """
+        List every piece of the given colour
+
+        Args:
+            color (str): 'w' for white, 'b' for black.
+
+        Returns:
+            list[tuple[int, int, str]]: (row, col, piece) for each piece
+        """
+        mailbox = self.mailbox
+        return [(square >> 3, square & 7, mailbox[square]) for square in iter_bits(self.occupancy[color])]
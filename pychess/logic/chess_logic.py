@@ -1,8 +1,47 @@
+import copy
+from array import array
+
+from logic.attack_map import AttackMap, SLIDERS
+from logic.bitboard import BETWEEN, KING_OFFSETS, iter_bits, piece_attacks
+from logic.fen import format_fen, parse_fen
+from logic.instrumentation import get_logger, timed
+from logic.move_delta import MoveDelta
+from logic.move_encoding import CASTLING, EN_PASSANT, NORMAL, encode_move
+from logic.position import POSITION_BACKENDS
+from logic.zobrist import PIECE_KEYS, SIDE_KEY, castling_key, en_passant_key, hash_position
+
+# Castling right lost when a piece leaves or is captured on each rook/king home square
+CASTLING_SQUARES = {
+    (7, 4): "KQ",
+    (7, 7): "K",
+    (7, 0): "Q",
+    (0, 4): "kq",
+    (0, 7): "k",
+    (0, 0): "q",
+}
+
+PROMOTION_PIECES = "qrbn"
+
+KEYFRAME_INTERVAL = 16  # Plies between position snapshots; seek replays at most this many moves
+
+logger = get_logger("logic")
+
+
 class ChessLogic:
-    def __init__(self):
+    # Slots keep the per-game footprint small when many games are hosted at once
+    __slots__ = ("last_pawn_move", "turn", "castling_rights", "_legal_moves", "_undo_stack", "move_history",
+                 "halfmove_clock", "fullmove_number", "position", "_attack_map", "zobrist_key", "hash_history",
+                 "result", "_subscribers", "_keyframes", "_redo")
+
+    def __init__(self, backend: str = "list"):
         """
         Initalize the ChessLogic Object. External fields are board and result
 
+        backend -> Position storage, the rules run on the AttackMap either way
+            list - Two Dimensional List of strings (default)
+
+            bitboard - Mailbox plus per colour occupancy bitboards, see logic/bitboard.py
+
         board -> Two Dimensional List of string Representing the Current State of the Board
             P, R, N, B, Q, K - White Pieces
 
@@ -18,13 +57,18 @@ class ChessLogic:
             d - Draw
 
             '' - Game In Progress
-        """
-        
-        self.last_pawn_move = None  # Stores the last move that could trigger en passant
 
-        self.move_history = []  # Stores move strings like "e2e4"
+        turn -> The colour to move next, 'w' or 'b'
+
+        zobrist_key -> 64-bit hash of the position (pieces, side to move, castling rights and
+            en passant), kept up to date by every move. Usable as a key for caches and
+            transposition tables, see logic/zobrist.py
 
-        self.board = [
+        Moves taken back with undo() or seek() are kept, so seek() can go forward again until
+        a different move is played. A snapshot of the position every KEYFRAME_INTERVAL plies
+        lets seek() jump anywhere in the game replaying at most that many moves.
+        """
+        self._setup(backend, [
 			['r', 'n', 'b', 'q', 'k', 'b', 'n', 'r'],
 			['p', 'p', 'p', 'p', 'p', 'p', 'p', 'p'],
 			['','','','','','','',''],
@@ -33,248 +77,879 @@ class ChessLogic:
 			['','','','','','','',''],
 			['P', 'P', 'P', 'P', 'P', 'P', 'P', 'P'],
 			['R', 'N', 'B', 'Q', 'K', 'B', 'N', 'R'],
-		]
-        self.result = "" 
-        # Debugging Output
-        print("Initial Board State:")
-        for row in self.board:
-            print(row)
+		], "w", "KQkq", None, 0, 1)
+        logger.debug("Initial Board State:\n%s", "\n".join(str(row) for row in self.board))
+
+    @classmethod
+    def from_fen(cls, fen: str, backend: str = "list") -> "ChessLogic":
+        """
+        Create a ChessLogic object directly from a FEN position, without any console output
+
+        Args:
+            fen (str): Position in FEN (e.g., "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1")
+            backend (str): Position representation, see __init__
+
+        Raises:
+            ValueError: If the FEN is malformed or the backend is unknown
+
+        Returns:
+            ChessLogic: Game starting from the given position
+        """
+        logic = cls.__new__(cls)
+        logic._setup(backend, *parse_fen(fen))
+        return logic
+
+    def to_fen(self) -> str:
+        """
+        Export the current position as FEN
+
+        Returns:
+            str: Position in FEN, including side to move, castling rights, en passant square and move clocks
+        """
+        return format_fen(self.board, self.turn, self.castling_rights, self.last_pawn_move,
+                          self.halfmove_clock, self.fullmove_number)
+
+    def copy(self) -> "ChessLogic":
+        """
+        Independent copy of the game, history included, e.g. for a search on another thread.
+        Subscribers are not copied.
+
+        Returns:
+            ChessLogic: Game in the same state that can be changed without affecting this one
+        """
+        return copy.deepcopy(self)
+
+    def __getstate__(self):
+        # Subscribers belong to this object's owner (e.g. the GUI), not to copies or pickles
+        state = {name: getattr(self, name) for name in self.__slots__}
+        state["_subscribers"] = []
+        return state
+
+    def __setstate__(self, state):
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    def _setup(self, backend: str, rows: list[list[str]], turn: str, castling_rights: str,
+               last_pawn_move: tuple[int, int] | None, halfmove_clock: int, fullmove_number: int):
+        """
+        Initialise every field of the game for the given position
+        """
+        self.last_pawn_move = last_pawn_move  # Stores the last move that could trigger en passant
+
+        self.turn = turn
+
+        self.castling_rights = castling_rights  # Remaining castling rights in FEN order, '' when none are left
+
+        self._legal_moves = None  # Legal moves of the side to move, cached until the position changes
+
+        self._undo_stack = []  # One record per move made, popped by unmake_move
+
+        self.move_history = []  # Stores move strings like "e2e4"
+
+        self.halfmove_clock = halfmove_clock  # Plies since the last capture or pawn move
+
+        self.fullmove_number = fullmove_number  # Starts at 1, increased after every black move
+
+        if backend not in POSITION_BACKENDS:
+            raise ValueError(f"Unknown position backend: {backend}")
+
+        self.position = POSITION_BACKENDS[backend](rows)
+        self._attack_map = None  # Built on first use, see attack_map
+        self.zobrist_key = hash_position(self.position, self.turn, self.castling_rights, self.last_pawn_move)
+        self.hash_history = [self.zobrist_key]  # Key of every position reached, one per ply
+        self.result = ""
+        self._subscribers = []  # Callbacks receiving a MoveDelta after every make_move/unmake_move
+        self._keyframes = [self._snapshot()]  # Snapshot of every KEYFRAME_INTERVAL-th ply, see seek
+        # Moves after the current ply kept by seek, the next one last:
+        # (undo record, notation, Zobrist key before, Zobrist key after)
+        self._redo = []
+
+    @property
+    def board(self):
+        """
+        Read-only view of the current position as an 8x8 grid of piece strings
+        """
+        return self.position.board
+
+    @property
+    def attack_map(self) -> AttackMap:
+        """
+        King squares and attacked squares of both colours, see logic/attack_map.py.
+        Built the first time it is needed and then updated incrementally as the board
+        changes, so positions that are only loaded and exported never pay for it.
+        """
+        if self._attack_map is None:
+            self._attack_map = AttackMap(self.position)
+        return self._attack_map
+
+    def _set_piece(self, row: int, col: int, piece: str):
+        """
+        Change one square of the board, keeping the attack map and Zobrist key in sync.
+        Every board update in ChessLogic goes through here.
 
+        Args:
+            row, col: The square to update.
+            piece (str): Piece letter, or '' to clear the square
+        """
+        old_piece = self.position.piece_at(row, col)
+        if old_piece != "":
+            self.zobrist_key ^= PIECE_KEYS[old_piece][row * 8 + col]
+        if piece != "":
+            self.zobrist_key ^= PIECE_KEYS[piece][row * 8 + col]
+        self.position.set_piece(row, col, piece)
+        if self._attack_map is not None:
+            self._attack_map.update(row * 8 + col, piece)
+
+    @timed("ChessLogic.play_move")
     def play_move(self, move: str) -> str:
         """
         Function to execute a valid move by updating the board.
 
         Args:
-            move (str): Move in chess notation (e.g., "e2e4").
+            move (str): Move in chess notation (e.g., "e2e4"). A fifth letter picks the
+                promotion piece (e.g., "e7e8n"), otherwise pawns promote to a queen.
 
         Returns:
             str: Move in extended chess notation if valid, empty string if invalid.
         """
-        if len(move) != 4:
+        if self.result != "":
+            logger.info("Invalid Move: The game is over.")
             return ""
 
-        # Convert chess notation to board indices
-        start_col = ord(move[0]) - ord('a')
-        start_row = 8 - int(move[1])
-        end_col = ord(move[2]) - ord('a')
-        end_row = 8 - int(move[3])
-
-        # print(f"Parsed Move: {move} -> Start: ({start_row}, {start_col}), End: ({end_row}, {end_col})")
+        parsed = self.parse_move(move)
+        if parsed is None:
+            logger.info("Invalid Move: Cannot parse %r.", move)
+            return ""
+        start_row, start_col, end_row, end_col, promotion = parsed
 
         # Get the piece at the starting position
-        piece = self.board[start_row][start_col]
+        piece = self.position.piece_at(start_row, start_col)
 
         # Ensure a piece exists at the starting position
         if piece == "":
-            print("Invalid Move: No piece at the starting position.")
+            logger.info("Invalid Move: No piece at the starting position.")
             return ""
 
-        # Ensure the move is legal
-        if not self.is_valid_piece_move(piece, start_row, start_col, end_row, end_col):
-            print("Invalid Move: Illegal movement for this piece.")
+        if ("w" if piece.isupper() else "b") != self.turn:
+            logger.info("Invalid Move: It is not this player's turn.")
             return ""
 
-        # Ensure path is clear for non-knight pieces BEFORE updating the board
-        if piece.lower() != "n" and not self.is_path_clear(start_row, start_col, end_row, end_col):
-            print("Invalid Move: Path is blocked.")
+        # Ensure the move is legal
+        parsed = self._default_promotion(parsed)
+        promotion = parsed[4]
+        if parsed not in self.legal_move_set():
+            logger.info("Invalid Move: Illegal move for this position.")
             return ""
-        
-        # Get the piece at the destination square
-        target_piece = self.board[end_row][end_col]
 
-        # Prevent moving onto a friendly piece
-        if target_piece != "" and piece.isupper() == target_piece.isupper():
-            print("Invalid Move: Cannot capture own piece.")
-            return ""
-        
-        # Check if the move is an En Passant capture
-        if piece.lower() == "p" and target_piece == "" and start_col != end_col:
-            if self.last_pawn_move and self.last_pawn_move == (start_row, end_col):
-                print(f"En Passant executed: {move}")
-                self.board[start_row][end_col] = ""  # Remove captured pawn
+        self._leave_line(parsed)
+        notation = self.make_move(parsed)
+        self._record_keyframe()
+        _, piece, target_piece, en_passant = self._undo_stack[-1][:4]
+
+        if notation.startswith("O"):
+            logger.debug("Castling executed: %s", notation)
+        if en_passant:
+            logger.debug("En Passant executed: %s", move)
+        if promotion != "":
+            logger.debug("Pawn promoted at %s!", move[2:4])
+        if target_piece != "" and not en_passant:
+            logger.debug("%s captured %s at %s", piece, target_piece, move[2:4])
+
+        self._update_result()
+
+        if notation.startswith("O"):
+            return notation
+        return move
+
+    def play_legal_move(self, move: tuple[int, int, int, int, str]) -> str:
+        """
+        Play a move already known to be legal, e.g. taken from legal_move_set(),
+        without play_move's parsing and checks
+
+        Args:
+            move (tuple): (start_row, start_col, end_row, end_col, promotion) from legal_move_set()
+
+        Returns:
+            str: Move in extended chess notation ("O-O"/"O-O-O" for castling)
+        """
+        self._leave_line(move)
+        notation = self.make_move(move)
+        self._record_keyframe()
+        self._update_result()
+        return notation
+
+    def legal_move(self, move: str) -> tuple[int, int, int, int, str] | None:
+        """
+        The move play_move would play for a move string, without playing it
+
+        Args:
+            move (str): Move in play_move notation; pawns reaching the last rank promote to a queen
+                unless a fifth letter says otherwise
+
+        Returns:
+            tuple | None: (start_row, start_col, end_row, end_col, promotion), None if the move is not legal
+                (or the game is over)
+        """
+        parsed = self.parse_move(move)
+        if parsed is None or self.result != "":
+            return None
+        parsed = self._default_promotion(parsed)
+        return parsed if parsed in self.legal_move_set() else None
+
+    def _default_promotion(self, move: tuple[int, int, int, int, str]) -> tuple[int, int, int, int, str]:
+        # Pawns reaching the last rank auto-promote to a queen unless told otherwise
+        start_row, start_col, end_row, end_col, promotion = move
+        if promotion == "" and (end_row == 0 or end_row == 7) and \
+                self.position.piece_at(start_row, start_col) in ("P", "p"):
+            return start_row, start_col, end_row, end_col, "q"
+        return move
+
+    def parse_move(self, move: str) -> tuple[int, int, int, int, str] | None:
+        """
+        Convert a move string into board indices
+
+        Args:
+            move (str): Move in chess notation (e.g., "e2e4" or "e7e8q").
+
+        Returns:
+            tuple | None: (start_row, start_col, end_row, end_col, promotion) or None if the string is malformed
+        """
+        if len(move) not in (4, 5):
+            return None
+        if move[0] not in "abcdefgh" or move[2] not in "abcdefgh" or move[1] not in "12345678" or move[3] not in "12345678":
+            return None
+        promotion = move[4:].lower()
+        if promotion != "" and promotion not in PROMOTION_PIECES:
+            return None
+
+        # Convert chess notation to board indices
+        start_col = ord(move[0]) - ord('a')
+        start_row = 8 - int(move[1])
+        end_col = ord(move[2]) - ord('a')
+        end_row = 8 - int(move[3])
+        return (start_row, start_col, end_row, end_col, promotion)
+
+    def move_to_notation(self, move: tuple[int, int, int, int, str]) -> str:
+        """
+        Convert a move tuple from generate_legal_moves into chess notation
+
+        Args:
+            move (tuple): (start_row, start_col, end_row, end_col, promotion)
+
+        Returns:
+            str: Move in chess notation (e.g., "e2e4" or "e7e8q")
+        """
+        start_row, start_col, end_row, end_col, promotion = move
+        columns = "abcdefgh"
+        return f"{columns[start_col]}{8 - start_row}{columns[end_col]}{8 - end_row}{promotion}"
+
+    @property
+    def last_move(self) -> tuple[int, int, int, int, str] | None:
+        """
+        The last move made, as (start_row, start_col, end_row, end_col, promotion), None if no move was made
+        """
+        return self._undo_stack[-1][0] if self._undo_stack else None
+
+    def packed_moves(self) -> array:
+        """
+        Every move played in this game as 16-bit codes, see logic/move_encoding.py
+
+        Returns:
+            array: array('H') of move codes in playing order, with castling and en passant flagged
+        """
+        codes = array("H")
+        for record in self._undo_stack:
+            move, piece, _, en_passant = record[:4]
+            flag = NORMAL
+            if en_passant:
+                flag = EN_PASSANT
+            elif piece in "Kk" and abs(move[1] - move[3]) == 2:
+                flag = CASTLING
+            codes.append(encode_move(move, flag))
+        return codes
+
+    def make_move(self, move: tuple[int, int, int, int, str]) -> str:
+        """
+        Play a move without validating it and push an undo record so unmake_move can take it back.
+
+        The move must be legal in the current position, e.g. taken from generate_legal_moves.
+        Game end is not evaluated here; play_move does that on top of make_move.
+
+        Args:
+            move (tuple): (start_row, start_col, end_row, end_col, promotion)
+
+        Returns:
+            str: Move in extended chess notation ("O-O"/"O-O-O" for castling)
+        """
+        start_row, start_col, end_row, end_col, promotion = move
+        piece = self.position.piece_at(start_row, start_col)
+        target_piece = self.position.piece_at(end_row, end_col)
+        en_passant = piece in "Pp" and target_piece == "" and start_col != end_col
+        captured = self.position.piece_at(start_row, end_col) if en_passant else target_piece
+
+        # Undo record: move, moved piece, captured piece, en passant flag and the state the move overwrites
+        self._undo_stack.append((move, piece, captured, en_passant, self.last_pawn_move, self.castling_rights,
+                                 self.result, self.halfmove_clock))
+
+        # Take the old en passant and castling state out of the key before the board changes
+        self.zobrist_key ^= en_passant_key(self.position, self.last_pawn_move) ^ castling_key(self.castling_rights)
+
+        # Check if move is a castling move
+        if piece in "Kk" and abs(start_col - end_col) == 2:
+            notation = self.handle_castling(piece, start_row, start_col, end_row, end_col)
+        else:
+            notation = self.move_to_notation(move)
+            if en_passant:
+                self._set_piece(start_row, end_col, "")  # Remove captured pawn
+
+            # Promote the pawn to the chosen piece
+            if promotion != "":
+                self._set_piece(end_row, end_col, promotion.upper() if piece.isupper() else promotion)
             else:
-                print("Invalid Move: En Passant not possible.")
-                return ""
-        
-        # Reset last pawn move before checking
-        self.last_pawn_move = None  
+                self._set_piece(end_row, end_col, piece)
+            self._set_piece(start_row, start_col, "")
+
+        # Moving the king or a rook, or capturing a rook at home, removes castling rights
+        if self.castling_rights:
+            for square in ((start_row, start_col), (end_row, end_col)):
+                for right in CASTLING_SQUARES.get(square, ""):
+                    self.castling_rights = self.castling_rights.replace(right, "")
 
         # Track last pawn move for En Passant
-        if piece.lower() == "p" and abs(start_row - end_row) == 2:
+        self.last_pawn_move = None
+        if piece in "Pp" and abs(start_row - end_row) == 2:
             self.last_pawn_move = (end_row, end_col)  # Store new position of moved pawn
-            print(f"Last pawn move recorded for En Passant: {self.last_pawn_move}")
 
-        # Check if a pawn is reaching the last rank for promotion
-        if piece.lower() == "p" and (end_row == 0 or end_row == 7):
-            print(f"Pawn promoted at {move[2:]}!")
-            piece = "Q" if piece.isupper() else "q"  # Auto-promote to queen
-        
-        # Capture message if an enemy piece is captured
-        if target_piece != "":
-            print(f"{piece} captured {target_piece} at {move[2:]}")
+        # Captures and pawn moves can never be repeated
+        if piece in "Pp" or captured != "":
+            self.halfmove_clock = 0
+        else:
+            self.halfmove_clock += 1
+
+        self.zobrist_key ^= en_passant_key(self.position, self.last_pawn_move) ^ castling_key(self.castling_rights) ^ SIDE_KEY
+        self.hash_history.append(self.zobrist_key)
+
+        self.move_history.append(notation)
+        if self.turn == "b":
+            self.fullmove_number += 1
+        self.turn = "b" if self.turn == "w" else "w"
+        self._legal_moves = None
+        if self._subscribers:
+            self._publish(MoveDelta(self._undo_stack[-1], undo=False))
+        return notation
 
-        # Check if move is a castling attempt
-        if piece.lower() == "k" and abs(start_col - end_col) == 2:
-            return self.handle_castling(piece, start_row, start_col, end_row, end_col)
-        
-        # Backup board state before making the move
-        original_piece = self.board[end_row][end_col]
-        self.board[end_row][end_col] = piece  # Simulate the move
-        self.board[start_row][start_col] = ""
-
-        # Check if the move puts the player in check
-        if self.is_king_in_check("w" if piece.isupper() else "b"):
-            print("Invalid Move: This move puts your king in check.")
-            # Undo the move
-            self.board[start_row][start_col] = piece
-            self.board[end_row][end_col] = original_piece
-            return ""
+    def unmake_move(self) -> tuple[int, int, int, int, str] | None:
+        """
+        Take back the last move made with make_move or play_move in O(1)
 
-        # If move is valid, finalize the board update
-        self.board[end_row][end_col] = piece
-        self.board[start_row][start_col] = ""
-
-        # Print board update confirmation
-        print("Board Updated:")
-        # for row in self.board:
-        #     print(row)
-
-        # Check if opponent is in checkmate
-        opponent_color = "w" if piece.islower() else "b"
-        if self.is_checkmate(opponent_color):
-            self.result = opponent_color  # 'w' if White wins, 'b' if Black wins
-            print(f"Checkmate! {'White' if self.result == 'w' else 'Black'} wins!")
-            return move
-        
-        if self.is_stalemate(opponent_color):
-            self.result = "d"  # Draw
-            print("Stalemate! The game is a draw.")
-            return move
-        
-        return move 
+        Returns:
+            tuple | None: The move that was taken back, None if there is nothing to undo
+        """
+        if not self._undo_stack:
+            return None
+        record = self._undo_stack.pop()
+        move, piece, captured, en_passant, last_pawn_move, castling_rights, result, halfmove_clock = record
+        start_row, start_col, end_row, end_col, _ = move
+
+        if piece in "Kk" and abs(start_col - end_col) == 2:
+            # Put the castled rook back in its corner
+            kingside = end_col > start_col
+            self._set_piece(start_row, 5 if kingside else 3, "")
+            self._set_piece(start_row, 7 if kingside else 0, "R" if piece.isupper() else "r")
+
+        self._set_piece(start_row, start_col, piece)
+        if en_passant:
+            self._set_piece(end_row, end_col, "")
+            self._set_piece(start_row, end_col, captured)
+        else:
+            self._set_piece(end_row, end_col, captured)
+
+        self.last_pawn_move = last_pawn_move
+        self.castling_rights = castling_rights
+        self.result = result
+        self.halfmove_clock = halfmove_clock
+        self.hash_history.pop()
+        self.zobrist_key = self.hash_history[-1]
+        self.move_history.pop()
+        self.turn = "b" if self.turn == "w" else "w"
+        if self.turn == "b":
+            self.fullmove_number -= 1
+        self._legal_moves = None
+        if self._subscribers:
+            self._publish(MoveDelta(record, undo=True))
+        return move
+
+    @property
+    def line_length(self) -> int:
+        """
+        Plies of the game, including the moves after the current ply kept by undo and seek
+        """
+        if self._redo and self._redo[-1][2] != self.zobrist_key:
+            return len(self.move_history)  # The game was changed with make_move/unmake_move since
+        return len(self.move_history) + len(self._redo)
 
+    def undo(self) -> bool:
+        """
+        Take back the last move, keeping it so seek can play it again
 
+        Returns:
+            bool: False if there is no move to take back
+        """
+        return len(self.move_history) > 0 and self.seek(len(self.move_history) - 1)
 
-    def is_valid_piece_move(self, piece, start_row, start_col, end_row, end_col):
+    @timed("ChessLogic.seek")
+    def seek(self, ply: int) -> bool:
         """
-        Checks if the move follows the basic movement rules of the given piece.
+        Go to any ply of the game, backwards or forwards along the moves played.
+
+        Short distances are made or taken back move by move. Longer jumps restore the nearest
+        keyframe at or before the ply and replay fewer than KEYFRAME_INTERVAL moves from it;
+        subscribers then receive a single MoveDelta with every square that changed.
+        Playing a move other than the next one of the game afterwards drops the rest of it.
 
         Args:
-            piece (str): The piece being moved.
-            start_row, start_col: The starting position.
-            end_row, end_col: The target position.
+            ply (int): Number of moves played from the starting position, 0 to line_length
 
         Returns:
-            bool: True if the move is valid, False otherwise.
+            bool: False (and nothing changes) if the game has no such ply
         """
-        row_diff = abs(end_row - start_row)
-        col_diff = abs(end_col - start_col)
+        current = len(self.move_history)
+        if self._redo and self._redo[-1][2] != self.zobrist_key:
+            self._leave_line(None)  # The game was changed with make_move/unmake_move since
+        if not 0 <= ply <= current + len(self._redo):
+            return False
 
-        # Pawn Movement (Basic)
-        if piece.lower() == "p":
-            direction = -1 if piece.isupper() else 1  # White moves up (-1), Black moves down (+1)
-            
-            # Standard pawn move (1 square forward)
-            if start_col == end_col and row_diff == 1 and (end_row - start_row) == direction:
-                return True
+        index = min(ply // KEYFRAME_INTERVAL, len(self._keyframes) - 1)
+        while index > 0 and self._keyframes[index][0] != self._line_key(index * KEYFRAME_INTERVAL):
+            del self._keyframes[index:]  # Taken on a line that was replaced without play_move
+            index -= 1
+        base = index * KEYFRAME_INTERVAL
+
+        if abs(ply - current) <= ply - base or self._keyframes[index][0] != self._line_key(base):
+            while len(self.move_history) > ply:
+                self._step_back()
+        else:
+            before = self.position.board
+            subscribers, self._subscribers = self._subscribers, []  # One delta for the whole jump
+            try:
+                self._move_line_to(base)
+                self._restore(self._keyframes[index])
+                while len(self.move_history) < ply:
+                    self._step_forward()
+            finally:
+                self._subscribers = subscribers
+            if subscribers:
+                self._publish(MoveDelta.from_boards(before, self.position.board))
+        while len(self.move_history) < ply:
+            self._step_forward()
+
+        if self._redo:
+            self.result = ""
+        else:
+            self._update_result()  # Back at the end of the game
+        return True
+
+    def _line_key(self, ply: int) -> int:
+        # Zobrist key of a ply of the game line, before or after the current ply
+        current = len(self.move_history)
+        if ply <= current:
+            return self.hash_history[ply]
+        if ply == current + len(self._redo):
+            return self._redo[0][3]
+        return self._redo[current - ply - 1][2]
+
+    def _step_back(self):
+        record = self._undo_stack[-1]
+        entry = (record, self.move_history[-1], self.hash_history[-2], self.hash_history[-1])
+        self.unmake_move()
+        self._redo.append(entry)
+
+    def _step_forward(self):
+        self.make_move(self._redo.pop()[0][0])
+        self._record_keyframe()
+
+    def _move_line_to(self, ply: int):
+        """
+        Move the history lists to end at ply without touching the position, the records of the
+        moves crossed going to or coming from _redo
+        """
+        current = len(self.move_history)
+        if ply < current:
+            self._redo.extend(zip(reversed(self._undo_stack[ply:]), reversed(self.move_history[ply:]),
+                                  reversed(self.hash_history[ply:-1]), reversed(self.hash_history[ply + 1:])))
+            del self._undo_stack[ply:], self.move_history[ply:], self.hash_history[ply + 1:]
+        elif ply > current:
+            crossed = self._redo[current - ply:]
+            del self._redo[current - ply:]
+            for record, notation, _, key_after in reversed(crossed):
+                self._undo_stack.append(record)
+                self.move_history.append(notation)
+                self.hash_history.append(key_after)
+
+    def _snapshot(self) -> tuple:
+        """
+        Compact copy of the current position: Zobrist key, the board as a 64 character string
+        ('.' for empty squares) and the state fields a FEN also holds
+        """
+        board = "".join(piece or "." for row in self.position.board for piece in row)
+        return (self.zobrist_key, board, self.turn, self.castling_rights, self.last_pawn_move,
+                self.halfmove_clock, self.fullmove_number)
 
-            # Initial 2-square pawn move
-            if start_col == end_col and row_diff == 2 and (start_row == 6 or start_row == 1):
-                return True
-            
-            # Allow En Passant capture
-            if self.board[end_row][end_col] == "" and start_col != end_col and self.last_pawn_move == (start_row, end_col):
-                return True  
+    def _restore(self, snapshot: tuple):
+        """
+        Replace the position with a snapshot; the history lists are the caller's business
+        """
+        key, board, self.turn, self.castling_rights, self.last_pawn_move, self.halfmove_clock, \
+            self.fullmove_number = snapshot
+        rows = [[piece if piece != "." else "" for piece in board[row * 8:row * 8 + 8]] for row in range(8)]
+        self.position = type(self.position)(rows)
+        self.zobrist_key = key
+        self.result = ""
+        self._attack_map = None
+        self._legal_moves = None
+
+    def _record_keyframe(self):
+        """
+        Snapshot the position if the current ply is a keyframe ply and not snapshot yet
+        """
+        ply = len(self.move_history)
+        if ply % KEYFRAME_INTERVAL:
+            return
+        index = ply // KEYFRAME_INTERVAL
+        if index == len(self._keyframes):
+            self._keyframes.append(self._snapshot())
+        elif index < len(self._keyframes) and self._keyframes[index][0] != self.zobrist_key:
+            del self._keyframes[index:]
+            self._keyframes.append(self._snapshot())
+
+    def _leave_line(self, move: tuple[int, int, int, int, str] | None):
+        """
+        Before a move is played: keep the rest of the game if it is the game's next move,
+        otherwise drop the moves and keyframes after the current ply
+        """
+        redo = self._redo
+        if redo and redo[-1][0][0] == move and redo[-1][2] == self.zobrist_key:
+            redo.pop()
+            return
+        if redo:
+            self._redo = []
+        del self._keyframes[len(self.move_history) // KEYFRAME_INTERVAL + 1:]
+
+    def subscribe(self, callback):
+        """
+        Call callback with a MoveDelta (see logic/move_delta.py) after every move made or taken back,
+        including the moves of a search running on this game
 
-            return False
+        Args:
+            callback: Function taking one MoveDelta argument
+        """
+        self._subscribers.append(callback)
 
-        # Knight Movement (L-shape)
-        if piece.lower() == "n":
-            return (row_diff, col_diff) in [(2, 1), (1, 2)]
+    def unsubscribe(self, callback):
+        """
+        Stop calling a callback registered with subscribe
+
+        Args:
+            callback: Function passed to subscribe
+        """
+        self._subscribers.remove(callback)
+
+    def _publish(self, delta: MoveDelta):
+        for callback in self._subscribers:
+            callback(delta)
+
+    def _update_result(self):
+        """
+        Detect checkmate or stalemate for the side to move.
+
+        The legal moves found here are kept as the cache used to validate the next move,
+        so every move costs a single legal move generation pass.
+        """
+        moves = self.generate_legal_moves(self.turn)
+        self._legal_moves = set(moves)
+        if moves:
+            if self.is_threefold_repetition():
+                self.result = "d"  # Draw
+                logger.info("Threefold repetition! The game is a draw.")
+            return
+
+        if self.is_king_in_check(self.turn):
+            self.result = "b" if self.turn == "w" else "w"  # The side that delivered mate wins
+            logger.info("Checkmate! %s wins!", "White" if self.result == "w" else "Black")
+        else:
+            self.result = "d"  # Draw
+            logger.info("Stalemate! The game is a draw.")
 
-        # Rook Movement (Straight lines)
-        if piece.lower() == "r":
-            return start_row == end_row or start_col == end_col  # Moves in a straight line
+    def repetition_count(self) -> int:
+        """
+        Count how often the current position has occurred in this game
 
-        # Bishop Movement (Diagonal)
-        if piece.lower() == "b":
-            return row_diff == col_diff  # Moves diagonally
+        Returns:
+            int: Number of occurrences, including the current one
+        """
+        key = self.zobrist_key
+        history = self.hash_history
+
+        # Only positions since the last capture or pawn move, with the same side to move, can match
+        oldest = max(len(history) - 1 - self.halfmove_clock, 0)
+        count = 1
+        for index in range(len(history) - 3, oldest - 1, -2):
+            if history[index] == key:
+                count += 1
+        return count
+
+    def is_threefold_repetition(self) -> bool:
+        """
+        Determines if the current position has occurred three times.
 
-        # Queen Movement (Diagonal or straight)
-        if piece.lower() == "q":
-            return row_diff == col_diff or start_row == end_row or start_col == end_col
+        Returns:
+            bool: True if the position has been repeated three times, False otherwise.
+        """
+        return self.repetition_count() >= 3
 
-        # King Movement (One square in any direction OR castling)
-        if piece.lower() == "k":
-            if row_diff <= 1 and col_diff <= 1:
-                return True  # Normal one-square move
-            if col_diff == 2 and row_diff == 0:  
-                return True  # Allow castling (checked separately in handle_castling)
-            return False  # Any other move is illegal
+    def legal_move_set(self) -> set:
+        """
+        Legal moves of the side to move, generated once per position and cached until the next move
 
+        Returns:
+            set: Move tuples as produced by generate_legal_moves. Shared with the cache, do not modify.
+        """
+        if self._legal_moves is None:
+            self._legal_moves = set(self.generate_legal_moves(self.turn))
+        return self._legal_moves
 
-    def is_path_clear(self, start_row, start_col, end_row, end_col):
+    @timed("ChessLogic.generate_legal_moves")
+    def generate_legal_moves(self, color: str | None = None) -> list[tuple[int, int, int, int, str]]:
         """
-        Checks if the path between start and end positions is clear for pieces that cannot jump.
+        Enumerate every legal move for the given player, including castling,
+        en passant and one move per promotion piece.
 
         Args:
-            start_row, start_col: The starting position.
-            end_row, end_col: The target position.
+            color (str | None): 'w' for white, 'b' for black. Defaults to the side to move.
 
         Returns:
-            bool: True if the path is clear, False if any piece is blocking the way.
+            list[tuple]: Moves as (start_row, start_col, end_row, end_col, promotion),
+                promotion being one of 'q', 'r', 'b', 'n' or '' for non-promotions
+        """
+        return list(self._iter_legal_moves(color or self.turn))
+
+    def _iter_legal_moves(self, color: str):
+        """
+        Lazily generate the legal moves of color so callers can stop at the first one.
+
+        Only reachable squares are visited for each piece. Pinned pieces are kept on their
+        pin line and, when in check, non-king moves must capture the checker or block it,
+        so apart from en passant no move has to be tried on the board.
         """
-        row_step = 0 if start_row == end_row else (1 if end_row > start_row else -1)
-        col_step = 0 if start_col == end_col else (1 if end_col > start_col else -1)
+        attack_map = self.attack_map
+        enemy = "b" if color == "w" else "w"
+        own = attack_map.occupancy[color]
+        enemies = attack_map.occupancy[enemy]
+
+        king_square = attack_map.king_squares[color]
+        checkers = 0
+        pins = {}
+        if king_square is not None:
+            checkers = attack_map.attackers(king_square, enemy)
+            pins = self._find_pins(king_square, color)
+            yield from self._king_moves(color, king_square, checkers)
+
+            # Double check: only the king can move
+            if checkers & (checkers - 1):
+                return
+
+        # Squares a non-king move has to land on to resolve a single check
+        evasion_mask = ~0
+        if checkers:
+            checker_square = checkers.bit_length() - 1
+            evasion_mask = checkers | BETWEEN[king_square][checker_square]
+
+        mailbox = attack_map.mailbox
+        for square in iter_bits(own):
+            piece = mailbox[square]
+            kind = piece.lower()
+            if kind == "k":
+                continue
+
+            if kind == "p":
+                targets = self._pawn_targets(square, piece, enemies)
+            else:
+                targets = attack_map.attacks_from[square] & ~own
+            targets &= evasion_mask & pins.get(square, ~0)
+
+            row, col = square >> 3, square & 7
+            for target in iter_bits(targets):
+                end_row, end_col = target >> 3, target & 7
+                if kind == "p" and (end_row == 0 or end_row == 7):
+                    for promotion in PROMOTION_PIECES:
+                        yield (row, col, end_row, end_col, promotion)
+                else:
+                    yield (row, col, end_row, end_col, "")
 
-        current_row, current_col = start_row + row_step, start_col + col_step
+        yield from self._en_passant_moves(color)
+
+    def _pawn_targets(self, square: int, piece: str, enemies: int) -> int:
+        """
+        Bitboard of a pawn's push and ordinary capture destinations (en passant excluded)
+        """
+        mailbox = self.attack_map.mailbox
+        step = -8 if piece.isupper() else 8  # White moves up (-1 row), Black moves down (+1 row)
+        start_row = 6 if piece.isupper() else 1
+        targets = self.attack_map.attacks_from[square] & enemies
+
+        if 0 <= square + step < 64 and mailbox[square + step] == "":
+            targets |= 1 << (square + step)
+            if square >> 3 == start_row and mailbox[square + 2 * step] == "":
+                targets |= 1 << (square + 2 * step)
+        return targets
+
+    def _king_moves(self, color: str, king_square: int, checkers: int):
+        """
+        Generate legal king steps and castling moves
+        """
+        attack_map = self.attack_map
+        enemy = "b" if color == "w" else "w"
+        enemy_attacks = attack_map.attacked[enemy]
+        targets = attack_map.attacks_from[king_square] & ~attack_map.occupancy[color] & ~enemy_attacks
+
+        # A sliding checker still attacks the square behind the king, which the king currently hides
+        for checker in iter_bits(checkers):
+            if attack_map.mailbox[checker] in SLIDERS:
+                row_step = (king_square >> 3) - (checker >> 3)
+                col_step = (king_square & 7) - (checker & 7)
+                distance = max(abs(row_step), abs(col_step))
+                behind_row = (king_square >> 3) + row_step // distance
+                behind_col = (king_square & 7) + col_step // distance
+                if 0 <= behind_row < 8 and 0 <= behind_col < 8:
+                    targets &= ~(1 << (behind_row * 8 + behind_col))
+
+        king_row, king_col = king_square >> 3, king_square & 7
+        for target in iter_bits(targets):
+            yield (king_row, king_col, target >> 3, target & 7, "")
+
+        if checkers or self.castling_rights == "":
+            return
+
+        home_row = 7 if color == "w" else 0
+        if (king_row, king_col) != (home_row, 4):
+            return
+        mailbox = attack_map.mailbox
+        home = home_row * 8
+        rook = "R" if color == "w" else "r"
+        kingside, queenside = ("K", "Q") if color == "w" else ("k", "q")
+
+        # The king may not pass through or land on an attacked square
+        if (kingside in self.castling_rights and mailbox[home + 7] == rook
+                and mailbox[home + 5] == "" and mailbox[home + 6] == ""
+                and not (enemy_attacks >> (home + 5)) & 3):
+            yield (home_row, 4, home_row, 6, "")
+
+        if (queenside in self.castling_rights and mailbox[home] == rook
+                and mailbox[home + 1] == "" and mailbox[home + 2] == "" and mailbox[home + 3] == ""
+                and not (enemy_attacks >> (home + 2)) & 3):
+            yield (home_row, 4, home_row, 2, "")
+
+    def _en_passant_moves(self, color: str):
+        """
+        Generate legal en passant captures.
 
-        while (current_row, current_col) != (end_row, end_col):
-            if self.board[current_row][current_col] != "":
-                print(f"Move blocked at ({current_row}, {current_col})")
-                return False  # Path is blocked
-            current_row += row_step
-            current_col += col_step
+        Removing two pawns from one row can expose the king along that row, so each
+        capture is checked against the attacks of the enemy pieces on the board as it
+        would be after the capture, instead of relying on the pin map.
+        """
+        if self.last_pawn_move is None:
+            return
+
+        position = self.position
+        pawn_row, pawn_col = self.last_pawn_move
+        pawn = "P" if color == "w" else "p"
+        if position.piece_at(pawn_row, pawn_col) != ("p" if color == "w" else "P"):
+            return
+
+        end_row = pawn_row + (-1 if color == "w" else 1)
+        for start_col in (pawn_col - 1, pawn_col + 1):
+            if not 0 <= start_col < 8 or position.piece_at(pawn_row, start_col) != pawn:
+                continue
+
+            # Not played on the board: make_move would publish MoveDeltas for a move nobody made
+            if not self._en_passant_exposes_king(color, pawn_row * 8 + start_col, pawn_row * 8 + pawn_col,
+                                                 end_row * 8 + pawn_col):
+                yield (pawn_row, start_col, end_row, pawn_col, "")
+
+    def _en_passant_exposes_king(self, color: str, start: int, captured: int, end: int) -> bool:
+        """
+        Whether the king of color would be attacked after an en passant capture
+
+        Args:
+            color (str): Side capturing
+            start, captured, end: Squares of the capturing pawn, the captured pawn and the destination
+        """
+        attack_map = self.attack_map
+        king_square = attack_map.king_squares[color]
+        if king_square is None:
+            return False
+        occupied = (attack_map.occupied & ~(1 << start) & ~(1 << captured)) | 1 << end
+        enemy = "b" if color == "w" else "w"
+        king = 1 << king_square
+        for square in iter_bits(attack_map.occupancy[enemy] & ~(1 << captured)):
+            if piece_attacks(square, attack_map.mailbox[square], occupied) & king:
+                return True
+        return False
+
+    def _find_pins(self, king_square: int, color: str) -> dict:
+        """
+        Find the pieces of color pinned to their king
+
+        Returns:
+            dict: square of each pinned piece -> bitboard of the squares it may still move to
+                (the line between the king and the pinner, pinner included)
+        """
+        mailbox = self.attack_map.mailbox
+        white = color == "w"
+        king_row, king_col = king_square >> 3, king_square & 7
+        pins = {}
+        for row_step, col_step in KING_OFFSETS:
+            sliders = "rq" if row_step == 0 or col_step == 0 else "bq"
+            candidate = None
+            current_row, current_col = king_row + row_step, king_col + col_step
+            while 0 <= current_row < 8 and 0 <= current_col < 8:
+                square = current_row * 8 + current_col
+                piece = mailbox[square]
+                if piece != "":
+                    if piece.isupper() == white:
+                        if candidate is not None:
+                            break  # Two friendly pieces in a row, nothing is pinned
+                        candidate = square
+                    else:
+                        if candidate is not None and piece.lower() in sliders:
+                            pins[candidate] = BETWEEN[king_square][square] | (1 << square)
+                        break
+                current_row += row_step
+                current_col += col_step
+        return pins
 
-        return True  # Path is clear
-    
     def handle_castling(self, piece, start_row, start_col, end_row, end_col):
         """
-        Handles castling move if all conditions are met.
+        Performs a castling move. The move must already have been validated by
+        generate_legal_moves (castling rights, empty path, no attacked squares).
 
         Returns:
-            str: Castling notation ("O-O" or "O-O-O") if valid, "" if invalid.
+            str: Castling notation ("O-O" or "O-O-O")
         """
         kingside = end_col > start_col  # True if moving right (kingside)
         
         rook_col = 7 if kingside else 0  # Find correct rook position
-        new_rook_col = 5 if kingside else 2  # New position for the rook
-
-        # Ensure the king and rook have not moved
-        if self.board[start_row][rook_col].lower() != "r":
-            print("Invalid Castling: No rook available.")
-            return ""
-
-        # Ensure path between king and rook is clear
-        if not self.is_path_clear(start_row, start_col, start_row, rook_col):
-            print("Invalid Castling: Path between king and rook is not clear.")
-            return ""
-
-        # Ensure the king's new position is **next to the rook**
-        if abs(rook_col - end_col) != 1:
-            print("Invalid Castling: King must land directly next to the rook.")
-            return ""
+        new_rook_col = 5 if kingside else 3  # New position for the rook
 
         # Perform castling move
-        self.board[end_row][end_col] = piece  # Move king
-        self.board[start_row][start_col] = ""  # Remove king from old position
-        self.board[start_row][new_rook_col] = "R" if piece.isupper() else "r"  # Move rook
-        self.board[start_row][rook_col] = ""  # Remove rook from old position
+        self._set_piece(end_row, end_col, piece)  # Move king
+        self._set_piece(start_row, start_col, "")  # Remove king from old position
+        self._set_piece(start_row, new_rook_col, "R" if piece.isupper() else "r")  # Move rook
+        self._set_piece(start_row, rook_col, "")  # Remove rook from old position
 
-        notation = "O-O" if kingside else "O-O-O"
-        print(f"Castling executed: {notation}")
-        return notation
+        return "O-O" if kingside else "O-O-O"
 
+    @timed("ChessLogic.is_king_in_check")
     def is_king_in_check(self, color: str) -> bool:
         """
         Determines if the king of the given color is in check.
@@ -285,31 +960,10 @@ class ChessLogic:
         Returns:
             bool: True if the king is in check, False otherwise.
         """
-        # Find the king's position
-        king_symbol = "K" if color == "w" else "k"
-        king_position = None
-
-        for row in range(8):
-            for col in range(8):
-                if self.board[row][col] == king_symbol:
-                    king_position = (row, col)
-                    break
-
-        if not king_position:
-            return False  # King not found (should never happen in a valid game)
-
-        king_row, king_col = king_position
-
-        # Check if any enemy piece can attack the king
-        for row in range(8):
-            for col in range(8):
-                piece = self.board[row][col]
-                if piece and piece.isupper() != (color == "w"):  # Opponent's piece
-                    if self.is_valid_piece_move(piece, row, col, king_row, king_col):
-                        return True  # King is in check
-
-        return False
+        # Constant-time lookup of the king square in the enemy's attack map
+        return self.attack_map.is_king_attacked(color)
 
+    @timed("ChessLogic.is_checkmate")
     def is_checkmate(self, color: str) -> bool:
         """
         Determines if the given player is in checkmate.
@@ -323,31 +977,9 @@ class ChessLogic:
         if not self.is_king_in_check(color):
             return False  # Not in check, so it's not checkmate
 
-        # Try every possible move to escape check
-        for row in range(8):
-            for col in range(8):
-                piece = self.board[row][col]
-                if piece and (piece.isupper() == (color == "w")):  # Only the player's pieces
-                    for new_row in range(8):
-                        for new_col in range(8):
-                            if self.is_valid_piece_move(piece, row, col, new_row, new_col):
-                                # Simulate the move
-                                original_piece = self.board[new_row][new_col]
-                                self.board[new_row][new_col] = piece
-                                self.board[row][col] = ""
-
-                                # Check if king is still in check
-                                still_in_check = self.is_king_in_check(color)
-
-                                # Undo the move
-                                self.board[row][col] = piece
-                                self.board[new_row][new_col] = original_piece
-
-                                if not still_in_check:
-                                    return False  # Found a legal escape move
-
-        return True  # No escape moves found → Checkmate
+        return not self._has_legal_move(color)  # No escape moves found → Checkmate
 
+    @timed("ChessLogic.is_stalemate")
     def is_stalemate(self, color: str) -> bool:
         """
         Determines if the game is in stalemate (no legal moves and not in check).
@@ -361,24 +993,12 @@ class ChessLogic:
         if self.is_king_in_check(color):
             return False  # If in check, it's not stalemate
 
-        for row in range(8):
-            for col in range(8):
-                piece = self.board[row][col]
-                if piece and (piece.isupper() == (color == "w")):
-                    for new_row in range(8):
-                        for new_col in range(8):
-                            if self.is_valid_piece_move(piece, row, col, new_row, new_col):
-                                # Simulate the move
-                                original_piece = self.board[new_row][new_col]
-                                self.board[new_row][new_col] = piece
-                                self.board[row][col] = ""
-
-                                still_in_check = self.is_king_in_check(color)
-
-                                # Undo move
-                                self.board[row][col] = piece
-                                self.board[new_row][new_col] = original_piece
-
-                                if not still_in_check:
-                                    return False  # Legal move exists
-        return True  # No legal moves and not in check
+        return not self._has_legal_move(color)  # No legal moves and not in check
+
+    def _has_legal_move(self, color: str) -> bool:
+        """
+        Checks if color has at least one legal move, stopping at the first one found
+        """
+        if color == self.turn and self._legal_moves is not None:
+            return len(self._legal_moves) > 0
+        return next(self._iter_legal_moves(color), None) is not None
@@ -0,0 +1,470 @@
+"""
+Alpha-beta search engine on top of ChessLogic.
+
+search() runs iterative deepening negamax with alpha-beta pruning, a bounded
+transposition table keyed by ChessLogic.zobrist_key, move ordering (hash move,
+captures by MVV-LVA, killer moves, history heuristic) and a quiescence search over
+captures and promotions. Scores are in centipawns from the side to move's view.
+"""
+
+import time
+
+from logic.bitboard import iter_bits
+from logic.instrumentation import count
+from logic.tablebase import MAX_PIECES
+
+# Piece values in centipawns
+PIECE_VALUES = {"p": 100, "n": 320, "b": 330, "r": 500, "q": 900, "k": 0}
+
+MATE_SCORE = 100000
+MATE_THRESHOLD = MATE_SCORE - 1000  # Scores beyond this are mates, adjusted by distance
+INFINITY = MATE_SCORE + 1
+MAX_PLY = 64  # Deepest ply the main search reaches, check extensions included
+
+# Transposition table bound types
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+# Piece-square tables from white's point of view, indexed like ChessLogic squares (row * 8 + col,
+# row 0 = rank 8). Black pieces read the table mirrored with square ^ 56.
+PIECE_SQUARE_TABLES = {
+    "p": [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        50, 50, 50, 50, 50, 50, 50, 50,
+        10, 10, 20, 30, 30, 20, 10, 10,
+        5, 5, 10, 25, 25, 10, 5, 5,
+        0, 0, 0, 20, 20, 0, 0, 0,
+        5, -5, -10, 0, 0, -10, -5, 5,
+        5, 10, 10, -20, -20, 10, 10, 5,
+        0, 0, 0, 0, 0, 0, 0, 0,
+    ],
+    "n": [
+        -50, -40, -30, -30, -30, -30, -40, -50,
+        -40, -20, 0, 0, 0, 0, -20, -40,
+        -30, 0, 10, 15, 15, 10, 0, -30,
+        -30, 5, 15, 20, 20, 15, 5, -30,
+        -30, 0, 15, 20, 20, 15, 0, -30,
+        -30, 5, 10, 15, 15, 10, 5, -30,
+        -40, -20, 0, 5, 5, 0, -20, -40,
+        -50, -40, -30, -30, -30, -30, -40, -50,
+    ],
+    "b": [
+        -20, -10, -10, -10, -10, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 10, 10, 5, 0, -10,
+        -10, 5, 5, 10, 10, 5, 5, -10,
+        -10, 0, 10, 10, 10, 10, 0, -10,
+        -10, 10, 10, 10, 10, 10, 10, -10,
+        -10, 5, 0, 0, 0, 0, 5, -10,
+        -20, -10, -10, -10, -10, -10, -10, -20,
+    ],
+    "r": [
+        0, 0, 0, 0, 0, 0, 0, 0,
+        5, 10, 10, 10, 10, 10, 10, 5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        -5, 0, 0, 0, 0, 0, 0, -5,
+        0, 0, 0, 5, 5, 0, 0, 0,
+    ],
+    "q": [
+        -20, -10, -10, -5, -5, -10, -10, -20,
+        -10, 0, 0, 0, 0, 0, 0, -10,
+        -10, 0, 5, 5, 5, 5, 0, -10,
+        -5, 0, 5, 5, 5, 5, 0, -5,
+        0, 0, 5, 5, 5, 5, 0, -5,
+        -10, 5, 5, 5, 5, 5, 0, -10,
+        -10, 0, 5, 0, 0, 0, 0, -10,
+        -20, -10, -10, -5, -5, -10, -10, -20,
+    ],
+    "k": [
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -30, -40, -40, -50, -50, -40, -40, -30,
+        -20, -30, -30, -40, -40, -30, -30, -20,
+        -10, -20, -20, -20, -20, -20, -20, -10,
+        20, 20, 0, 0, 0, 0, 20, 20,
+        20, 30, 10, 0, 0, 10, 30, 20,
+    ],
+}
+
+
+def evaluate(logic) -> int:
+    """
+    Static evaluation: material plus piece-square bonuses
+
+    Args:
+        logic (ChessLogic): Position to evaluate
+
+    Returns:
+        int: Score in centipawns from the side to move's point of view
+    """
+    attack_map = logic.attack_map
+    mailbox = attack_map.mailbox
+    score = 0
+    for square in iter_bits(attack_map.occupied):
+        piece = mailbox[square]
+        kind = piece.lower()
+        if piece.isupper():
+            score += PIECE_VALUES[kind] + PIECE_SQUARE_TABLES[kind][square]
+        else:
+            score -= PIECE_VALUES[kind] + PIECE_SQUARE_TABLES[kind][square ^ 56]
+    return score if logic.turn == "w" else -score
+
+
+class TranspositionTable:
+    def __init__(self, max_entries: int = 1 << 20):
+        """
+        Bounded map from Zobrist key to search results. When full, the oldest entry is
+        dropped to make room, so memory use never exceeds max_entries entries.
+
+        Args:
+            max_entries (int): Maximum number of stored positions
+        """
+        self.max_entries = max_entries
+        self.entries = {}
+
+    def probe(self, key: int):
+        """
+        Look up a position
+
+        Args:
+            key (int): Zobrist key of the position
+
+        Returns:
+            tuple | None: (depth, score, bound, move) or None if the position is not stored
+        """
+        return self.entries.get(key)
+
+    def store(self, key: int, depth: int, score: int, bound: int, move):
+        """
+        Store a search result, keeping an existing deeper result for the same position
+
+        Args:
+            key (int): Zobrist key of the position
+            depth (int): Remaining depth the score was searched to
+            score (int): Score found
+            bound (int): EXACT, LOWER or UPPER
+            move: Best move found, or None
+        """
+        entries = self.entries
+        existing = entries.get(key)
+        if existing is not None:
+            if existing[0] > depth:
+                return
+        elif len(entries) >= self.max_entries:
+            del entries[next(iter(entries))]
+        entries[key] = (depth, score, bound, move)
+
+    def clear(self):
+        """
+        Remove every entry
+        """
+        self.entries.clear()
+
+
+class SearchResult:
+    def __init__(self, best_move: str, pv: list[str], score: int, depth: int, nodes: int, seconds: float):
+        """
+        Outcome of a search
+
+        Args:
+            best_move (str): Best move in play_move notation, '' if there is no legal move
+            pv (list[str]): Principal variation starting with best_move
+            score (int): Score in centipawns for the side to move, +-MATE_SCORE minus the distance for mates
+            depth (int): Deepest fully completed iteration
+            nodes (int): Positions visited, quiescence included
+            seconds (float): Wall-clock time used
+        """
+        self.best_move = best_move
+        self.pv = pv
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.seconds = seconds
+
+    def __repr__(self):
+        return (f"SearchResult(best_move={self.best_move!r}, score={self.score}, depth={self.depth}, "
+                f"nodes={self.nodes}, pv={' '.join(self.pv)!r})")
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside the search when the time budget runs out or the search is stopped
+    """
+
+
+class Searcher:
+    def __init__(self, logic, table: TranspositionTable | None = None, tablebases=None):
+        """
+        Iterative deepening alpha-beta search over a ChessLogic game.
+        The game is searched in place with make_move/unmake_move and is restored
+        to its original position when the search returns.
+
+        Args:
+            logic (ChessLogic): Game to search from its current position
+            table (TranspositionTable | None): Table to reuse between searches, a new one if None
+            tablebases (Tablebases | None): Endgame tables giving exact scores to the positions they cover
+        """
+        self.logic = logic
+        self.table = table if table is not None else TranspositionTable()
+        self.tablebases = tablebases
+        self.on_iteration = None  # Called with a SearchResult after every completed iteration, e.g. for UCI info lines
+        self.nodes = 0
+        self.deadline = None
+        self.stopped = False
+        self.killers = []
+        self.history = {}
+        self.pv_table = []
+
+    def stop(self):
+        """
+        Ask a running search to return as soon as possible with its best result so far.
+        A stop that comes in before search() starts still applies to that search.
+        """
+        self.stopped = True
+
+    def search(self, depth: int | None = None, time_limit: float | None = None) -> SearchResult:
+        """
+        Search the current position
+
+        Args:
+            depth (int | None): Deepest iteration to run
+            time_limit (float | None): Wall-clock budget in seconds. The search stops in the middle of
+                an iteration when it runs out and returns the last completed one.
+                With neither limit given, depth 4 is used.
+
+        Returns:
+            SearchResult: Best move, principal variation and statistics
+        """
+        logic = self.logic
+        if depth is None:
+            depth = 4 if time_limit is None else MAX_PLY
+        start = time.perf_counter()
+        self.deadline = start + time_limit if time_limit is not None else None
+        self.nodes = 0
+        self.killers = [[None, None] for _ in range(MAX_PLY + 1)]
+        self.history = {}
+
+        root_moves = logic.generate_legal_moves()
+        if not root_moves:
+            return SearchResult("", [], -MATE_SCORE if logic.is_king_in_check(logic.turn) else 0, 0, 0, 0.0)
+
+        if self.tablebases is not None:
+            hit = self.tablebases.best_move(logic)
+            if hit is not None:
+                notation = logic.move_to_notation(hit[0])
+                wdl, plies = self.tablebases.probe(logic)
+                return SearchResult(notation, [notation], _tablebase_score(wdl, plies, 0), 0, 1,
+                                    time.perf_counter() - start)
+
+        root_plies = len(logic.move_history)
+        best_pv = [root_moves[0]]
+        best_score = 0
+        completed = 0
+
+        for iteration in range(1, depth + 1):
+            self.pv_table = [[] for _ in range(MAX_PLY + 2)]
+            try:
+                score = self._negamax(iteration, 0, -INFINITY, INFINITY)
+            except SearchTimeout:
+                # Unwind whatever the interrupted iteration left on the board
+                while len(logic.move_history) > root_plies:
+                    logic.unmake_move()
+                break
+
+            completed = iteration
+            best_score = score
+            if self.pv_table[0]:
+                best_pv = self.pv_table[0]
+            if self.on_iteration is not None:
+                self.on_iteration(SearchResult(logic.move_to_notation(best_pv[0]),
+                                               [logic.move_to_notation(move) for move in best_pv],
+                                               best_score, completed, self.nodes, time.perf_counter() - start))
+
+            if abs(score) >= MATE_THRESHOLD:
+                break  # A forced mate will not change with more depth
+            # Another iteration takes several times longer than this one, do not start what cannot finish
+            if self.deadline is not None and time.perf_counter() - start > (self.deadline - start) / 2:
+                break
+
+        count("Searcher.nodes", self.nodes)  # Added once per search, the node loop stays uninstrumented
+        return SearchResult(logic.move_to_notation(best_pv[0]), [logic.move_to_notation(move) for move in best_pv],
+                            best_score, completed, self.nodes, time.perf_counter() - start)
+
+    def _check_time(self):
+        if self.stopped or (self.deadline is not None and time.perf_counter() >= self.deadline):
+            raise SearchTimeout()
+
+    def _negamax(self, depth: int, ply: int, alpha: int, beta: int) -> int:
+        logic = self.logic
+        self.nodes += 1
+        if self.nodes & 255 == 0:
+            self._check_time()
+        self.pv_table[ply] = []
+
+        if ply > 0 and (logic.halfmove_clock >= 100 or logic.repetition_count() >= 2):
+            return 0
+
+        if ply > 0 and self.tablebases is not None and logic.attack_map.occupied.bit_count() <= MAX_PIECES:
+            hit = self.tablebases.probe(logic)
+            if hit is not None:
+                return _tablebase_score(hit[0], hit[1], ply)
+
+        if ply >= MAX_PLY:
+            return evaluate(logic)
+
+        in_check = logic.is_king_in_check(logic.turn)
+        if in_check:
+            depth += 1  # Check extension, so forced sequences are not cut off at the horizon
+        if depth <= 0:
+            return self._quiescence(ply, alpha, beta)
+
+        key = logic.zobrist_key
+        entry = self.table.probe(key)
+        hash_move = None
+        if entry is not None:
+            entry_depth, entry_score, bound, hash_move = entry
+            if entry_depth >= depth and ply > 0:
+                entry_score = _score_from_table(entry_score, ply)
+                if bound == EXACT:
+                    return entry_score
+                if bound == LOWER and entry_score >= beta:
+                    return entry_score
+                if bound == UPPER and entry_score <= alpha:
+                    return entry_score
+
+        moves = logic.generate_legal_moves()
+        if not moves:
+            return -MATE_SCORE + ply if in_check else 0
+
+        original_alpha = alpha
+        best_score = -INFINITY
+        best_move = None
+        for move in self._order_moves(moves, hash_move, ply):
+            capture = logic.position.piece_at(move[2], move[3]) != ""
+            logic.make_move(move)
+            score = -self._negamax(depth - 1, ply + 1, -beta, -alpha)
+            logic.unmake_move()
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    self.pv_table[ply] = [move] + self.pv_table[ply + 1]
+                    if alpha >= beta:
+                        if not capture:
+                            # Quiet moves that refute a position are worth trying first in its siblings
+                            killers = self.killers[ply]
+                            if killers[0] != move:
+                                killers[1] = killers[0]
+                                killers[0] = move
+                            history_key = (move[0], move[1], move[2], move[3])
+                            self.history[history_key] = self.history.get(history_key, 0) + depth * depth
+                        break
+
+        if best_score <= original_alpha:
+            bound = UPPER
+        elif best_score >= beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.table.store(key, depth, _score_to_table(best_score, ply), bound, best_move)
+        return best_score
+
+    def _quiescence(self, ply: int, alpha: int, beta: int) -> int:
+        """
+        Search captures and promotions only, until the position is quiet
+        """
+        logic = self.logic
+        self.nodes += 1
+        if self.nodes & 255 == 0:
+            self._check_time()
+
+        stand_pat = evaluate(logic)
+        if stand_pat >= beta:
+            return stand_pat
+        if stand_pat > alpha:
+            alpha = stand_pat
+
+        piece_at = logic.position.piece_at
+        tactical = [move for move in logic.generate_legal_moves()
+                    if move[4] != "" or piece_at(move[2], move[3]) != ""
+                    or (piece_at(move[0], move[1]) in "Pp" and move[1] != move[3])]
+        for move in self._order_moves(tactical, None, ply):
+            logic.make_move(move)
+            score = -self._quiescence(ply + 1, -beta, -alpha)
+            logic.unmake_move()
+            if score >= beta:
+                return score
+            if score > alpha:
+                alpha = score
+        return alpha
+
+    def _order_moves(self, moves: list, hash_move, ply: int) -> list:
+        """
+        Sort moves best-first: hash move, captures by MVV-LVA, promotions, killers, then history
+        """
+        piece_at = self.logic.position.piece_at
+        killers = self.killers[ply] if ply < len(self.killers) else (None, None)
+        history = self.history
+
+        def priority(move):
+            if move == hash_move:
+                return 10000000
+            victim = piece_at(move[2], move[3])
+            if victim != "":
+                return 1000000 + 10 * PIECE_VALUES[victim.lower()] - PIECE_VALUES[piece_at(move[0], move[1]).lower()]
+            if move[4] != "":
+                return 900000 + PIECE_VALUES[move[4]]
+            if move == killers[0]:
+                return 800000
+            if move == killers[1]:
+                return 700000
+            return history.get((move[0], move[1], move[2], move[3]), 0)
+
+        return sorted(moves, key=priority, reverse=True)
+
+
+def _tablebase_score(wdl: int, plies: int, ply: int) -> int:
+    # Exact tablebase result as a mate score, counting from the root like the search does
+    return wdl * (MATE_SCORE - ply - plies)
+
+
+def _score_to_table(score: int, ply: int) -> int:
+    # Mate scores are stored relative to the node so they stay valid at any ply
+    if score >= MATE_THRESHOLD:
+        return score + ply
+    if score <= -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+
+def _score_from_table(score: int, ply: int) -> int:
+    if score >= MATE_THRESHOLD:
+        return score - ply
+    if score <= -MATE_THRESHOLD:
+        return score + ply
+    return score
+
+
+def search(logic, depth: int | None = None, time_limit: float | None = None,
+           table: TranspositionTable | None = None, tablebases=None) -> SearchResult:
+    """
+    Find the best move for the side to move
+
+    Args:
+        logic (ChessLogic): Game to search, left in its original position
+        depth (int | None): Deepest iteration to run
+        time_limit (float | None): Wall-clock budget in seconds
+        table (TranspositionTable | None): Table to reuse between searches
+        tablebases (Tablebases | None): Endgame tables to probe
+
+    Returns:
+        SearchResult: Best move, principal variation and statistics
+    """
+    return Searcher(logic, table, tablebases).search(depth, time_limit)
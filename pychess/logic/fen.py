@@ -0,0 +1,111 @@
+"""
+Forsyth-Edwards Notation (FEN) parsing and formatting for ChessLogic.
+
+Example (starting position):
+    rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1
+"""
+
+STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+# Row fragments for every character that can appear in a FEN rank
+_RANK_TOKENS = {str(count): [""] * count for count in range(1, 9)}
+_RANK_TOKENS.update({piece: [piece] for piece in "PNBRQKpnbrqk"})
+
+
+def parse_fen(fen: str) -> tuple[list[list[str]], str, str, tuple[int, int] | None, int, int]:
+    """
+    Split a FEN string into the fields ChessLogic keeps
+
+    Args:
+        fen (str): Position in FEN. The move clocks may be omitted and default to "0 1".
+
+    Raises:
+        ValueError: If the string is not a well formed FEN
+
+    Returns:
+        tuple: (rows, turn, castling_rights, last_pawn_move, halfmove_clock, fullmove_number) where
+            rows is an 8x8 grid in ChessLogic.board format and last_pawn_move is the square of the
+            pawn that can be captured en passant, or None
+    """
+    fields = fen.split()
+    if len(fields) == 4:
+        fields += ["0", "1"]
+    if len(fields) != 6:
+        raise ValueError(f"FEN must have 4 or 6 fields: {fen!r}")
+    placement, turn, castling, en_passant, halfmove, fullmove = fields
+
+    rows = []
+    tokens = _RANK_TOKENS
+    for rank in placement.split("/"):
+        row = []
+        for char in rank:
+            if char not in tokens:
+                raise ValueError(f"Invalid character {char!r} in FEN: {fen!r}")
+            row += tokens[char]
+        if len(row) != 8:
+            raise ValueError(f"FEN rank {rank!r} does not have 8 squares: {fen!r}")
+        rows.append(row)
+    if len(rows) != 8:
+        raise ValueError(f"FEN must have 8 ranks: {fen!r}")
+
+    if turn not in ("w", "b"):
+        raise ValueError(f"Invalid side to move {turn!r} in FEN: {fen!r}")
+
+    if castling == "-":
+        castling = ""
+    elif any(right not in "KQkq" for right in castling):
+        raise ValueError(f"Invalid castling rights {castling!r} in FEN: {fen!r}")
+    castling = "".join(right for right in "KQkq" if right in castling)  # Normalise to FEN order
+
+    # FEN names the square behind the pawn, ChessLogic stores the pawn itself
+    last_pawn_move = None
+    if en_passant != "-":
+        if len(en_passant) != 2 or en_passant[0] not in "abcdefgh" or en_passant[1] not in "36":
+            raise ValueError(f"Invalid en passant square {en_passant!r} in FEN: {fen!r}")
+        col = ord(en_passant[0]) - ord("a")
+        last_pawn_move = (4, col) if en_passant[1] == "3" else (3, col)
+
+    if not halfmove.isdigit() or not fullmove.isdigit():
+        raise ValueError(f"Invalid move counters in FEN: {fen!r}")
+
+    return rows, turn, castling, last_pawn_move, int(halfmove), int(fullmove)
+
+
+def format_fen(board, turn: str, castling_rights: str, last_pawn_move: tuple[int, int] | None,
+               halfmove_clock: int, fullmove_number: int) -> str:
+    """
+    Build a FEN string from ChessLogic's fields
+
+    Args:
+        board: 8x8 grid in ChessLogic.board format
+        turn (str): Side to move, 'w' or 'b'
+        castling_rights (str): Castling rights in FEN order, '' for none
+        last_pawn_move (tuple[int, int] | None): Square of the pawn that just moved two squares
+        halfmove_clock (int): Plies since the last capture or pawn move
+        fullmove_number (int): Move number, starting at 1 and increased after black moves
+
+    Returns:
+        str: Position in FEN
+    """
+    ranks = []
+    for row in board:
+        rank = ""
+        empty = 0
+        for piece in row:
+            if piece == "":
+                empty += 1
+                continue
+            if empty:
+                rank += str(empty)
+                empty = 0
+            rank += piece
+        if empty:
+            rank += str(empty)
+        ranks.append(rank)
+
+    en_passant = "-"
+    if last_pawn_move is not None:
+        row, col = last_pawn_move
+        en_passant = "abcdefgh"[col] + ("3" if row == 4 else "6")
+
+    return f"{'/'.join(ranks)} {turn} {castling_rights or '-'} {en_passant} {halfmove_clock} {fullmove_number}"
@@ -0,0 +1,439 @@
+"""
+Asyncio server hosting many concurrent games behind a JSON lines protocol, and a client for it.
+
+Each request is one JSON object on one line, answered by one JSON object on one line,
+in request order per connection (clients may pipeline). "id", when given, is echoed back.
+
+    {"op": "new", "fen": "..."}                 -> {"ok": true, "game": 7, "fen": "...", "turn": "w"}
+    {"op": "move", "game": 7, "move": "e2e4"}   -> {"ok": true, "notation": "e2e4", "result": ""}
+    {"op": "moves", "game": 7, "moves": [...]}  -> {"ok": true, "played": [...], "result": ""}
+                                                   (plays in order, stops before the first illegal move)
+    {"op": "validate", "game": 7, "moves": [...]} -> {"ok": true, "legal": [true, false, ...]}
+    {"op": "legal", "game": 7}                  -> {"ok": true, "moves": ["e2e4", ...]}
+    {"op": "state", "game": 7}                  -> {"ok": true, "fen": "...", "turn": "w", "result": "", "moves": [...]}
+    {"op": "engine", "game": 7, "time": 0.1}    -> {"ok": true, "notation": "e7e5", "result": ""}
+    {"op": "close", "game": 7}                  -> {"ok": true}
+    {"op": "stats"}                             -> {"ok": true, "games": 12, "games_per_second": ..., ...}
+
+Failures answer {"ok": false, "error": "..."}; "fen" is optional, "time" defaults to 0.1s.
+
+Games are ChessLogic objects on the bitboard backend, held in slotted GameSessions, and
+log rather than print, so hosting thousands of them costs little besides their positions.
+Requests on one game are serialised by a per-game asyncio lock; engine searches run on a
+thread pool so they do not hold up other games.
+"""
+
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from logic.chess_logic import ChessLogic
+from logic.engine import Searcher
+from logic.instrumentation import get_logger
+
+logger = get_logger("server")
+
+LATENCY_SAMPLES = 100000  # Most recent move latencies kept for percentiles
+DEFAULT_THINK_TIME = 0.1
+
+
+class ProtocolError(ValueError):
+    """
+    Request that cannot be served; its message is sent back to the client
+    """
+
+
+def percentile(samples, fraction: float) -> float:
+    """
+    Nearest-rank percentile of a collection of numbers, 0.0 if it is empty
+
+    Args:
+        samples: Numbers
+        fraction (float): Percentile as a fraction, e.g. 0.99
+    """
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class GameSession:
+    __slots__ = ("number", "logic", "lock", "finished")
+
+    def __init__(self, number: int, logic: ChessLogic):
+        """
+        One hosted game
+
+        Args:
+            number (int): Game number clients refer to it by
+            logic (ChessLogic): The game
+        """
+        self.number = number
+        self.logic = logic
+        self.lock = asyncio.Lock()  # Serialises requests on this game
+        self.finished = False  # Set once the game's result has been counted
+
+
+class ServerStats:
+    __slots__ = ("started", "games_created", "games_finished", "moves", "latencies")
+
+    def __init__(self):
+        """
+        Throughput and latency counters of a GameServer
+        """
+        self.started = time.perf_counter()
+        self.games_created = 0
+        self.games_finished = 0
+        self.moves = 0
+        self.latencies = deque(maxlen=LATENCY_SAMPLES)  # Seconds per move played (or rejected)
+
+    def snapshot(self, games: int) -> dict:
+        """
+        Counters and rates since the server started
+
+        Args:
+            games (int): Games currently hosted
+        """
+        uptime = time.perf_counter() - self.started
+        return {
+            "games": games,
+            "games_created": self.games_created,
+            "games_finished": self.games_finished,
+            "moves": self.moves,
+            "uptime": round(uptime, 3),
+            "games_per_second": round(self.games_created / uptime, 2) if uptime else 0.0,
+            "moves_per_second": round(self.moves / uptime, 1) if uptime else 0.0,
+            "p50_move_ms": round(percentile(self.latencies, 0.5) * 1000, 3),
+            "p99_move_ms": round(percentile(self.latencies, 0.99) * 1000, 3),
+        }
+
+
+class GameServer:
+    def __init__(self, max_games: int = 10000, engine_threads: int = 1, backend: str = "bitboard"):
+        """
+        Game host. Call start() to listen, or handle_request() to serve requests directly.
+
+        Args:
+            max_games (int): Games hosted at once; "new" fails beyond this
+            engine_threads (int): Threads running "engine" searches
+            backend (str): ChessLogic position backend of new games
+        """
+        self.max_games = max_games
+        self.backend = backend
+        self.games = {}
+        self.next_game = 1
+        self.stats = ServerStats()
+        self.executor = ThreadPoolExecutor(engine_threads, thread_name_prefix="pychess-engine")
+        self.server = None
+        self._handlers = {
+            "new": self._new, "move": self._move, "moves": self._moves, "validate": self._validate,
+            "legal": self._legal, "state": self._state, "engine": self._engine, "close": self._close,
+            "stats": self._stats,
+        }
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> asyncio.Server:
+        """
+        Listen for connections
+
+        Args:
+            host (str): Interface to bind
+            port (int): Port to bind, 0 for any free port (see port)
+
+        Returns:
+            asyncio.Server: The listening server
+        """
+        self.server = await asyncio.start_server(self._serve_connection, host, port)
+        logger.info("Serving games on %s:%d", host, self.port)
+        return self.server
+
+    @property
+    def port(self) -> int:
+        """
+        Port the server listens on
+        """
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """
+        Stop listening and shut down the engine threads
+        """
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    async def handle_request(self, request: dict) -> dict:
+        """
+        Serve one decoded request
+
+        Args:
+            request (dict): Request object (see the module docstring)
+
+        Returns:
+            dict: Response object
+        """
+        try:
+            if not isinstance(request, dict):
+                raise ProtocolError("Request must be a JSON object")
+            op = request.get("op")
+            if not isinstance(op, str):
+                raise ProtocolError("op must be a string")
+            handler = self._handlers.get(op)
+            if handler is None:
+                raise ProtocolError(f"Unknown op: {request.get('op')!r}")
+            response = await handler(request)
+        except ProtocolError as error:
+            response = {"ok": False, "error": str(error)}
+        if isinstance(request, dict) and "id" in request:
+            response["id"] = request["id"]
+        return response
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {"ok": False, "error": "Invalid JSON"}
+                else:
+                    response = await self.handle_request(request)
+                writer.write(json.dumps(response, separators=(",", ":")).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError) as error:
+            logger.debug("Dropping connection: %s", error)
+        finally:
+            writer.close()
+
+    def _session(self, request: dict) -> GameSession:
+        number = request.get("game")
+        if not isinstance(number, int) or isinstance(number, bool):
+            raise ProtocolError("game must be a game number")
+        session = self.games.get(number)
+        if session is None:
+            raise ProtocolError(f"Unknown game: {request.get('game')!r}")
+        return session
+
+    def _moves_field(self, request: dict) -> list:
+        moves = request.get("moves")
+        if not isinstance(moves, list) or not all(isinstance(move, str) for move in moves):
+            raise ProtocolError("moves must be a list of strings")
+        return moves
+
+    def _count_result(self, session: GameSession):
+        if session.logic.result != "" and not session.finished:
+            session.finished = True
+            self.stats.games_finished += 1
+
+    async def _new(self, request: dict) -> dict:
+        if len(self.games) >= self.max_games:
+            raise ProtocolError(f"Server full ({self.max_games} games)")
+        fen = request.get("fen")
+        try:
+            logic = ChessLogic.from_fen(fen, self.backend) if fen else ChessLogic(self.backend)
+        except (ValueError, TypeError, AttributeError) as error:
+            raise ProtocolError(f"Invalid FEN: {error}")
+        number = self.next_game
+        self.next_game += 1
+        self.games[number] = GameSession(number, logic)
+        self.stats.games_created += 1
+        return {"ok": True, "game": number, "fen": logic.to_fen(), "turn": logic.turn}
+
+    async def _move(self, request: dict) -> dict:
+        session = self._session(request)
+        move = request.get("move")
+        if not isinstance(move, str):
+            raise ProtocolError("move must be a string")
+        async with session.lock:
+            start = time.perf_counter()
+            notation = session.logic.play_move(move)
+            self.stats.latencies.append(time.perf_counter() - start)
+            if notation != "":
+                self.stats.moves += 1
+                self._count_result(session)
+            response = {"ok": notation != "", "notation": notation, "result": session.logic.result}
+            if notation == "":
+                response["error"] = f"Illegal move: {move}"
+            return response
+
+    async def _moves(self, request: dict) -> dict:
+        session = self._session(request)
+        moves = self._moves_field(request)
+        played = []
+        async with session.lock:
+            logic = session.logic
+            latencies = self.stats.latencies
+            perf_counter = time.perf_counter
+            for move in moves:
+                # One sample per move, as for "move" requests, so batches do not skew the percentiles
+                start = perf_counter()
+                notation = logic.play_move(move)
+                latencies.append(perf_counter() - start)
+                if notation == "":
+                    break
+                played.append(notation)
+            self.stats.moves += len(played)
+            self._count_result(session)
+            response = {"ok": len(played) == len(moves), "played": played, "result": logic.result}
+            if len(played) < len(moves):
+                response["error"] = f"Illegal move: {moves[len(played)]}"
+            return response
+
+    async def _validate(self, request: dict) -> dict:
+        session = self._session(request)
+        moves = self._moves_field(request)
+        async with session.lock:
+            logic = session.logic
+            # The same check as play_move (a pawn reaching the last rank becomes a queen by default),
+            # against legal moves generated once for the whole batch
+            return {"ok": True, "legal": [logic.legal_move(move) is not None for move in moves]}
+
+    async def _legal(self, request: dict) -> dict:
+        session = self._session(request)
+        async with session.lock:
+            logic = session.logic
+            moves = logic.generate_legal_moves() if logic.result == "" else []
+            return {"ok": True, "moves": [logic.move_to_notation(move) for move in moves]}
+
+    async def _state(self, request: dict) -> dict:
+        session = self._session(request)
+        async with session.lock:
+            logic = session.logic
+            return {"ok": True, "fen": logic.to_fen(), "turn": logic.turn, "result": logic.result,
+                    "moves": list(logic.move_history)}
+
+    async def _engine(self, request: dict) -> dict:
+        session = self._session(request)
+        think_time = request.get("time", DEFAULT_THINK_TIME)
+        if not isinstance(think_time, (int, float)) or not 0 < think_time <= 60:
+            raise ProtocolError("time must be a number of seconds between 0 and 60")
+        async with session.lock:
+            logic = session.logic
+            if logic.result != "":
+                raise ProtocolError("Game is over")
+            if not logic.legal_move_set():
+                raise ProtocolError("No legal moves in this position")  # Mate or stalemate loaded from a FEN
+            snapshot = logic.copy()
+            result = await asyncio.get_running_loop().run_in_executor(
+                self.executor, lambda: Searcher(snapshot).search(time_limit=think_time))
+            notation = logic.play_move(result.best_move)
+            self.stats.moves += 1
+            self._count_result(session)
+            return {"ok": True, "notation": notation, "result": logic.result, "score": result.score,
+                    "depth": result.depth}
+
+    async def _close(self, request: dict) -> dict:
+        session = self._session(request)
+        async with session.lock:
+            del self.games[session.number]
+        return {"ok": True}
+
+    async def _stats(self, request: dict) -> dict:
+        return {"ok": True, **self.stats.snapshot(len(self.games))}
+
+
+class GameClient:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Connection to a GameServer; use GameClient.connect to open one
+        """
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host: str = "127.0.0.1", port: int = 8765) -> "GameClient":
+        """
+        Open a connection
+
+        Args:
+            host (str): Server host
+            port (int): Server port
+        """
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, op: str, **fields) -> dict:
+        """
+        Send a request and wait for its response. Requests on one client must not overlap.
+
+        Args:
+            op (str): Request op
+            **fields: Other request fields
+
+        Raises:
+            ConnectionError: If the server closed the connection
+
+        Returns:
+            dict: Response object
+        """
+        self.writer.write(json.dumps({"op": op, **fields}).encode() + b"\n")
+        await self.writer.drain()
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("Server closed the connection")
+        return json.loads(line)
+
+    async def close(self):
+        """
+        Close the connection
+        """
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def run_load(host: str, port: int, games: int, connections: int = 50, max_plies: int = 80,
+                   seed: int | None = None) -> dict:
+    """
+    Play random games against a server over several connections and measure what clients see
+
+    Args:
+        host (str): Server host
+        port (int): Server port
+        games (int): Games to play in total
+        connections (int): Concurrent connections, each playing one game at a time
+        max_plies (int): Plies after which an unfinished game is abandoned
+        seed (int | None): Seed for the move choices
+
+    Returns:
+        dict: games played and finished, moves, seconds, games and moves per second, p50/p99 move latency (ms)
+    """
+    rng = random.Random(seed)
+    latencies = []
+    counters = {"games": 0, "finished": 0, "moves": 0}
+    remaining = iter(range(games))
+
+    async def play(client: GameClient):
+        for _ in remaining:
+            game = (await client.request("new"))["game"]
+            for _ in range(max_plies):
+                legal = (await client.request("legal", game=game))["moves"]
+                if not legal:
+                    break
+                start = time.perf_counter()
+                response = await client.request("move", game=game, move=rng.choice(legal))
+                latencies.append(time.perf_counter() - start)
+                counters["moves"] += 1
+                if response["result"] != "":
+                    counters["finished"] += 1
+                    break
+            await client.request("close", game=game)
+            counters["games"] += 1
+
+    clients = [await GameClient.connect(host, port) for _ in range(connections)]
+    start = time.perf_counter()
+    try:
+        await asyncio.gather(*(play(client) for client in clients))
+    finally:
+        for client in clients:
+            await client.close()
+    seconds = time.perf_counter() - start
+    return {
+        **counters,
+        "seconds": round(seconds, 3),
+        "games_per_second": round(counters["games"] / seconds, 2),
+        "moves_per_second": round(counters["moves"] / seconds, 1),
+        "p50_move_ms": round(percentile(latencies, 0.5) * 1000, 3),
+        "p99_move_ms": round(percentile(latencies, 0.99) * 1000, 3),
+    }
@@ -0,0 +1,246 @@
+"""
+Append-only binary game database with memory-mapped random access.
+
+A store is two files:
+
+    <path>      data: an 8-byte header, then for every game its starting FEN (if any, padded
+                to an even length) followed by its moves as little-endian 16-bit codes
+                (see logic/move_encoding.py)
+    <path>.idx  index: an 8-byte header, then one 16-byte entry per game:
+                data offset of the moves (uint64), number of moves (uint32),
+                FEN length (uint16), result (uint8: 0 in progress, 1 white, 2 black, 3 draw), padding
+
+Games are only ever appended. The data of a game is written before its index entry, so a
+crash can leave unreferenced bytes at the end of the data file, or a torn entry at the end of
+the index, but never an entry pointing at missing data. GameStoreWriter cuts both off before
+appending.
+
+GameStore maps both files and returns each game's moves as a memoryview into the mapping,
+so reading a game copies nothing.
+"""
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+DATA_MAGIC = b"PCHGDAT1"
+INDEX_MAGIC = b"PCHGIDX1"
+HEADER_SIZE = 8
+
+_ENTRY = struct.Struct("<QIHBx")
+
+# ChessLogic.result -> stored result code
+RESULT_CODES = {"": 0, "w": 1, "b": 2, "d": 3}
+RESULTS = {code: result for result, code in RESULT_CODES.items()}
+
+_NATIVE_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+def open_file(path: str, magic: bytes, kind: str = "game store"):
+    """
+    Open a file with an 8-byte magic header for appending, creating it with the header if needed
+
+    Args:
+        path (str): File to open
+        magic (bytes): Header of the file format
+        kind (str): Name of the file format, for the error message
+
+    Raises:
+        ValueError: If the file exists but does not start with magic
+
+    Returns:
+        Binary file object positioned at the end of the file
+    """
+    handle = open(path, "a+b")
+    handle.seek(0, os.SEEK_END)
+    if handle.tell() == 0:
+        handle.write(magic)
+        handle.flush()
+    else:
+        handle.seek(0)
+        if handle.read(HEADER_SIZE) != magic:
+            handle.close()
+            raise ValueError(f"Not a pychess {kind} file: {path}")
+        handle.seek(0, os.SEEK_END)
+    return handle
+
+
+def map_file(path: str, magic: bytes, kind: str = "game store") -> mmap.mmap:
+    """
+    Memory-map a file with an 8-byte magic header for reading
+
+    Args:
+        path (str): File to map
+        magic (bytes): Header of the file format
+        kind (str): Name of the file format, for the error message
+
+    Raises:
+        ValueError: If the file does not start with magic
+
+    Returns:
+        mmap.mmap: Read-only mapping of the whole file, header included
+    """
+    with open(path, "rb") as handle:  # The mapping keeps its own file descriptor
+        mapping = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapping[:HEADER_SIZE] != magic:
+        mapping.close()
+        raise ValueError(f"Not a pychess {kind} file: {path}")
+    return mapping
+
+
+class GameStoreWriter:
+    def __init__(self, path: str):
+        """
+        Open a store for appending, creating it if needed
+
+        Args:
+            path (str): Data file path; the index is written to path + ".idx"
+
+        Raises:
+            ValueError: If the files exist but are not game store files
+        """
+        self.path = path
+        self.data = open_file(path, DATA_MAGIC)
+        self.index = open_file(path + ".idx", INDEX_MAGIC)
+        # Entries are fixed size: cut a torn trailing entry off the index, and the data of
+        # games without an entry off the data file, so new games are appended in line
+        self.count = (self.index.tell() - HEADER_SIZE) // _ENTRY.size
+        self.index.truncate(HEADER_SIZE + self.count * _ENTRY.size)
+        data_end = HEADER_SIZE
+        if self.count:
+            self.index.seek(HEADER_SIZE + (self.count - 1) * _ENTRY.size)
+            offset, moves, _, _ = _ENTRY.unpack(self.index.read(_ENTRY.size))
+            data_end = offset + 2 * moves
+        self.data.truncate(data_end)
+        self.index.seek(0, os.SEEK_END)
+        self.data.seek(0, os.SEEK_END)
+
+    def append(self, moves, result: str = "", fen: str | None = None) -> int:
+        """
+        Add a game to the end of the store
+
+        Args:
+            moves: Iterable of 16-bit move codes, e.g. ChessLogic.packed_moves()
+            result (str): Result in ChessLogic.result format ('w', 'b', 'd' or '' for unfinished)
+            fen (str | None): Starting position, None for the standard starting position
+
+        Returns:
+            int: Number of the game in the store
+        """
+        codes = moves if isinstance(moves, array) and moves.typecode == "H" else array("H", moves)
+        if not _NATIVE_LITTLE_ENDIAN:
+            codes = array("H", codes)
+            codes.byteswap()
+
+        fen_bytes = fen.encode("ascii") if fen else b""
+        data = self.data
+        start = data.tell()
+        if fen_bytes:
+            data.write(fen_bytes + b"\0" * (len(fen_bytes) % 2))  # Keep the moves 2-byte aligned
+        offset = data.tell()
+        data.write(codes.tobytes())
+        data.flush()
+
+        self.index.write(_ENTRY.pack(offset, len(codes), offset - start if fen_bytes else 0, RESULT_CODES[result]))
+        self.index.flush()
+        self.count += 1
+        return self.count - 1
+
+    def close(self):
+        """
+        Close both files
+        """
+        self.data.close()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class GameStore:
+    def __init__(self, path: str):
+        """
+        Open a store for reading. Games appended after this are not visible until the store is reopened.
+
+        Args:
+            path (str): Data file path, with the index at path + ".idx"
+
+        Raises:
+            ValueError: If the files are not game store files
+        """
+        self.path = path
+        self.data = map_file(path, DATA_MAGIC)
+        self.index = map_file(path + ".idx", INDEX_MAGIC)
+        self.count = (len(self.index) - HEADER_SIZE) // _ENTRY.size
+        self._data_view = memoryview(self.data)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _entry(self, number: int) -> tuple[int, int, int, int]:
+        if not 0 <= number < self.count:
+            raise IndexError(f"Game {number} is not in the store ({self.count} games)")
+        return _ENTRY.unpack_from(self.index, HEADER_SIZE + number * _ENTRY.size)
+
+    def moves(self, number: int):
+        """
+        Move codes of a game, without copying them out of the file
+
+        Args:
+            number (int): Game number, from 0
+
+        Raises:
+            IndexError: If there is no such game
+
+        Returns:
+            memoryview: Read-only view of 16-bit move codes (an array('H') copy on big-endian machines)
+        """
+        offset, count, _, _ = self._entry(number)
+        view = self._data_view[offset:offset + 2 * count]
+        if _NATIVE_LITTLE_ENDIAN:
+            return view.cast("H")
+        codes = array("H", view.tobytes())
+        codes.byteswap()
+        return codes
+
+    def game(self, number: int) -> tuple[str | None, object, str]:
+        """
+        Everything stored for a game
+
+        Args:
+            number (int): Game number, from 0
+
+        Raises:
+            IndexError: If there is no such game
+
+        Returns:
+            tuple: (starting FEN or None, move codes as returned by moves, result in ChessLogic.result format)
+        """
+        offset, _, fen_length, result = self._entry(number)
+        fen = None
+        if fen_length:
+            fen = bytes(self.data[offset - fen_length:offset]).rstrip(b"\0").decode("ascii")
+        return fen, self.moves(number), RESULTS[result]
+
+    def __iter__(self):
+        for number in range(self.count):
+            yield self.game(number)
+
+    def close(self):
+        """
+        Unmap and close the files. Views returned by moves must be released first.
+        """
+        self._data_view.release()
+        self.data.close()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,178 @@
+"""
+Logging and instrumentation for pychess.
+
+Everything is off by default and controlled with environment variables:
+
+    PYCHESS_LOG_LEVEL=DEBUG       Print log messages at this level and above on stderr
+                                  (DEBUG: every move and click, INFO: rejected moves and game results)
+    PYCHESS_STATS=1               Count calls and time spent in the functions decorated with timed(),
+                                  add up the counters of count() (e.g. nodes searched), and print
+                                  a report on stderr at exit
+    PYCHESS_PROFILE=out.prof      Run the whole program under cProfile and write the stats to out.prof
+                                  at exit (inspect with python -m pstats out.prof)
+
+PYCHESS_STATS is read once at import, so functions decorated while it is unset run with no
+instrumentation overhead at all.
+"""
+
+import atexit
+import cProfile
+import functools
+import logging
+import os
+import sys
+import time
+
+LOGGER_NAME = "pychess"
+
+# Silent unless a handler is configured; also stops logging's last-resort handler printing warnings
+logging.getLogger(LOGGER_NAME).addHandler(logging.NullHandler())
+
+STATS_ENABLED = os.environ.get("PYCHESS_STATS", "") not in ("", "0")
+
+"""
+Instrumentation data: name -> [calls, total seconds]
+"""
+_stats = {}
+
+_profiler = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Logger under the pychess namespace
+
+    Args:
+        name (str): Component name, e.g. "logic" or "display"
+
+    Returns:
+        logging.Logger: Logger named "pychess.<name>"
+    """
+    return logging.getLogger(f"{LOGGER_NAME}.{name}")
+
+
+def configure_logging(level: str | int | None = None):
+    """
+    Send pychess log messages to stderr
+
+    Args:
+        level (str | int | None): Level name or number, PYCHESS_LOG_LEVEL if None.
+            Nothing is configured if neither is given.
+    """
+    level = level if level is not None else os.environ.get("PYCHESS_LOG_LEVEL")
+    if not level:
+        return
+    logger = logging.getLogger(LOGGER_NAME)
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    if not any(isinstance(handler, logging.StreamHandler) for handler in logger.handlers):
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(name)s %(levelname)s: %(message)s"))
+        logger.addHandler(handler)
+
+
+def count(name: str, amount: int = 1):
+    """
+    Add to a counter, when instrumentation is enabled
+
+    Args:
+        name (str): Counter name
+        amount (int): Amount to add
+    """
+    if STATS_ENABLED:
+        entry = _stats.setdefault(name, [0, 0.0])
+        entry[0] += amount
+
+
+def timed(name: str):
+    """
+    Decorator counting the calls of a function and the time spent in it under name.
+    Returns the function unchanged when PYCHESS_STATS is not set.
+
+    Args:
+        name (str): Name reported in stats()
+    """
+    def decorator(function):
+        if not STATS_ENABLED:
+            return function
+
+        entry = _stats.setdefault(name, [0, 0.0])
+        perf_counter = time.perf_counter
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                entry[0] += 1
+                entry[1] += perf_counter() - start
+
+        return wrapper
+
+    return decorator
+
+
+def stats() -> dict:
+    """
+    Snapshot of the counters and timers
+
+    Returns:
+        dict: name -> {"calls": int, "seconds": float}
+    """
+    return {name: {"calls": calls, "seconds": seconds} for name, (calls, seconds) in _stats.items()}
+
+
+def reset_stats():
+    """
+    Zero every counter and timer
+    """
+    for entry in _stats.values():
+        entry[0] = 0
+        entry[1] = 0.0
+
+
+def format_stats() -> str:
+    """
+    Counters and timers as a table, slowest first
+
+    Returns:
+        str: One line per name with calls, total time and time per call
+    """
+    lines = [f"{'name':<32}{'calls':>10}{'total s':>12}{'per call us':>14}"]
+    for name, (calls, seconds) in sorted(_stats.items(), key=lambda item: item[1][1], reverse=True):
+        per_call = seconds / calls * 1e6 if calls else 0.0
+        lines.append(f"{name:<32}{calls:>10}{seconds:>12.4f}{per_call:>14.1f}")
+    return "\n".join(lines)
+
+
+def start_profiling(path: str | None = None):
+    """
+    Profile the rest of the program with cProfile, writing the stats to path at exit
+
+    Args:
+        path (str | None): Output file, PYCHESS_PROFILE if None. Nothing happens if neither is given.
+    """
+    global _profiler
+    path = path or os.environ.get("PYCHESS_PROFILE")
+    if not path or _profiler is not None:
+        return
+    _profiler = cProfile.Profile()
+    _profiler.enable()
+
+    def write_profile():
+        _profiler.disable()
+        _profiler.dump_stats(path)
+
+    atexit.register(write_profile)
+
+
+def setup_from_environment():
+    """
+    Apply PYCHESS_LOG_LEVEL and PYCHESS_PROFILE, called once by each entry point script
+    """
+    configure_logging()
+    start_profiling()
+
+
+if STATS_ENABLED:
+    atexit.register(lambda: print(format_stats(), file=sys.stderr))
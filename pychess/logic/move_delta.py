@@ -0,0 +1,96 @@
+"""
+Board changes published by ChessLogic to its subscribers after every move and take-back.
+
+Subscribers learn exactly which squares changed without rescanning the board, e.g. the
+GUI repaints only those squares. See ChessLogic.subscribe.
+"""
+
+
+class MoveDelta:
+    __slots__ = ("move", "undo", "changes", "captured", "castling_rook", "en_passant", "promotion")
+
+    def __init__(self, record: tuple, undo: bool):
+        """
+        Squares changed by one move, built from a ChessLogic undo record
+
+        move -> The move as (start_row, start_col, end_row, end_col, promotion), None for a jump
+            to another position of the game (see from_boards)
+
+        undo -> True if the move was taken back; changes then restore the earlier position
+
+        changes -> Tuple of (row, col, piece) for every square whose content changed, piece being
+            the new content ('' for a vacated square). Applying them in order updates a copy of the board.
+
+        captured -> (row, col, piece) of the captured piece, None for quiet moves. For en passant
+            the square is the one the captured pawn stood on.
+
+        castling_rook -> ((row, col), (row, col)) the rook moved from and to when castling, else None.
+            For a take-back it still describes the move, not the reverse.
+
+        en_passant -> True if the move captured en passant
+
+        promotion -> Piece the pawn promoted to ('q', 'r', 'b' or 'n', upper case for white), '' otherwise
+
+        Args:
+            record (tuple): Undo record as pushed by ChessLogic.make_move
+            undo (bool): True when publishing a take-back
+        """
+        move, piece, captured, en_passant = record[:4]
+        start_row, start_col, end_row, end_col, promotion = move
+        white = piece.isupper()
+
+        self.move = move
+        self.undo = undo
+        self.en_passant = en_passant
+        self.promotion = (promotion.upper() if white else promotion) if promotion else ""
+        self.captured = None
+        if captured != "":
+            self.captured = (start_row, end_col, captured) if en_passant else (end_row, end_col, captured)
+
+        self.castling_rook = None
+        if piece in "Kk" and abs(start_col - end_col) == 2:
+            kingside = end_col > start_col
+            self.castling_rook = ((start_row, 7 if kingside else 0), (start_row, 5 if kingside else 3))
+
+        if not undo:
+            changes = [(start_row, start_col, ""), (end_row, end_col, self.promotion or piece)]
+            if en_passant:
+                changes.append((start_row, end_col, ""))
+            if self.castling_rook is not None:
+                (rook_row, rook_from), (_, rook_to) = self.castling_rook
+                changes += [(rook_row, rook_from, ""), (rook_row, rook_to, "R" if white else "r")]
+        else:
+            changes = [(start_row, start_col, piece), (end_row, end_col, "" if en_passant else captured)]
+            if en_passant:
+                changes.append((start_row, end_col, captured))
+            if self.castling_rook is not None:
+                (rook_row, rook_from), (_, rook_to) = self.castling_rook
+                changes += [(rook_row, rook_to, ""), (rook_row, rook_from, "R" if white else "r")]
+        self.changes = tuple(changes)
+
+    @classmethod
+    def from_boards(cls, before, after) -> "MoveDelta":
+        """
+        Squares that differ between two positions, published when ChessLogic.seek jumps
+        between positions instead of making and taking back single moves
+
+        Args:
+            before: 8x8 board of the position left
+            after: 8x8 board of the position reached
+
+        Returns:
+            MoveDelta: Delta with only changes set; move, captured and castling_rook are None
+        """
+        delta = cls.__new__(cls)
+        delta.move = None
+        delta.undo = False
+        delta.en_passant = False
+        delta.promotion = ""
+        delta.captured = None
+        delta.castling_rook = None
+        delta.changes = tuple((row, col, after[row][col]) for row in range(8) for col in range(8)
+                              if after[row][col] != before[row][col])
+        return delta
+
+    def __repr__(self):
+        return f"MoveDelta(move={self.move!r}, undo={self.undo}, changes={self.changes!r})"
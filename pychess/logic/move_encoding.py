@@ -0,0 +1,124 @@
+"""
+16-bit packed moves.
+
+    bits 0-5    from square
+    bits 6-11   to square
+    bits 12-13  promotion piece, index into "qrbn" (0 unless the flag is PROMOTION)
+    bits 14-15  flag: NORMAL, PROMOTION, CASTLING or EN_PASSANT
+
+Squares use the same 0-63 numbering as logic/bitboard.py (row * 8 + col, row 0 = rank 8).
+No move goes from a square to itself, so the code 0 never stands for a move and can be
+used as "no move".
+"""
+
+NORMAL = 0
+PROMOTION = 1
+CASTLING = 2
+EN_PASSANT = 3
+
+NO_MOVE = 0
+
+_COLUMNS = "abcdefgh"
+_PROMOTIONS = "qrbn"  # Fixed by the format, independent of ChessLogic.PROMOTION_PIECES
+
+
+def encode_move(move: tuple[int, int, int, int, str], flag: int = NORMAL) -> int:
+    """
+    Pack a move tuple
+
+    Args:
+        move (tuple): (start_row, start_col, end_row, end_col, promotion) as used by ChessLogic
+        flag (int): CASTLING or EN_PASSANT when known; PROMOTION is set automatically
+
+    Returns:
+        int: 16-bit move code
+    """
+    start_row, start_col, end_row, end_col, promotion = move
+    code = (end_row * 8 + end_col) << 6 | (start_row * 8 + start_col)
+    if promotion != "":
+        return code | _PROMOTIONS.index(promotion.lower()) << 12 | PROMOTION << 14
+    return code | flag << 14
+
+
+def decode_move(code: int) -> tuple[int, int, int, int, str]:
+    """
+    Unpack a move code
+
+    Args:
+        code (int): 16-bit move code
+
+    Returns:
+        tuple: (start_row, start_col, end_row, end_col, promotion) as used by ChessLogic
+    """
+    start = code & 63
+    end = (code >> 6) & 63
+    promotion = _PROMOTIONS[(code >> 12) & 3] if code >> 14 == PROMOTION else ""
+    return start >> 3, start & 7, end >> 3, end & 7, promotion
+
+
+def move_flag(code: int) -> int:
+    """
+    Flag of a move code: NORMAL, PROMOTION, CASTLING or EN_PASSANT
+    """
+    return code >> 14
+
+
+def to_notation(code: int) -> str:
+    """
+    Move code in the notation of ChessLogic.move_history
+
+    Args:
+        code (int): 16-bit move code
+
+    Returns:
+        str: "O-O"/"O-O-O" for castling moves, otherwise play_move notation (e.g., "e2e4" or "e7e8q")
+    """
+    start_row, start_col, end_row, end_col, promotion = decode_move(code)
+    if code >> 14 == CASTLING:
+        return "O-O" if end_col > start_col else "O-O-O"
+    return f"{_COLUMNS[start_col]}{8 - start_row}{_COLUMNS[end_col]}{8 - end_row}{promotion}"
+
+
+def from_notation(notation: str, turn: str) -> int:
+    """
+    Move code for a move in ChessLogic notation
+
+    Args:
+        notation (str): "e2e4", "e7e8q", "O-O" or "O-O-O"
+        turn (str): Side making the move, 'w' or 'b', needed to place castling moves
+
+    Raises:
+        ValueError: If the notation is malformed
+
+    Returns:
+        int: 16-bit move code. En passant captures get the NORMAL flag, as notation does not mark them.
+    """
+    if notation in ("O-O", "O-O-O"):
+        row = 7 if turn == "w" else 0
+        return encode_move((row, 4, row, 6 if notation == "O-O" else 2, ""), CASTLING)
+    if (len(notation) not in (4, 5) or notation[0] not in _COLUMNS or notation[2] not in _COLUMNS
+            or notation[1] not in "12345678" or notation[3] not in "12345678"
+            or (len(notation) == 5 and notation[4].lower() not in _PROMOTIONS)):
+        raise ValueError(f"Invalid move notation: {notation!r}")
+    return encode_move((8 - int(notation[1]), _COLUMNS.index(notation[0]),
+                        8 - int(notation[3]), _COLUMNS.index(notation[2]), notation[4:].lower()))
+
+
+def to_coordinate_move(token: str, turn: str) -> str:
+    """
+    Convert a recorded move token to play_move notation: check and annotation marks are dropped,
+    "=" in promotions is removed and castling ("O-O", "O-O-O", also written with zeros) becomes
+    the king's move
+
+    Args:
+        token (str): Move token from a game record
+        turn (str): Side making the move, 'w' or 'b', needed to place castling moves
+
+    Returns:
+        str: Move in play_move notation
+    """
+    token = token.rstrip("+#!?")
+    if token in ("O-O", "0-0", "O-O-O", "0-0-0"):
+        rank = "1" if turn == "w" else "8"
+        return f"e{rank}{'g' if len(token) == 3 else 'c'}{rank}"
+    return token.replace("=", "").lower()
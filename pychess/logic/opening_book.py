@@ -0,0 +1,271 @@
+"""
+Opening explorer: per-position move statistics in a sorted, memory-mapped file.
+
+Book file layout:
+
+    header   16 bytes: magic, number of plies indexed (uint32), padding
+    records  28 bytes each, sorted by (position key, move):
+             Zobrist key of the position before the move (uint64), move code (uint16, see
+             logic/move_encoding.py), padding, games (uint32), white wins (uint32),
+             black wins (uint32), draws (uint32)
+
+All values are little-endian. Lookups binary search the mapped file, so only the pages
+they touch are read and the index never has to fit in memory. Building sorts in bounded
+memory: statistics are aggregated in a dictionary that is spilled to sorted run files
+when it grows too large, and the runs are merged at the end.
+"""
+
+import heapq
+import mmap
+import os
+import random
+import struct
+import tempfile
+
+from logic.move_encoding import decode_move, encode_move, to_coordinate_move
+
+BOOK_MAGIC = b"PCHBOOK1"
+HEADER = struct.Struct("<8sI4x")
+RECORD = struct.Struct("<QH2xIIII")
+_KEY = struct.Struct("<Q")
+
+# ChessLogic.result -> index of the counter it adds to (after games): white, black, draws
+_RESULT_COLUMNS = {"w": 0, "b": 1, "d": 2}
+
+
+class BookMove:
+    __slots__ = ("move", "games", "white_wins", "black_wins", "draws")
+
+    def __init__(self, move: tuple[int, int, int, int, str], games: int, white_wins: int, black_wins: int, draws: int):
+        """
+        Statistics of one move from one position
+
+        Args:
+            move (tuple): (start_row, start_col, end_row, end_col, promotion)
+            games (int): Games in which the move was played, unfinished ones included
+            white_wins (int): Of those, games won by white
+            black_wins (int): Of those, games won by black
+            draws (int): Of those, drawn games
+        """
+        self.move = move
+        self.games = games
+        self.white_wins = white_wins
+        self.black_wins = black_wins
+        self.draws = draws
+
+    def score(self, color: str) -> float:
+        """
+        Average score for color over the finished games (win 1, draw 0.5), 0.5 if none finished
+
+        Args:
+            color (str): 'w' or 'b'
+        """
+        finished = self.white_wins + self.black_wins + self.draws
+        if finished == 0:
+            return 0.5
+        wins = self.white_wins if color == "w" else self.black_wins
+        return (wins + 0.5 * self.draws) / finished
+
+    def __repr__(self):
+        return (f"BookMove(move={self.move!r}, games={self.games}, white_wins={self.white_wins}, "
+                f"black_wins={self.black_wins}, draws={self.draws})")
+
+
+class OpeningBook:
+    def __init__(self, path: str):
+        """
+        Open a book file for lookups
+
+        Args:
+            path (str): File written by build_book
+
+        Raises:
+            ValueError: If the file is not a book file
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.max_plies = HEADER.unpack_from(self.data, 0)
+        if magic != BOOK_MAGIC:
+            self.close()
+            raise ValueError(f"Not a pychess opening book: {path}")
+        self.count = (len(self.data) - HEADER.size) // RECORD.size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def lookup(self, key: int) -> list[BookMove]:
+        """
+        Statistics of every move played from a position
+
+        Args:
+            key (int): Zobrist key of the position (ChessLogic.zobrist_key)
+
+        Returns:
+            list[BookMove]: Moves in code order, empty if the position is not in the book
+        """
+        data = self.data
+        unpack_key = _KEY.unpack_from
+        size = RECORD.size
+        base = HEADER.size
+
+        # First record whose key is >= key
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if unpack_key(data, base + middle * size)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        moves = []
+        for index in range(low, self.count):
+            record_key, code, games, white_wins, black_wins, draws = RECORD.unpack_from(data, base + index * size)
+            if record_key != key:
+                break
+            moves.append(BookMove(decode_move(code), games, white_wins, black_wins, draws))
+        return moves
+
+    def probe(self, logic) -> list[BookMove]:
+        """
+        Book moves for the current position of a game, most played first
+
+        Args:
+            logic (ChessLogic): Game to look up
+
+        Returns:
+            list[BookMove]: Legal book moves, empty when out of book
+        """
+        legal = logic.legal_move_set()
+        moves = [move for move in self.lookup(logic.zobrist_key) if move.move in legal]  # Guards against key collisions
+        moves.sort(key=lambda move: move.games, reverse=True)
+        return moves
+
+    def choose_move(self, logic, min_games: int = 1, rng: random.Random | None = None) -> str | None:
+        """
+        Pick a book move at random, weighted by how often each was played
+
+        Args:
+            logic (ChessLogic): Game to pick a move for
+            min_games (int): Ignore moves played in fewer games
+            rng (random.Random | None): Random source, the random module if None
+
+        Returns:
+            str | None: Move in play_move notation, None when out of book
+        """
+        moves = [move for move in self.probe(logic) if move.games >= min_games]
+        if not moves:
+            return None
+        choice = (rng or random).choices(moves, weights=[move.games for move in moves])[0]
+        return logic.move_to_notation(choice.move)
+
+    def close(self):
+        """
+        Unmap and close the file
+        """
+        self.data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _write_run(statistics: dict, directory: str) -> str:
+    handle, path = tempfile.mkstemp(suffix=".run", dir=directory)
+    with os.fdopen(handle, "wb") as run:
+        for (key, code), (games, white_wins, black_wins, draws) in sorted(statistics.items()):
+            run.write(RECORD.pack(key, code, games, white_wins, black_wins, draws))
+    return path
+
+
+def _read_run(path: str, chunk_records: int = 4096):
+    with open(path, "rb") as run:
+        while True:
+            chunk = run.read(RECORD.size * chunk_records)
+            if not chunk:
+                return
+            yield from RECORD.iter_unpack(chunk)
+
+
+def build_book(games, output: str, max_plies: int = 20, max_entries: int = 1 << 20,
+               temp_directory: str | None = None) -> dict:
+    """
+    Aggregate the first max_plies moves of every game into a book file
+
+    Args:
+        games: Iterable of (ChessLogic at the starting position, list of move tokens in any form
+            to_coordinate_move reads, result in ChessLogic.result format or None to use the result
+            reached by playing the moves)
+        output (str): Book file to write
+        max_plies (int): Number of plies of every game to index
+        max_entries (int): Distinct (position, move) pairs kept in memory before a sorted run is
+            written to disk
+        temp_directory (str | None): Where run files go, next to output if None
+
+    Returns:
+        dict: games read, positions (records) written and number of runs merged
+    """
+    directory = temp_directory or os.path.dirname(os.path.abspath(output))
+    statistics = {}
+    runs = []
+    game_count = 0
+    try:
+        for logic, moves, result in games:
+            game_count += 1
+            played = []
+            for move in moves:
+                if len(played) == max_plies:
+                    break
+                key = logic.zobrist_key
+                if logic.play_move(to_coordinate_move(move, logic.turn)) == "":
+                    break  # Keep what was legal up to here
+                played.append((key, encode_move(logic.last_move)))
+            if result is None:
+                for move in moves[len(played):]:  # Finish the game to learn its result
+                    if logic.result != "" or logic.play_move(to_coordinate_move(move, logic.turn)) == "":
+                        break
+                result = logic.result
+            column = _RESULT_COLUMNS.get(result)
+
+            for entry in played:
+                counts = statistics.get(entry)
+                if counts is None:
+                    counts = statistics[entry] = [0, 0, 0, 0]
+                counts[0] += 1
+                if column is not None:
+                    counts[column + 1] += 1
+            if len(statistics) >= max_entries:
+                runs.append(_write_run(statistics, directory))
+                statistics = {}
+
+        if statistics:
+            runs.append(_write_run(statistics, directory))
+            statistics = {}
+
+        # Merge the sorted runs, adding up the counters of equal (position, move) pairs
+        records = 0
+        with open(output, "wb") as book:
+            book.write(HEADER.pack(BOOK_MAGIC, max_plies))
+            current = None
+            for key, code, games_played, white_wins, black_wins, draws in heapq.merge(*(_read_run(run) for run in runs)):
+                if current is not None and current[0] == key and current[1] == code:
+                    current[2] += games_played
+                    current[3] += white_wins
+                    current[4] += black_wins
+                    current[5] += draws
+                    continue
+                if current is not None:
+                    book.write(RECORD.pack(*current))
+                    records += 1
+                current = [key, code, games_played, white_wins, black_wins, draws]
+            if current is not None:
+                book.write(RECORD.pack(*current))
+                records += 1
+    finally:
+        for run in runs:
+            os.remove(run)
+
+    return {"games": game_count, "records": records, "runs": len(runs)}
@@ -0,0 +1,275 @@
+"""
+Multi-process search on top of logic/engine.py.
+
+ParallelSearcher runs a lazy SMP search: every worker process searches the same root
+position with its own Searcher, and all of them read and write one transposition table
+in shared memory. Workers finish each other's subtrees through the table, so the team
+reaches a given depth sooner than a single process. Helpers try the root moves in a
+different order than the main worker to spread out over the tree.
+"""
+
+import ctypes
+import multiprocessing
+import os
+import time
+
+from logic.chess_logic import ChessLogic
+from logic.engine import SearchResult, Searcher, SearchTimeout
+from logic.move_encoding import NO_MOVE, decode_move, encode_move
+from logic.tablebase import Tablebases
+
+# Bit layout of a packed table entry (the key is stored XORed with it, see SharedTranspositionTable)
+_SCORE_OFFSET = 1 << 20  # Scores are stored as score + offset, in 21 bits
+_MOVE_SHIFT = 21
+_BOUND_SHIFT = 37
+_DEPTH_SHIFT = 39
+_MASK_64 = (1 << 64) - 1  # Moves are 16-bit codes from logic/move_encoding.py
+
+
+class SharedTranspositionTable:
+    def __init__(self, max_entries: int = 1 << 20, slots=None):
+        """
+        Fixed-size transposition table in shared memory, with the same interface as
+        engine.TranspositionTable. Any number of processes can use it at once.
+
+        Each slot holds two 64-bit words: key XOR data and data. There is no lock; a slot torn
+        by two processes writing at once no longer matches its key and reads as a miss.
+        One entry per slot, indexed by the low bits of the key. A new position replaces the
+        slot, the same position only replaces a shallower result.
+
+        Args:
+            max_entries (int): Number of slots, rounded down to a power of two
+            slots: Shared array to attach to instead of allocating one (see attach)
+        """
+        if slots is None:
+            size = 1 << max(max_entries.bit_length() - 1, 0)
+            slots = multiprocessing.RawArray("Q", 2 * size)
+        self.slots = slots
+        self.mask = len(slots) // 2 - 1
+
+    @classmethod
+    def attach(cls, slots) -> "SharedTranspositionTable":
+        """
+        Use a table allocated by another process
+
+        Args:
+            slots: The slots attribute of the table to share
+
+        Returns:
+            SharedTranspositionTable: Table backed by the same memory
+        """
+        return cls(slots=slots)
+
+    def probe(self, key: int):
+        """
+        Look up a position
+
+        Args:
+            key (int): Zobrist key of the position
+
+        Returns:
+            tuple | None: (depth, score, bound, move) or None if the position is not stored
+        """
+        index = 2 * (key & self.mask)
+        slots = self.slots
+        data = slots[index + 1]
+        if data == 0 or slots[index] ^ data != key:
+            return None
+        return (data >> _DEPTH_SHIFT, (data & ((1 << _MOVE_SHIFT) - 1)) - _SCORE_OFFSET,
+                (data >> _BOUND_SHIFT) & 3, _decode_table_move((data >> _MOVE_SHIFT) & 0xFFFF))
+
+    def store(self, key: int, depth: int, score: int, bound: int, move):
+        """
+        Store a search result, keeping an existing deeper result for the same position
+
+        Args:
+            key (int): Zobrist key of the position
+            depth (int): Remaining depth the score was searched to
+            score (int): Score found
+            bound (int): EXACT, LOWER or UPPER
+            move: Best move found, or None
+        """
+        index = 2 * (key & self.mask)
+        slots = self.slots
+        existing = slots[index + 1]
+        if existing != 0 and slots[index] ^ existing == key and existing >> _DEPTH_SHIFT > depth:
+            return
+        data = ((max(depth, 0) << _DEPTH_SHIFT) | (bound << _BOUND_SHIFT)
+                | ((encode_move(move) if move is not None else NO_MOVE) << _MOVE_SHIFT) | (score + _SCORE_OFFSET))
+        slots[index] = (key ^ data) & _MASK_64
+        slots[index + 1] = data
+
+    def clear(self):
+        """
+        Remove every entry
+        """
+        ctypes.memset(self.slots, 0, ctypes.sizeof(self.slots))
+
+
+def _decode_table_move(code: int):
+    return decode_move(code) if code != NO_MOVE else None
+
+
+class _HelperSearcher(Searcher):
+    """
+    Searcher run inside a worker process. It also stops when the shared stop flag is set,
+    and helpers (worker_id > 0) rotate the root move order so they start in different subtrees.
+    """
+
+    def __init__(self, logic, table, stop_flag, worker_id: int, tablebases=None):
+        super().__init__(logic, table, tablebases)
+        self.stop_flag = stop_flag
+        self.worker_id = worker_id
+
+    def _check_time(self):
+        if self.stop_flag.value:
+            raise SearchTimeout()
+        super()._check_time()
+
+    def _order_moves(self, moves: list, hash_move, ply: int) -> list:
+        ordered = super()._order_moves(moves, hash_move, ply)
+        if ply == 0 and self.worker_id and len(ordered) > 1:
+            shift = self.worker_id % len(ordered)
+            ordered = ordered[shift:] + ordered[:shift]
+        return ordered
+
+
+# Per-process state set by _init_worker
+_worker_table = None
+_worker_stop = None
+_worker_tablebases = None
+
+
+def _init_worker(slots, stop_flag, tablebase_directory):
+    global _worker_table, _worker_stop, _worker_tablebases
+    _worker_table = SharedTranspositionTable.attach(slots)
+    _worker_stop = stop_flag
+    if tablebase_directory is not None:
+        _worker_tablebases = Tablebases(tablebase_directory)  # Mapped files share their pages across workers
+
+
+def _search_worker(fen: str, hash_history: list[int], backend: str, worker_id: int,
+                   depth: int | None, time_limit: float | None) -> SearchResult:
+    logic = ChessLogic.from_fen(fen, backend)
+    logic.hash_history = hash_history  # Keeps repetition draws visible to the search
+    return _HelperSearcher(logic, _worker_table, _worker_stop, worker_id, _worker_tablebases).search(depth, time_limit)
+
+
+class ParallelSearcher:
+    def __init__(self, workers: int = 0, table_entries: int = 1 << 20, backend: str = "bitboard",
+                 tablebase_directory: str | None = None):
+        """
+        Pool of search processes sharing one transposition table. The pool is started once
+        and reused by every search; call close() (or use it as a context manager) when done.
+
+        Args:
+            workers (int): Number of worker processes, 0 for one per CPU
+            table_entries (int): Size of the shared transposition table
+            backend (str): ChessLogic position backend used by the workers
+            tablebase_directory (str | None): Directory of endgame tables for the workers to probe
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.backend = backend
+        self.table = SharedTranspositionTable(table_entries)
+        self.stop_flag = multiprocessing.Value("b", 0, lock=False)
+        self.pool = multiprocessing.Pool(self.workers, _init_worker,
+                                         (self.table.slots, self.stop_flag, tablebase_directory))
+
+    def search(self, logic: ChessLogic, depth: int | None = None, time_limit: float | None = None) -> SearchResult:
+        """
+        Search the current position of logic on every worker
+
+        The search is over when the main worker finishes; the helpers are then stopped.
+        The result of the worker that completed the deepest iteration is returned, with the
+        nodes of all workers added up.
+
+        Args:
+            logic (ChessLogic): Game to search, left untouched
+            depth (int | None): Deepest iteration to run
+            time_limit (float | None): Wall-clock budget in seconds
+
+        Returns:
+            SearchResult: Best move, principal variation and statistics
+        """
+        start = time.perf_counter()
+        fen = logic.to_fen()
+        # Only positions since the last capture or pawn move can repeat
+        hash_history = logic.hash_history[-(logic.halfmove_clock + 1):]
+
+        pending = [self.pool.apply_async(_search_worker, (fen, hash_history, self.backend, worker_id, depth, time_limit))
+                   for worker_id in range(self.workers)]
+        main_result = pending[0].get()
+        self.stop_flag.value = 1  # Stop the helpers
+        results = [main_result] + [result.get() for result in pending[1:]]
+        self.stop_flag.value = 0
+
+        best = max(results, key=lambda result: result.depth)  # max keeps the main worker on ties
+        return SearchResult(best.best_move, best.pv, best.score, best.depth,
+                            sum(result.nodes for result in results), time.perf_counter() - start)
+
+    def stop(self):
+        """
+        Ask a running search to return as soon as possible with its best result so far.
+        A stop that comes in before search() starts still applies to that search.
+        """
+        self.stop_flag.value = 1
+
+    def reset_stop(self):
+        """
+        Forget a stop() that came in after the last search had already finished
+        """
+        self.stop_flag.value = 0
+
+    def clear(self):
+        """
+        Forget everything stored in the shared transposition table, e.g. before a new game
+        """
+        self.table.clear()
+
+    def close(self):
+        """
+        Shut down the worker processes
+        """
+        self.pool.close()
+        self.pool.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def measure_speedup(logic: ChessLogic, depth: int, worker_counts: list[int], backend: str = "bitboard",
+                    table_entries: int = 1 << 20) -> list[dict]:
+    """
+    Time a fixed-depth search of the same position with different numbers of workers
+
+    Each run starts with an empty table, and the first entry of worker_counts is the baseline
+    the speedup of the others is measured against (normally 1).
+
+    Args:
+        logic (ChessLogic): Position to search
+        depth (int): Search depth
+        worker_counts (list[int]): Worker counts to compare
+        backend (str): ChessLogic position backend
+        table_entries (int): Size of the shared transposition table
+
+    Returns:
+        list[dict]: workers, seconds, nodes, nodes per second, speedup, best move and score for each run
+    """
+    reports = []
+    for workers in worker_counts:
+        with ParallelSearcher(workers, table_entries, backend) as searcher:
+            result = searcher.search(logic, depth)
+        baseline = reports[0]["seconds"] if reports else result.seconds
+        reports.append({
+            "workers": workers,
+            "seconds": round(result.seconds, 4),
+            "nodes": result.nodes,
+            "nps": round(result.nodes / result.seconds) if result.seconds > 0 else 0,
+            "speedup": round(baseline / result.seconds, 2) if result.seconds > 0 else 0.0,
+            "best_move": result.best_move,
+            "score": result.score,
+        })
+    return reports
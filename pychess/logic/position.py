@@ -0,0 +1,82 @@
+"""
+Position backends for ChessLogic.
+
+Every backend stores the pieces of a position behind the same small set of
+square level operations. The backend only decides how the position is stored:
+move generation and check detection always run on ChessLogic's AttackMap.
+"""
+
+from logic.bitboard import BitboardPosition
+
+
+class ListPosition:
+    __slots__ = ("rows", "_view")
+
+    def __init__(self, rows: list[list[str]]):
+        """
+        Position stored as a two dimensional list of piece strings
+
+        Args:
+            rows (list[list[str]]): 8x8 grid in ChessLogic.board format
+        """
+        self.rows = [list(row) for row in rows]
+        self._view = None
+
+    @property
+    def board(self) -> tuple[tuple[str, ...], ...]:
+        """
+        Read-only 8x8 view of the position in ChessLogic.board format.
+        The view is rebuilt lazily, at most once per change.
+        """
+        if self._view is None:
+            self._view = tuple(tuple(row) for row in self.rows)
+        return self._view
+
+    def piece_at(self, row: int, col: int) -> str:
+        """
+        Get the piece on a square
+
+        Args:
+            row, col: The square to look up.
+
+        Returns:
+            str: Piece letter, or '' if the square is empty
+        """
+        return self.rows[row][col]
+
+    def set_piece(self, row: int, col: int, piece: str):
+        """
+        Place a piece on a square, replacing whatever was there
+
+        Args:
+            row, col: The square to update.
+            piece (str): Piece letter, or '' to clear the square
+        """
+        self.rows[row][col] = piece
+        self._view = None
+
+    def pieces(self, color: str) -> list[tuple[int, int, str]]:
+        """
+        List every piece of the given colour
+
+        Args:
+            color (str): 'w' for white, 'b' for black.
+
+        Returns:
+            list[tuple[int, int, str]]: (row, col, piece) for each piece
+        """
+        white = color == "w"
+        output = []
+        for row in range(8):
+            for col in range(8):
+                piece = self.rows[row][col]
+                if piece and piece.isupper() == white:
+                    output.append((row, col, piece))
+        return output
+
+
+# Backends selectable through ChessLogic(backend=...)
+POSITION_BACKENDS = {
+    "list": ListPosition,
+    "bitboard": BitboardPosition,
+}
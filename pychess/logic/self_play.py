@@ -0,0 +1,402 @@
+"""
+Self-play training data: many headless games played in parallel, every position they reach
+written as a fixed-size record into binary shard files.
+
+A run writes into a directory of shards. Each shard is two files:
+
+    shard-NNNNN.bin      data: an 8-byte header, then one 48-byte record per position
+    shard-NNNNN.bin.idx  index: an 8-byte header, then one 16-byte entry per game:
+                         first record (uint64), number of records (uint32), result (uint8), padding
+
+A record (little-endian) holds:
+
+    board       32 bytes, two squares per byte (high nibble first) in 0-63 square order
+                (row * 8 + col, row 0 = rank 8): index into logic/bitboard.py PIECES, 12 for empty
+    flags       uint8: bit 0 white to move, bits 1-4 castling rights K, Q, k, q
+    en_passant  uint8: file + 1 of the pawn that just moved two squares, 0 if none
+    halfmove    uint8: halfmove clock, capped at 255
+    result      uint8: result of the game, as in logic/game_store.py (0 unfinished, 1 white, 2 black, 3 draw)
+    move        uint16: move played from the position (logic/move_encoding.py), 0 for the final position
+    ply         uint16: plies played before the position
+    game        uint32: game number in the shard
+    evaluation  int16: engine.evaluate, centipawns from the side to move's point of view
+    (2 bytes padding)
+
+Records are fixed size, so record n of a shard is at byte 8 + 48 * n and a shard can be
+memory-mapped straight into a NumPy structured array (load_records), the board nibbles
+unpacked into the piece planes of logic/batch_eval.py (record_planes).
+
+Games are played on a pool of worker processes, a batch at a time. The parent writes
+each batch as it arrives and keeps at most two batches per worker in flight, so memory
+stays flat however many games are generated. A batch's records are written before its
+index entries, so an interrupted run leaves unreferenced records at worst.
+"""
+
+import collections
+import glob
+import multiprocessing
+import os
+import random
+import struct
+import time
+
+from logic.bitboard import PIECES
+from logic.chess_logic import ChessLogic
+from logic.engine import Searcher, TranspositionTable, evaluate
+from logic.game_store import RESULT_CODES, RESULTS, map_file, open_file
+
+SHARD_MAGIC = b"PCHSPD01"
+INDEX_MAGIC = b"PCHSPI01"
+HEADER_SIZE = 8
+
+RECORD = struct.Struct("<32sBBBBHHIh2x")
+_ENTRY = struct.Struct("<QIB3x")
+_GAME = struct.Struct("<I")
+_GAME_OFFSET = struct.calcsize("<32sBBBBHH")  # Byte offset of the game field in a record
+
+RECORD_FIELDS = [("board", "V32"), ("flags", "u1"), ("en_passant", "u1"), ("halfmove", "u1"), ("result", "u1"),
+                 ("move", "<u2"), ("ply", "<u2"), ("game", "<u4"), ("evaluation", "<i2"), ("padding", "V2")]
+
+SHARD_RECORDS = 1 << 20  # Records per shard before the next one is started (48 MiB)
+POLICIES = ("random", "greedy", "search")
+GREEDY_NOISE = 30  # Centipawns of random noise added to every greedy move score, so games vary
+
+EMPTY = len(PIECES)
+_SQUARE_CODES = {piece: index for index, piece in enumerate(PIECES)} | {"": EMPTY}
+_CASTLING_BITS = {"K": 2, "Q": 4, "k": 8, "q": 16}
+
+
+def _pack_board(board) -> bytes:
+    codes = [_SQUARE_CODES[piece] for row in board for piece in row]
+    return bytes(high << 4 | low for high, low in zip(codes[0::2], codes[1::2]))
+
+
+def _position_fields(logic: ChessLogic) -> tuple:
+    # Every record field of the current position except result, move and game
+    flags = logic.turn == "w"
+    for right in logic.castling_rights:
+        flags |= _CASTLING_BITS[right]
+    en_passant = logic.last_pawn_move[1] + 1 if logic.last_pawn_move is not None else 0
+    score = max(-32768, min(32767, evaluate(logic)))
+    return (_pack_board(logic.board), flags, en_passant, min(logic.halfmove_clock, 255),
+            len(logic.move_history), score)
+
+
+def _greedy_move(logic: ChessLogic, moves: list, generator: random.Random) -> tuple[int, int, int, int, str]:
+    best_move, best_score = None, None
+    for move in moves:
+        logic.make_move(move)
+        score = -evaluate(logic) + generator.random() * GREEDY_NOISE
+        logic.unmake_move()
+        if best_score is None or score > best_score:
+            best_move, best_score = move, score
+    return best_move
+
+
+def play_game(generator: random.Random, policy: str = "random", depth: int = 1, max_plies: int = 200,
+              random_plies: int = 8, backend: str = "bitboard") -> tuple[list[tuple], str]:
+    """
+    Play one game against itself
+
+    Args:
+        generator (random.Random): Source of the random choices
+        policy (str): "random" for uniformly random legal moves, "greedy" for the best static evaluation
+            one ply ahead (plus GREEDY_NOISE), "search" for the engine's best move at a shallow depth
+        depth (int): Search depth of the "search" policy
+        max_plies (int): The game is left unfinished after this many plies
+        random_plies (int): Opening plies played at random under either policy, so games differ
+        backend (str): ChessLogic position backend
+
+    Raises:
+        ValueError: If policy is unknown
+
+    Returns:
+        tuple: (list of (position fields, move code) per position reached, the final one with move 0;
+            result in ChessLogic.result format)
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown self-play policy: {policy}")
+    logic = ChessLogic(backend)
+    table = TranspositionTable(1 << 16) if policy == "search" else None
+    positions = []
+    while logic.result == "" and len(logic.move_history) < max_plies:
+        moves = logic.generate_legal_moves()
+        if policy == "random" or len(logic.move_history) < random_plies:
+            move = generator.choice(moves)
+        elif policy == "greedy":
+            move = _greedy_move(logic, moves, generator)
+        else:
+            best_move = Searcher(logic, table).search(depth).best_move
+            move = logic.parse_move(best_move) if best_move else generator.choice(moves)
+        positions.append(_position_fields(logic))
+        logic.play_legal_move(move)
+    positions.append(_position_fields(logic))
+    return list(zip(positions, logic.packed_moves().tolist() + [0])), logic.result
+
+
+def _play_batch(first_game: int, count: int, seed: int, options: dict) -> tuple[bytes, list[tuple[int, int]], float]:
+    """
+    Worker task: play count games and pack their records
+
+    Returns:
+        tuple: (records, (number of records, result code) per game, CPU seconds used)
+    """
+    start = time.process_time()
+    records = bytearray()
+    games = []
+    for number in range(first_game, first_game + count):
+        positions, result = play_game(random.Random(f"{seed}:{number}"), **options)
+        code = RESULT_CODES[result]
+        for (board, flags, en_passant, halfmove, ply, score), move in positions:
+            records += RECORD.pack(board, flags, en_passant, halfmove, code, move, ply, number, score)
+        games.append((len(positions), code))
+    return bytes(records), games, time.process_time() - start
+
+
+class ShardWriter:
+    def __init__(self, directory: str, shard_records: int = SHARD_RECORDS):
+        """
+        Write records into new shards of a directory, after any shards already there
+
+        Args:
+            directory (str): Directory of the shards, created if needed
+            shard_records (int): Records per shard; a game is never split between shards
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.shard_records = shard_records
+        existing = shard_paths(directory)
+        self.shard = int(os.path.basename(existing[-1])[6:11]) if existing else -1  # Last shard number taken
+        self.data = None
+        self.index = None
+        self.records = 0  # Records in the current shard
+        self.games = 0  # Games in the current shard
+        self.paths = []  # Shards written
+
+    def _next_shard(self):
+        self._close_files()
+        self.shard += 1
+        path = os.path.join(self.directory, f"shard-{self.shard:05d}.bin")
+        self.data = open_file(path, SHARD_MAGIC, "self-play shard")
+        self.index = open_file(path + ".idx", INDEX_MAGIC, "self-play shard")
+        self.records = 0
+        self.games = 0
+        self.paths.append(path)
+
+    def write_batch(self, records: bytes, games: list[tuple[int, int]]):
+        """
+        Append the games of a batch, as packed by the self-play workers
+
+        Args:
+            records (bytes): RECORD-packed records of the games, one after another
+            games (list[tuple[int, int]]): (number of records, result code) per game
+        """
+        records = bytearray(records)
+        view = memoryview(records)
+        entries = []
+        offset = 0
+        for count, result in games:
+            if self.data is None or (self.records and self.records + count > self.shard_records):
+                self._write_entries(entries)
+                entries = []
+                self._next_shard()
+            length = count * RECORD.size
+            for position in range(offset + _GAME_OFFSET, offset + length, RECORD.size):
+                _GAME.pack_into(records, position, self.games)  # Game numbers restart in every shard
+            self.data.write(view[offset:offset + length])
+            entries.append(_ENTRY.pack(self.records, count, result))
+            self.records += count
+            self.games += 1
+            offset += length
+        self._write_entries(entries)
+        view.release()
+
+    def _write_entries(self, entries: list[bytes]):
+        if entries:
+            self.data.flush()  # Records before the index entries pointing at them
+            self.index.write(b"".join(entries))
+            self.index.flush()
+
+    def _close_files(self):
+        if self.data is not None:
+            self.data.close()
+            self.index.close()
+
+    def close(self):
+        """
+        Close the current shard
+        """
+        self._close_files()
+        self.data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def shard_paths(directory: str) -> list[str]:
+    """
+    Data files of the shards in a directory, in writing order
+    """
+    return sorted(glob.glob(os.path.join(directory, "shard-[0-9][0-9][0-9][0-9][0-9].bin")))
+
+
+class ShardReader:
+    def __init__(self, path: str):
+        """
+        Open a shard for reading
+
+        Args:
+            path (str): Data file path, with the index at path + ".idx"
+
+        Raises:
+            ValueError: If the files are not self-play shard files
+        """
+        self.path = path
+        self.data = map_file(path, SHARD_MAGIC, "self-play shard")
+        self.index = map_file(path + ".idx", INDEX_MAGIC, "self-play shard")
+        self.count = (len(self.index) - HEADER_SIZE) // _ENTRY.size
+        self.records = (len(self.data) - HEADER_SIZE) // RECORD.size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def game(self, number: int) -> tuple[int, int, str]:
+        """
+        Index entry of a game
+
+        Args:
+            number (int): Game number in the shard, from 0
+
+        Raises:
+            IndexError: If there is no such game
+
+        Returns:
+            tuple: (first record, number of records, result in ChessLogic.result format)
+        """
+        if not 0 <= number < self.count:
+            raise IndexError(f"Game {number} is not in the shard ({self.count} games)")
+        first, count, result = _ENTRY.unpack_from(self.index, HEADER_SIZE + number * _ENTRY.size)
+        return first, count, RESULTS[result]
+
+    def record(self, number: int) -> tuple:
+        """
+        Fields of one record, in the order of the module docstring (padding left out)
+
+        Raises:
+            IndexError: If there is no such record
+        """
+        if not 0 <= number < self.records:
+            raise IndexError(f"Record {number} is not in the shard ({self.records} records)")
+        return RECORD.unpack_from(self.data, HEADER_SIZE + number * RECORD.size)
+
+    def close(self):
+        """
+        Unmap and close the files. Arrays returned by load_records keep their own mapping.
+        """
+        self.data.close()
+        self.index.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def load_records(path: str):
+    """
+    Memory-map the records of a shard as a NumPy structured array (fields as in RECORD_FIELDS).
+    Requires NumPy.
+
+    Args:
+        path (str): Shard data file
+
+    Returns:
+        np.ndarray: Read-only array of the shard's complete records
+    """
+    import numpy as np
+
+    dtype = np.dtype(RECORD_FIELDS)
+    records = (os.path.getsize(path) - HEADER_SIZE) // dtype.itemsize
+    return np.memmap(path, dtype=dtype, mode="r", offset=HEADER_SIZE, shape=(records,))
+
+
+def record_planes(records):
+    """
+    Piece planes of records, as used by logic/batch_eval.py. Requires NumPy.
+
+    Args:
+        records (np.ndarray): Structured array from load_records (or a slice of it)
+
+    Returns:
+        tuple: (N x 12 x 8 x 8 uint8 planes, N bool array that is True where white is to move)
+    """
+    import numpy as np
+
+    from logic.batch_eval import codes_to_planes
+
+    packed = np.frombuffer(records["board"].tobytes(), dtype=np.uint8).reshape(len(records), 32)
+    codes = np.empty((len(records), 64), dtype=np.uint8)
+    codes[:, 0::2] = packed >> 4
+    codes[:, 1::2] = packed & 15
+    return codes_to_planes(codes), (records["flags"] & 1).astype(bool)
+
+
+def generate(directory: str, games: int, workers: int = 0, batch_size: int = 16, seed: int = 0,
+             shard_records: int = SHARD_RECORDS, progress=None, **options) -> dict:
+    """
+    Play games in parallel and write their positions into new shards of a directory
+
+    Args:
+        directory (str): Shard directory
+        games (int): Number of games to play
+        workers (int): Worker processes, 0 for one per CPU, 1 to play in this process
+        batch_size (int): Games a worker plays per task
+        seed (int): The same seed and options always produce the same games
+        shard_records (int): Records per shard
+        progress: Function called with the statistics so far after every batch written, or None
+        **options: policy, depth, max_plies, random_plies and backend, see play_game
+
+    Returns:
+        dict: games, positions, shards (paths written), seconds, cpu_seconds, workers, positions_per_second
+            and positions_per_core (positions per CPU second of the workers)
+    """
+    workers = workers or os.cpu_count() or 1
+    if options.get("policy", "random") not in POLICIES:
+        raise ValueError(f"Unknown self-play policy: {options['policy']}")
+    tasks = ((first, min(batch_size, games - first), seed, options) for first in range(0, games, batch_size))
+    stats = {"games": 0, "positions": 0, "shards": [], "seconds": 0.0, "cpu_seconds": 0.0, "workers": workers,
+             "positions_per_second": 0.0, "positions_per_core": 0.0}
+    start = time.perf_counter()
+
+    def record(writer: ShardWriter, batch: tuple):
+        records, batch_games, cpu_seconds = batch
+        writer.write_batch(records, batch_games)
+        stats["games"] += len(batch_games)
+        stats["positions"] += len(records) // RECORD.size
+        stats["cpu_seconds"] += cpu_seconds
+        stats["seconds"] = time.perf_counter() - start
+        stats["positions_per_second"] = stats["positions"] / stats["seconds"] if stats["seconds"] else 0.0
+        stats["positions_per_core"] = stats["positions"] / stats["cpu_seconds"] if stats["cpu_seconds"] else 0.0
+        if progress is not None:
+            progress(stats)
+
+    with ShardWriter(directory, shard_records) as writer:
+        if workers == 1:
+            for task in tasks:
+                record(writer, _play_batch(*task))
+        else:
+            with multiprocessing.Pool(workers) as pool:
+                # Back-pressure: a new batch is only handed out once an old one has been written
+                pending = collections.deque()
+                for task in tasks:
+                    pending.append(pool.apply_async(_play_batch, task))
+                    if len(pending) >= workers * 2:
+                        record(writer, pending.popleft().get())
+                while pending:
+                    record(writer, pending.popleft().get())
+        stats["shards"] = list(writer.paths)
+    return stats
@@ -0,0 +1,607 @@
+"""
+Endgame tablebases for positions with up to four pieces, kings included.
+
+Tables are built by retrograde analysis: every position of a material signature
+(e.g. KRK, KQKR, KPK) is enumerated, checkmates are marked, and results are spread
+backwards ply by ply through un-moves, so each position ends up with its exact
+win/draw/loss value and distance to mate. Captures and promotions leave the table
+and are answered by the smaller tables, which are generated first.
+
+Tables are stored for one orientation of each signature, the side with more material
+as white; probes of the other orientation mirror the board and swap colours.
+Positions are reduced by symmetry before indexing: pawnless tables keep the white
+king in the a1-d1-d4 triangle (mirroring files, ranks and the diagonal), tables with
+pawns keep it on files a-d. Pawns may only belong to one side, so en passant never
+comes up. Castling rights and the fifty-move rule are ignored. Generation is offline
+work: a three-piece table takes seconds to a minute, a four-piece one around a quarter
+of an hour.
+
+Table file layout:
+
+    header  24 bytes: magic, material signature (8 bytes, NUL padded), positions per side (uint32), padding
+    values  one int8 per position with white to move, then one per position with black to move
+
+A value v is from the side to move's point of view: 0 for a draw (or an unreachable
+index), v > 0 for a win with mate in v plies, v < 0 for a loss with mate in -v - 1 plies.
+"""
+
+import mmap
+import os
+import struct
+from array import array
+
+from logic.bitboard import PAWN_ATTACKS, iter_bits, piece_attacks
+
+TABLE_MAGIC = b"PCHTB001"
+HEADER = struct.Struct("<8s8sI4x")
+TABLE_SUFFIX = ".tb"
+
+MAX_PIECES = 4
+MAX_PLIES = 126  # Longest distance to mate a table value can hold
+
+# Win/draw/loss from the side to move's point of view
+WIN = 1
+DRAW = 0
+LOSS = -1
+
+_PIECE_ORDER = "KQRBNP"
+_MATERIAL_VALUES = {"K": 0, "Q": 9, "R": 5, "B": 3, "N": 3, "P": 1}
+_PROMOTIONS = "QRBN"
+
+# Squares the white king is kept on after symmetry reduction (row 0 = rank 8)
+PAWNLESS_KING_SQUARES = [square for square in range(64)
+                         if (square & 7) <= 3 and (square >> 3) >= 4 and 7 - (square >> 3) <= (square & 7)]
+PAWN_KING_SQUARES = [square for square in range(64) if (square & 7) <= 3]
+
+
+def _transpose(square: int) -> int:
+    # Mirror in the a1-h8 diagonal
+    return (7 - (square & 7)) * 8 + 7 - (square >> 3)
+
+
+def _normalise_side(side: str) -> str:
+    return "K" + "".join(sorted(side[1:], key=_PIECE_ORDER.index))
+
+
+def _side_strength(side: str) -> tuple:
+    return sum(_MATERIAL_VALUES[piece] for piece in side), len(side), side
+
+
+def parse_material(material: str) -> tuple[str, str, bool]:
+    """
+    Split a material signature into its stored orientation
+
+    Args:
+        material (str): Signature such as "KQK", "KRKP" or "KKQ", white's pieces first
+
+    Raises:
+        ValueError: If the signature is malformed, has more than MAX_PIECES pieces or pawns on both sides
+
+    Returns:
+        tuple: (white pieces, black pieces, flipped) of the stored table, flipped being True when
+            the signature has the weaker side as white
+    """
+    material = material.upper()
+    if len(material) > MAX_PIECES or material.count("K") != 2 or not material.startswith("K") \
+            or any(piece not in _PIECE_ORDER for piece in material):
+        raise ValueError(f"Invalid material signature: {material!r}")
+    split = material.index("K", 1)
+    white, black = _normalise_side(material[:split]), _normalise_side(material[split:])
+    if "P" in white and "P" in black:
+        raise ValueError(f"Pawns on both sides are not supported: {material}")
+    if _side_strength(black) > _side_strength(white):
+        return black, white, True
+    return white, black, False
+
+
+class _Layout:
+    def __init__(self, white: str, black: str):
+        """
+        Indexing scheme of one table. Pieces are numbered white king, other white pieces,
+        black king, other black pieces; a position is the list of their squares.
+        """
+        self.pieces = list(white) + [piece.lower() for piece in black]
+        self.white = [piece.isupper() for piece in self.pieces]
+        self.black_king = len(white)
+        self.pawns = "P" in white or "P" in black
+        self.king_squares = PAWN_KING_SQUARES if self.pawns else PAWNLESS_KING_SQUARES
+        self.king_slots = [-1] * 64
+        for slot, square in enumerate(self.king_squares):
+            self.king_slots[square] = slot
+        self.others = len(self.pieces) - 1
+        self.size = len(self.king_squares) * 64 ** self.others
+
+    def canonical(self, squares: list[int]) -> list[int]:
+        """
+        Symmetric image of a position with the white king on one of the king squares
+        """
+        if squares[0] & 7 > 3:
+            squares = [square ^ 7 for square in squares]
+        if not self.pawns:
+            if squares[0] >> 3 < 4:
+                squares = [square ^ 56 for square in squares]
+            if 7 - (squares[0] >> 3) > squares[0] & 7:
+                squares = [_transpose(square) for square in squares]
+        return squares
+
+    def images(self, squares: list[int]) -> list[list[int]]:
+        """
+        Every distinct position the symmetries map a stored position to that canonical maps back
+        to it, itself included. (With the white king on the diagonal, a position and its mirror
+        image are both stored.)
+        """
+        images = {tuple(squares), tuple(square ^ 7 for square in squares)}
+        if not self.pawns:
+            for image in list(images):
+                images.add(tuple(square ^ 56 for square in image))
+            for image in list(images):
+                images.add(tuple(_transpose(square) for square in image))
+        return [list(image) for image in images if self.canonical(list(image)) == squares]
+
+    def index(self, squares: list[int]) -> int:
+        """
+        Index of a position whose white king is on a king square
+        """
+        index = self.king_slots[squares[0]]
+        for square in squares[1:]:
+            index = index * 64 + square
+        return index
+
+    def squares(self, index: int) -> list[int]:
+        """
+        Position stored at an index
+        """
+        squares = []
+        for _ in range(self.others):
+            index, square = divmod(index, 64)
+            squares.append(square)
+        squares.append(self.king_squares[index])
+        squares.reverse()
+        return squares
+
+
+class EndgameTable:
+    def __init__(self, white: str, black: str, values: tuple):
+        """
+        Values of every position of one material signature
+
+        Args:
+            white (str): White pieces of the stored orientation, e.g. "KQ"
+            black (str): Black pieces of the stored orientation, e.g. "K"
+            values (tuple): (white to move, black to move) int8 sequences indexed like the layout
+        """
+        self.white = white
+        self.black = black
+        self.material = white + black
+        self.layout = _Layout(white, black)
+        self.values = values
+        self.path = None  # File the table was loaded from
+        self._file = None
+        self._data = None
+
+    @classmethod
+    def load(cls, path: str) -> "EndgameTable":
+        """
+        Map a table file
+
+        Args:
+            path (str): File written by save
+
+        Raises:
+            ValueError: If the file is not a table file or is truncated
+        """
+        handle = open(path, "rb")
+        data = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, material, size = HEADER.unpack_from(data, 0)
+        if magic != TABLE_MAGIC or len(data) != HEADER.size + 2 * size:
+            data.close()
+            handle.close()
+            raise ValueError(f"Not a pychess endgame table: {path}")
+        white, black, _ = parse_material(material.rstrip(b"\0").decode("ascii"))
+        view = memoryview(data).cast("b")
+        table = cls(white, black, (view[HEADER.size:HEADER.size + size], view[HEADER.size + size:]))
+        table.path, table._file, table._data = path, handle, data
+        return table
+
+    def save(self, path: str):
+        """
+        Write the table to a file
+        """
+        size = self.layout.size
+        with open(path, "wb") as output:
+            output.write(HEADER.pack(TABLE_MAGIC, self.material.encode("ascii"), size))
+            for values in self.values:
+                output.write(bytes(values) if not isinstance(values, array) else values.tobytes())
+
+    def value(self, squares: list[int], white_to_move: bool) -> int:
+        """
+        Value of a position of this table
+
+        Args:
+            squares (list[int]): Square of every piece, in layout order
+            white_to_move (bool): Side to move
+
+        Returns:
+            int: Table value from the side to move's point of view (see the module docstring)
+        """
+        layout = self.layout
+        return self.values[0 if white_to_move else 1][layout.index(layout.canonical(squares))]
+
+    def close(self):
+        """
+        Unmap the file the table was loaded from, if any
+        """
+        if self._data is not None:
+            self.values = ()
+            self._data.close()
+            self._file.close()
+            self._data = self._file = None
+
+
+class Tablebases:
+    def __init__(self, directory: str | None = None):
+        """
+        Collection of endgame tables, loaded from directory on first use
+
+        Args:
+            directory (str | None): Directory holding <material>.tb files, None for in-memory tables only
+        """
+        self.directory = directory
+        self.tables = {}  # Stored material -> EndgameTable, None when not available
+
+    def table(self, material: str) -> EndgameTable | None:
+        """
+        Table of a material signature in its stored orientation, None if there is none
+        """
+        if material in self.tables:
+            return self.tables[material]
+        table = None
+        if self.directory is not None:
+            path = os.path.join(self.directory, material + TABLE_SUFFIX)
+            if os.path.exists(path):
+                table = EndgameTable.load(path)
+        self.tables[material] = table
+        return table
+
+    def add(self, table: EndgameTable):
+        """
+        Make a generated table available for probing
+        """
+        self.tables[table.material] = table
+
+    def probe_pieces(self, pieces: list[tuple[str, int]], white_to_move: bool) -> int | None:
+        """
+        Table value of a position given as a piece list
+
+        Args:
+            pieces (list[tuple[str, int]]): (piece letter, square) of every piece on the board
+            white_to_move (bool): Side to move
+
+        Returns:
+            int | None: Table value from the side to move's point of view, None if no table covers the position
+        """
+        if len(pieces) > MAX_PIECES:
+            return None
+        if len(pieces) == 2:
+            return 0  # Bare kings
+        letters = sorted((piece for piece, _ in pieces), key=lambda piece: _PIECE_ORDER.index(piece.upper()))
+        white = "".join(piece for piece in letters if piece.isupper())
+        black = "".join(piece for piece in letters if piece.islower()).upper()
+        try:
+            stored_white, stored_black, flipped = parse_material(white + black)
+        except ValueError:
+            return None
+        table = self.table(stored_white + stored_black)
+        if table is None:
+            return None
+        if flipped:
+            pieces = [(piece.swapcase(), square ^ 56) for piece, square in pieces]
+            white_to_move = not white_to_move
+        order = table.layout.pieces
+        squares = [None] * len(order)
+        for piece, square in pieces:
+            slot = order.index(piece)
+            while squares[slot] is not None:
+                slot += 1  # Several pieces of the same kind
+            squares[slot] = square
+        return table.value(squares, white_to_move)
+
+    def probe(self, logic) -> tuple[int, int] | None:
+        """
+        Exact result of the current position of a game
+
+        Args:
+            logic (ChessLogic): Game to look up
+
+        Returns:
+            tuple[int, int] | None: (WIN, DRAW or LOSS for the side to move, plies to mate or 0 for draws),
+                None when the position is not covered (too many pieces, castling rights, no table)
+        """
+        if logic.castling_rights:
+            return None
+        pieces = [(piece, row * 8 + col) for color in "wb" for row, col, piece in logic.position.pieces(color)]
+        value = self.probe_pieces(pieces, logic.turn == "w")
+        if value is None:
+            return None
+        if value > 0:
+            return WIN, value
+        if value < 0:
+            return LOSS, -value - 1
+        return DRAW, 0
+
+    def best_move(self, logic) -> tuple[tuple[int, int, int, int, str], int] | None:
+        """
+        Move that wins fastest, keeps the draw or loses slowest
+
+        Args:
+            logic (ChessLogic): Game to pick a move for
+
+        Returns:
+            tuple | None: (move tuple, table value of the position), None when the position is not covered
+                or has no legal move
+        """
+        if self.probe(logic) is None:
+            return None
+        best, best_value = None, None
+        for move in logic.generate_legal_moves():
+            logic.make_move(move)
+            try:
+                child = self.probe(logic)
+            finally:
+                logic.unmake_move()
+            if child is None:
+                return None
+            wdl, plies = child
+            # Our value after the move: the opponent's loss is our win one ply later, and so on
+            value = plies + 1 if wdl == LOSS else -plies - 2 if wdl == WIN else 0
+            if best is None or _preference(value) > _preference(best_value):
+                best, best_value = move, value
+        if best is None:
+            return None
+        return best, best_value
+
+    def close(self):
+        """
+        Unmap every loaded table
+        """
+        for table in self.tables.values():
+            if table is not None:
+                table.close()
+        self.tables = {}
+
+
+def _preference(value: int) -> int:
+    # Orders table values from best to worst for the side to move: quick wins, draws, slow losses
+    if value > 0:
+        return 2 * MAX_PLIES - value
+    return -MAX_PLIES - value - 1 if value < 0 else 0
+
+
+def _sub_materials(white: str, black: str) -> set[str]:
+    # Signatures reachable by one capture or promotion, in stored orientation
+    reachable = set()
+    sides = (white, black)
+    for side in range(2):
+        for position in range(1, len(sides[side])):
+            changed = list(sides)
+            changed[side] = sides[side][:position] + sides[side][position + 1:]
+            reachable.add(changed[0] + changed[1])
+            if sides[side][position] == "P":
+                for promotion in _PROMOTIONS:
+                    changed = list(sides)
+                    changed[side] = sides[side][:position] + promotion + sides[side][position + 1:]
+                    reachable.add(changed[0] + changed[1])
+    stored = set()
+    for material in reachable:
+        if len(material) > 2:
+            stored_white, stored_black, _ = parse_material(material)
+            stored.add(stored_white + stored_black)
+    return stored
+
+
+def _attacked(square: int, pieces: list[str], squares: list[int], attackers: list[int], occupied: int) -> bool:
+    for slot in attackers:
+        origin = squares[slot]
+        if origin >= 0 and piece_attacks(origin, pieces[slot], occupied) >> square & 1:
+            return True
+    return False
+
+
+def generate_table(material: str, tablebases: Tablebases, progress=None) -> EndgameTable:
+    """
+    Build the table of a material signature by retrograde analysis. Tables of the signatures
+    reachable by captures and promotions are taken from tablebases, or generated and added to it.
+
+    Args:
+        material (str): Signature such as "KRK" or "KQKR"
+        tablebases (Tablebases): Tables already available; the new table is added to it
+        progress: Function called with a message string as generation advances, or None
+
+    Raises:
+        ValueError: If the signature is not supported
+
+    Returns:
+        EndgameTable: The table in its stored orientation
+    """
+    white, black, _ = parse_material(material)
+    for sub_material in sorted(_sub_materials(white, black), key=len):
+        if tablebases.table(sub_material) is None:
+            generate_table(sub_material, tablebases, progress)
+
+    layout = _Layout(white, black)
+    pieces = layout.pieces
+    count = len(pieces)
+    size = layout.size
+    slots_by_side = ([slot for slot in range(count) if not layout.white[slot]],
+                     [slot for slot in range(count) if layout.white[slot]])  # Indexed by white to move
+    kings = (layout.black_king, 0)
+
+    values = (array("b", bytes(size)), array("b", bytes(size)))
+    done = (bytearray(size), bytearray(size))
+    remaining = (array("B", bytes(size)), array("B", bytes(size)))  # In-table moves not known to lose
+    longest_loss = (array("b", [-1]) * size, array("b", [-1]) * size)
+    escapes = (bytearray(size), bytearray(size))  # Drawing or winning exit through a capture or promotion
+    queued_win = (array("b", bytes(size)), array("b", bytes(size)))
+    buckets = {}  # ply -> list of (index * 2 + side) * 2 + is_win
+
+    def push(ply: int, side: int, index: int, win: bool):
+        if ply > MAX_PLIES:
+            raise ValueError(f"{layout.pieces} needs more than {MAX_PLIES} plies to mate")
+        buckets.setdefault(ply, []).append((index * 2 + side) * 2 + win)
+
+    # Forward pass: find mates and stalemates, count the moves of every position and score its exits
+    for index in range(size):
+        squares = layout.squares(index)
+        occupied = 0
+        for square in squares:
+            occupied |= 1 << square
+        if occupied.bit_count() != count or any(pieces[slot] in "Pp" and square >> 3 in (0, 7)
+                                                 for slot, square in enumerate(squares)):
+            done[0][index] = done[1][index] = 1
+            continue
+        for side in (1, 0):  # 1: white to move
+            own, enemy = slots_by_side[side], slots_by_side[1 - side]
+            if _attacked(squares[kings[1 - side]], pieces, squares, own, occupied):
+                done[side][index] = 1  # The side not to move is in check
+                continue
+            in_table = 0
+            moves = 0
+            best_win = 0
+            longest = -1
+            escape = False
+            enemy_occupied = 0
+            for slot in enemy:
+                enemy_occupied |= 1 << squares[slot]
+            for slot in own:
+                origin = squares[slot]
+                piece = pieces[slot]
+                if piece in "Pp":
+                    step = -8 if piece == "P" else 8
+                    targets = 0
+                    if not occupied >> (origin + step) & 1:
+                        targets = 1 << (origin + step)
+                        if origin >> 3 == (6 if piece == "P" else 1) and not occupied >> (origin + 2 * step) & 1:
+                            targets |= 1 << (origin + 2 * step)
+                    targets |= PAWN_ATTACKS["w" if piece == "P" else "b"][origin] & enemy_occupied
+                else:
+                    targets = piece_attacks(origin, piece, occupied) & ~(occupied & ~enemy_occupied)
+                for target in iter_bits(targets):
+                    after = squares[:]
+                    after[slot] = target
+                    captured = -1
+                    if enemy_occupied >> target & 1:
+                        captured = next(other for other in enemy if squares[other] == target)
+                        after[captured] = -1
+                    after_occupied = occupied & ~(1 << origin) | 1 << target
+                    if _attacked(after[kings[side]], pieces, after, enemy, after_occupied):
+                        continue
+                    promotions = _PROMOTIONS if piece in "Pp" and target >> 3 in (0, 7) else ""
+                    if captured < 0 and not promotions:
+                        in_table += 1
+                        moves += 1
+                        continue
+                    remaining_pieces = [(pieces[other], after[other]) for other in range(count)
+                                        if other != captured and other != slot]
+                    for promotion in promotions or (piece,):
+                        moved = promotion if piece.isupper() else promotion.lower()
+                        moves += 1
+                        value = tablebases.probe_pieces(remaining_pieces + [(moved, target)], side == 0)
+                        if value == 0:
+                            escape = True
+                        elif value > 0:
+                            longest = max(longest, value)
+                        elif best_win == 0 or -value < best_win:
+                            best_win = -value
+            if moves == 0:
+                if _attacked(squares[kings[side]], pieces, squares, enemy, occupied):
+                    push(0, side, index, False)  # Checkmated
+                else:
+                    done[side][index] = 1  # Stalemate
+                continue
+            remaining[side][index] = in_table
+            longest_loss[side][index] = longest
+            escapes[side][index] = escape or best_win > 0
+            if best_win:
+                queued_win[side][index] = best_win
+                push(best_win, side, index, True)
+            elif in_table == 0 and not escape:
+                push(longest + 1, side, index, False)
+    if progress is not None:
+        progress(f"{white + black}: {size * 2} positions scanned")
+
+    # Retrograde pass: settle positions in order of distance to mate and spread each result to its predecessors
+    ply = 0
+    while buckets:
+        ply = min(buckets)
+        for item in buckets.pop(ply):
+            win = item & 1
+            side = item >> 1 & 1
+            index = item >> 2
+            if done[side][index]:
+                continue
+            done[side][index] = 1
+            values[side][index] = ply if win else -ply - 1
+            previous = 1 - side
+            predecessor_done = done[previous]
+            for predecessor in _predecessors(layout, layout.squares(index), previous):
+                if predecessor_done[predecessor]:
+                    continue
+                if not win:
+                    queued = queued_win[previous][predecessor]
+                    if queued == 0 or ply + 1 < queued:
+                        queued_win[previous][predecessor] = ply + 1
+                        push(ply + 1, previous, predecessor, True)
+                    continue
+                left = remaining[previous][predecessor] - 1
+                remaining[previous][predecessor] = left
+                if ply > longest_loss[previous][predecessor]:
+                    longest_loss[previous][predecessor] = ply
+                if left == 0 and not escapes[previous][predecessor]:
+                    push(longest_loss[previous][predecessor] + 1, previous, predecessor, False)
+    if progress is not None:
+        progress(f"{white + black}: longest mate {ply} plies")
+
+    table = EndgameTable(white, black, (values[1], values[0]))
+    tablebases.add(table)
+    return table
+
+
+def _predecessors(layout: _Layout, squares: list[int], side: int):
+    """
+    Indexes of the positions, side to move given, from which a non-capturing move leads to
+    the position or one of its symmetric images. A position reaching several images through
+    different moves is yielded once per move, so counts match the forward pass.
+    """
+    pieces = layout.pieces
+    movers = [slot for slot in range(len(pieces)) if layout.white[slot] == bool(side)]
+    waiting_king = layout.black_king if side else 0
+    king_slots = layout.king_slots
+    for image in layout.images(squares):
+        occupied = 0
+        for square in image:
+            occupied |= 1 << square
+        king_on_slot = king_slots[image[0]] >= 0
+        for slot in movers:
+            if not king_on_slot and slot != 0:
+                continue  # Only a white king move can reach a stored position from here
+            target = image[slot]
+            piece = pieces[slot]
+            if piece in "Pp":
+                step = 8 if piece == "P" else -8  # Backwards
+                origins = 0
+                origin = target + step
+                if 8 <= origin < 56 and not occupied >> origin & 1:
+                    origins = 1 << origin
+                    if target >> 3 == (4 if piece == "P" else 3) and not occupied >> (origin + step) & 1:
+                        origins |= 1 << (origin + step)
+            else:
+                origins = piece_attacks(target, piece, occupied) & ~occupied
+            for origin in iter_bits(origins):
+                before = image[:]
+                before[slot] = origin
+                if king_slots[before[0]] < 0:
+                    continue
+                before_occupied = occupied & ~(1 << target) | 1 << origin
+                if _attacked(before[waiting_king], pieces, before, movers, before_occupied):
+                    continue
+                yield layout.index(before)
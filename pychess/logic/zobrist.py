@@ -0,0 +1,87 @@
+"""
+Zobrist hashing for ChessLogic positions.
+
+A position key is the XOR of one random 64-bit number per (piece, square) pair on the
+board, plus numbers for the side to move, each castling right and the en passant file.
+Moving a piece only flips the numbers that changed, so ChessLogic keeps its key up to
+date incrementally. Keys are generated from a fixed seed and are stable between runs,
+so they can be stored in caches, transposition tables and on disk.
+"""
+
+import random
+
+_generator = random.Random(0x5EED_C4E55)
+
+# PIECE_KEYS[piece][square] -> key for piece standing on square (row * 8 + col)
+PIECE_KEYS = {piece: [_generator.getrandbits(64) for _ in range(64)] for piece in "PNBRQKpnbrqk"}
+
+# XORed in when black is to move
+SIDE_KEY = _generator.getrandbits(64)
+
+CASTLING_KEYS = {right: _generator.getrandbits(64) for right in "KQkq"}
+
+# EN_PASSANT_KEYS[col] -> key for an en passant capture being available on that file
+EN_PASSANT_KEYS = [_generator.getrandbits(64) for _ in range(8)]
+
+
+def castling_key(castling_rights: str) -> int:
+    """
+    Combined key of a set of castling rights
+
+    Args:
+        castling_rights (str): Rights in FEN order, e.g. "KQkq", '' for none
+
+    Returns:
+        int: XOR of the keys of every right held
+    """
+    key = 0
+    for right in castling_rights:
+        key ^= CASTLING_KEYS[right]
+    return key
+
+
+def en_passant_key(position, last_pawn_move: tuple[int, int] | None) -> int:
+    """
+    Key for the en passant state. The file only counts when an enemy pawn stands next
+    to the pawn that just moved two squares, so positions that differ only by an
+    unusable en passant square hash the same.
+
+    Args:
+        position: Position backend
+        last_pawn_move (tuple[int, int] | None): Square of the pawn that just moved two squares
+
+    Returns:
+        int: En passant file key, or 0 if no en passant capture is possible
+    """
+    if last_pawn_move is None:
+        return 0
+    row, col = last_pawn_move
+    enemy_pawn = "P" if position.piece_at(row, col) == "p" else "p"
+    for adjacent_col in (col - 1, col + 1):
+        if 0 <= adjacent_col < 8 and position.piece_at(row, adjacent_col) == enemy_pawn:
+            return EN_PASSANT_KEYS[col]
+    return 0
+
+
+def hash_position(position, turn: str, castling_rights: str, last_pawn_move: tuple[int, int] | None) -> int:
+    """
+    Compute a position key from scratch
+
+    Args:
+        position: Position backend
+        turn (str): Side to move, 'w' or 'b'
+        castling_rights (str): Castling rights in FEN order
+        last_pawn_move (tuple[int, int] | None): Square of the pawn that just moved two squares
+
+    Returns:
+        int: 64-bit Zobrist key
+    """
+    key = 0
+    for row in range(8):
+        for col in range(8):
+            piece = position.piece_at(row, col)
+            if piece != "":
+                key ^= PIECE_KEYS[piece][row * 8 + col]
+    if turn == "b":
+        key ^= SIDE_KEY
+    return key ^ castling_key(castling_rights) ^ en_passant_key(position, last_pawn_move)
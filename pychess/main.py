@@ -1,49 +1,109 @@
-import pygame
+import sys
 
-from display.classes.Board import Board
-from logic.chess_logic import ChessLogic
+from logic.instrumentation import setup_from_environment, timed
 
 """
 Configuration Variables
 """
 WINDOW_SIZE = (600, 600)
+FRAME_RATE = 60  # Upper bound on redraws per second while events keep arriving
+WORKER_MODE = "thread"  # "thread" or "process": where moves are validated and the engine thinks; None for the GUI thread
+ENGINE_COLOR = None  # 'w' or 'b' to play against the engine, None for two human players
+ENGINE_THINK_TIME = 1.0  # Seconds per engine move
+BOOK_PATH = None  # Opening book built with book.py for the engine to play from, None for no book
+TABLEBASE_DIRECTORY = None  # Endgame tables generated with endgames.py, None for none
 
-"""
-Pygame Initialization
-"""
-pygame.init()
-screen = pygame.display.set_mode(WINDOW_SIZE)
-font = pygame.font.SysFont(None, 50)
 
-"""
-Chess Game Logic and Chess Board Initalization
-"""
-logic = ChessLogic()
-board = Board(WINDOW_SIZE[0], WINDOW_SIZE[1], logic)
-
-def draw(display, font):
+@timed("frame")
+def draw(display, font, board, update):
     """
     Draw/Update the current game state to Pygame Window
 
     Args:
         display: Pygame Screen Object
         font: Pygame Font Object
+        board: Board to draw
+        update: pygame.display.update, passed in so pygame is only imported by main()
     """
-    display.fill("white")
-    board.draw(display, font)
-    pygame.display.update()
+    dirty_rects = board.draw(display, font)
+    if dirty_rects:
+        update(dirty_rects)  # Only push the changed areas to the screen
+
+
+def main() -> int:
+    """
+    Open the window and run the game loop until it is closed
+
+    Pygame and the display classes are imported here, not at module level, so the logic
+    package (and uci.py) never pull them in.
+    """
+    import pygame
+
+    from display.classes.Board import Board
+    from logic.background import BackgroundWorker
+    from logic.chess_logic import ChessLogic
+    from logic.opening_book import OpeningBook
+    from logic.tablebase import Tablebases
+
+    """
+    Logging and profiling, see logic/instrumentation.py
+    """
+    setup_from_environment()
+
+    """
+    Pygame Initialization
+    """
+    pygame.init()
+    screen = pygame.display.set_mode(WINDOW_SIZE)
+    font = pygame.font.SysFont(None, 50)
+
+    """
+    Chess Game Logic and Chess Board Initalization
+    """
+    WORKER_EVENT = pygame.event.custom_type()  # Posted by the worker thread when it has results
+
+    logic = ChessLogic()
+    worker = None
+    if WORKER_MODE is not None:
+        worker = BackgroundWorker(logic, ENGINE_COLOR, ENGINE_THINK_TIME, WORKER_MODE,
+                                  on_result=lambda: pygame.event.post(pygame.event.Event(WORKER_EVENT)),
+                                  book=OpeningBook(BOOK_PATH) if BOOK_PATH is not None else None,
+                                  tablebases=Tablebases(TABLEBASE_DIRECTORY) if TABLEBASE_DIRECTORY is not None else None)
+    board = Board(WINDOW_SIZE[0], WINDOW_SIZE[1], logic, worker)
 
-if __name__ == "__main__":
     """
     Game Loop
     """
+    pygame.event.set_blocked(pygame.MOUSEMOTION)  # Nothing reacts to the pointer moving, do not wake up for it
+    clock = pygame.time.Clock()
+    draw(screen, font, board, pygame.display.update)
+    if worker is not None:
+        worker.request_engine_move()  # In case the engine plays white
+
     running = True
     while running:
-        mx, my = pygame.mouse.get_pos()
-        for event in pygame.event.get():
+        # Sleep until something happens instead of redrawing in a busy loop
+        events = [pygame.event.wait()] + pygame.event.get()
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 if event.button == 1:
-                    board.handle_click(mx, my)
-        draw(screen, font)
\ No newline at end of file
+                    board.handle_click(*event.pos)
+            elif event.type == pygame.KEYDOWN:
+                board.handle_key(event.key)
+            elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                board.invalidate()
+        if worker is not None:
+            worker.poll()  # Applies the moves the worker played to the board
+        draw(screen, font, board, pygame.display.update)
+        clock.tick(FRAME_RATE)
+
+    if worker is not None:
+        worker.close()
+    pygame.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Perft (performance test) harness for the ChessLogic rules engine.
+
+Counts the leaf nodes of the legal move tree from reference positions and compares
+them with the published values, reporting nodes per second for every depth.
+Only the logic package is imported, so this runs without pygame or a display.
+
+Usage (from the pychess directory):
+    python perft.py
+    python perft.py --depth 5 --backend list --position start --json
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from logic.chess_logic import ChessLogic
+from logic.fen import STARTING_FEN
+from logic.instrumentation import setup_from_environment
+
+
+"""
+Reference positions: name -> (FEN, known node counts for depth 1, 2, ...)
+"""
+REFERENCE_POSITIONS = {
+    "start": (STARTING_FEN, [20, 400, 8902, 197281, 4865609, 119060324]),
+    "kiwipete": ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+                 [48, 2039, 97862, 4085603, 193690690]),
+    "position3": ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+                  [14, 191, 2812, 43238, 674624, 11030083]),
+    "position4": ("r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+                  [6, 264, 9467, 422333, 15833292]),
+    "position5": ("rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+                  [44, 1486, 62379, 2103487, 89941194]),
+    "position6": ("r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+                  [46, 2079, 89890, 3894594]),
+}
+
+
+def perft(logic: ChessLogic, depth: int) -> int:
+    """
+    Count the leaf nodes of the legal move tree
+
+    Args:
+        logic (ChessLogic): Game to search, restored to its original position on return
+        depth (int): Number of plies to expand
+
+    Returns:
+        int: Number of leaf nodes at the given depth
+    """
+    moves = logic.generate_legal_moves()
+    if depth == 1:
+        return len(moves)
+    if depth == 0:
+        return 1
+
+    nodes = 0
+    for move in moves:
+        logic.make_move(move)
+        nodes += perft(logic, depth - 1)
+        logic.unmake_move()
+    return nodes
+
+
+def run(position_names: list[str], max_depth: int, backend: str) -> list[dict]:
+    """
+    Run perft for each position from depth 1 up to max_depth (or the deepest known value)
+
+    Args:
+        position_names (list[str]): Keys of REFERENCE_POSITIONS to run
+        max_depth (int): Deepest depth to run
+        backend (str): Position backend name passed to ChessLogic
+
+    Returns:
+        list[dict]: One result per position and depth
+    """
+    results = []
+    for name in position_names:
+        fen, expected_counts = REFERENCE_POSITIONS[name]
+        logic = ChessLogic.from_fen(fen, backend)
+        for depth in range(1, min(max_depth, len(expected_counts)) + 1):
+            start = time.perf_counter()
+            nodes = perft(logic, depth)
+            seconds = time.perf_counter() - start
+            results.append({
+                "position": name,
+                "backend": backend,
+                "depth": depth,
+                "nodes": nodes,
+                "expected": expected_counts[depth - 1],
+                "ok": nodes == expected_counts[depth - 1],
+                "seconds": round(seconds, 6),
+                "nps": round(nodes / seconds) if seconds > 0 else 0,
+            })
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Perft node counts and throughput for ChessLogic")
+    parser.add_argument("--depth", type=int, default=4, help="deepest depth to run (default: 4)")
+    parser.add_argument("--backend", default="bitboard", help="ChessLogic position backend (default: bitboard)")
+    parser.add_argument("--position", action="append", choices=sorted(REFERENCE_POSITIONS),
+                        help="reference position to run, may be repeated (default: all)")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+    setup_from_environment()
+
+    results = run(args.position or list(REFERENCE_POSITIONS), args.depth, args.backend)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{'position':<12}{'depth':>6}{'nodes':>14}{'expected':>14}{'seconds':>10}{'nodes/s':>12}  result")
+        for result in results:
+            print(f"{result['position']:<12}{result['depth']:>6}{result['nodes']:>14}{result['expected']:>14}"
+                  f"{result['seconds']:>10.3f}{result['nps']:>12}  {'ok' if result['ok'] else 'MISMATCH'}")
+
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Export positions as N x 12 x 8 x 8 piece planes with their evaluation terms, for analytics
+and training data (see logic/batch_eval.py).
+
+The input is either a file of FEN lines or a binary game store written with
+logic/game_store.py (recognised by its .idx file next to it), whose games are
+replayed to export every position they reach.
+
+Usage (from the pychess directory):
+    python planes.py positions.fen --output positions.npz
+    python planes.py games.bin --output positions.npz --result
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+from logic.batch_eval import evaluate_batch, evaluation_terms, planes_from_fens, save_planes
+from logic.chess_logic import ChessLogic
+from logic.fen import STARTING_FEN
+from logic.game_store import GameStore
+from logic.instrumentation import setup_from_environment
+from logic.move_encoding import decode_move
+
+# ChessLogic.result -> game result label from white's point of view, NaN for unfinished games
+RESULT_VALUES = {"w": 1.0, "b": -1.0, "d": 0.0, "": float("nan")}
+
+
+def fen_lines(path: str) -> list[str]:
+    """
+    Non-empty lines of a FEN file, '-' for stdin
+    """
+    source = sys.stdin if path == "-" else open(path)
+    try:
+        return [line.strip() for line in source if line.strip()]
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+
+def stored_positions(path: str) -> tuple[list[str], list[float]]:
+    """
+    FEN of every position of every game of a game store, with the result of its game
+    """
+    fens = []
+    results = []
+    with GameStore(path) as store:
+        for number in range(len(store)):
+            fen, codes, result = store.game(number)
+            logic = ChessLogic.from_fen(fen or STARTING_FEN, "bitboard")
+            fens.append(logic.to_fen())
+            for code in codes:
+                logic.make_move(decode_move(code))
+                fens.append(logic.to_fen())
+            results.extend([RESULT_VALUES[result]] * (len(codes) + 1))
+            codes.release()
+    return fens, results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Export positions as piece planes with evaluation terms")
+    parser.add_argument("input", help="file of FEN lines ('-' for stdin) or game store")
+    parser.add_argument("--output", required=True, help=".npz file to write")
+    parser.add_argument("--result", action="store_true", help="also store the game result of every position "
+                                                             "(game stores only)")
+    args = parser.parse_args(argv)
+    setup_from_environment()
+
+    start = time.perf_counter()
+    labels = {}
+    if os.path.exists(args.input + ".idx"):
+        fens, results = stored_positions(args.input)
+        if args.result:
+            labels["result"] = np.array(results, dtype=np.float32)
+    else:
+        if args.result:
+            parser.error("--result needs a game store")
+        fens = fen_lines(args.input)
+    try:
+        planes, white_to_move = planes_from_fens(fens)
+    except ValueError as error:
+        parser.error(str(error))
+
+    terms = evaluation_terms(planes)
+    save_planes(args.output, planes, white_to_move, score=evaluate_batch(planes, white_to_move),
+                material=terms["material"], piece_square=terms["piece_square"], mobility=terms["mobility"],
+                king_attacks=terms["king_attacks"], **labels)
+    seconds = time.perf_counter() - start
+    print(f"{len(planes)} positions, {seconds:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""
+Headless bulk replay and validation of recorded games.
+
+Games are streamed from move-list files through ChessLogic on a pool of worker
+processes. One JSON line is written per game with the final result, the index of
+the first illegal move (if any) and the final position in FEN.
+
+Accepted input, which may be mixed in one file:
+    - one game per line: "e2e4 e7e5 g1f3 ..." (move numbers and a trailing result token are ignored)
+    - PGN-like blocks: [Tag "value"] lines, then movetext in the same coordinate notation over
+      one or more lines, ended by a result token ("1-0", "0-1", "1/2-1/2", "*") or a blank line.
+      A [FEN "..."] tag sets the starting position.
+Comments in braces ("{...}"), which may contain spaces and span lines, are skipped.
+
+Usage (from the pychess directory):
+    python replay.py games.txt --workers 8 --output results.jsonl
+"""
+
+import argparse
+import collections
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+
+from logic.chess_logic import ChessLogic
+from logic.fen import STARTING_FEN
+from logic.instrumentation import setup_from_environment
+from logic.move_encoding import to_coordinate_move
+
+RESULT_TOKENS = ("1-0", "0-1", "1/2-1/2", "*")
+COMMENT = re.compile(r"\{[^}]*\}")
+
+# ChessLogic.result -> PGN result
+PGN_RESULTS = {"w": "1-0", "b": "0-1", "d": "1/2-1/2", "": "*"}
+
+
+def read_games(lines):
+    """
+    Stream games out of an iterable of text lines, holding one game in memory at a time
+
+    Args:
+        lines: Iterable of lines, e.g. an open file
+
+    Yields:
+        tuple: (game index, starting FEN or None, list of move tokens, declared result or None)
+    """
+    index = 0
+    tags = {}
+    moves = []
+    declared = None
+    in_comment = False  # Inside a {...} comment that continues on the next line
+
+    for line in lines:
+        line = line.strip()
+        if in_comment:
+            _, closed, line = line.partition("}")
+            if not closed:
+                continue
+            in_comment = False
+            line = line.strip()
+            if line == "":
+                continue  # Not a blank separator line
+
+        if line.startswith("["):
+            # A tag after movetext starts the next game
+            if moves:
+                yield index, tags.get("FEN"), moves, declared or tags.get("Result")
+                index += 1
+                tags, moves, declared = {}, [], None
+            name, _, value = line[1:-1].partition(" ")
+            tags[name] = value.strip().strip('"')
+            continue
+
+        if line == "":
+            if moves:
+                yield index, tags.get("FEN"), moves, declared or tags.get("Result")
+                index += 1
+                tags, moves, declared = {}, [], None
+            continue
+
+        line, opened, _ = COMMENT.sub(" ", line).partition("{")
+        in_comment = opened != ""
+        for token in line.split():
+            if token in RESULT_TOKENS:
+                declared = token
+            elif not token.rstrip(".").isdigit():
+                moves.append(token.split(".")[-1])  # Drop move numbers glued to the move ("1.e2e4")
+
+        # Without tags every line is a game; with tags the result token closes it
+        if moves and not in_comment and (not tags or declared is not None):
+            yield index, tags.get("FEN"), moves, declared or tags.get("Result")
+            index += 1
+            tags, moves, declared = {}, [], None
+
+    if moves:
+        yield index, tags.get("FEN"), moves, declared or tags.get("Result")
+
+
+def validate_game(game: tuple, backend: str = "bitboard") -> dict:
+    """
+    Replay one game and report how it ended
+
+    Args:
+        game (tuple): Item produced by read_games
+        backend (str): ChessLogic position backend
+
+    Returns:
+        dict: game index, result, declared result, plies played, illegal move index (or None),
+            final FEN, and an error message if the starting position could not be loaded
+    """
+    index, fen, moves, declared = game
+    report = {"game": index, "result": "*", "declared": declared, "plies": 0, "illegal_move": None, "fen": None}
+    try:
+        logic = ChessLogic.from_fen(fen or STARTING_FEN, backend)
+    except ValueError as error:
+        report["error"] = str(error)
+        return report
+
+    for ply, token in enumerate(moves):
+        if logic.play_move(to_coordinate_move(token, logic.turn)) == "":
+            report["illegal_move"] = ply
+            break
+
+    report["result"] = PGN_RESULTS[logic.result]
+    report["plies"] = len(logic.move_history)
+    report["fen"] = logic.to_fen()
+    return report
+
+
+def _validate_batch(batch: list, backend: str) -> list[dict]:
+    return [validate_game(game, backend) for game in batch]
+
+
+def _batches(games, batch_size: int):
+    batch = []
+    for game in games:
+        batch.append(game)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def replay(games, workers: int = 0, batch_size: int = 64, backend: str = "bitboard"):
+    """
+    Validate a stream of games, in input order, on a pool of worker processes
+
+    At most two batches per worker are in flight at any time, so memory stays bounded
+    no matter how many games the input holds.
+
+    Args:
+        games: Iterable of items produced by read_games
+        workers (int): Number of worker processes, 0 for one per CPU, 1 to run in this process
+        batch_size (int): Games sent to a worker at once
+        backend (str): ChessLogic position backend
+
+    Yields:
+        dict: Report from validate_game for each game
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for game in games:
+            yield validate_game(game, backend)
+        return
+
+    with multiprocessing.Pool(workers) as pool:
+        pending = collections.deque()
+        for batch in _batches(games, batch_size):
+            pending.append(pool.apply_async(_validate_batch, (batch, backend)))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().get()
+        while pending:
+            yield from pending.popleft().get()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay and validate recorded games with ChessLogic")
+    parser.add_argument("input", help="move-list file, '-' for stdin")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=64, help="games per worker task (default: 64)")
+    parser.add_argument("--backend", default="bitboard", help="ChessLogic position backend (default: bitboard)")
+    parser.add_argument("--output", help="write JSON lines here instead of stdout")
+    args = parser.parse_args(argv)
+    setup_from_environment()
+
+    source = sys.stdin if args.input == "-" else open(args.input)
+    output = open(args.output, "w") if args.output else sys.stdout
+
+    games = 0
+    illegal = 0
+    start = time.perf_counter()
+    try:
+        for report in replay(read_games(source), args.workers, args.batch_size, args.backend):
+            output.write(json.dumps(report) + "\n")
+            games += 1
+            illegal += report["illegal_move"] is not None or "error" in report
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if output is not sys.stdout:
+            output.close()
+
+    seconds = time.perf_counter() - start
+    print(f"{games} games, {illegal} with illegal moves, {seconds:.1f}s ({games / seconds if seconds else 0:.0f} games/s)",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
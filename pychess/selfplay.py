@@ -0,0 +1,64 @@
+"""
+Generate self-play training data into binary shards (see logic/self_play.py).
+
+Games are played on a pool of worker processes with randomised or shallow-search moves;
+every position is written with the move played from it and the game's final result.
+Progress lines on stderr report positions per second overall and per core (per CPU
+second of the workers).
+
+Usage (from the pychess directory):
+    python selfplay.py data --games 10000
+    python selfplay.py data --games 1000 --policy greedy --workers 8 --json
+"""
+
+import argparse
+import json
+import sys
+
+from logic.instrumentation import setup_from_environment
+from logic.self_play import POLICIES, SHARD_RECORDS, generate
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Self-play ChessLogic games into binary training shards")
+    parser.add_argument("directory", help="shard directory, new shards are added after existing ones")
+    parser.add_argument("--games", type=int, default=1000, help="games to play (default: 1000)")
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: one per CPU)")
+    parser.add_argument("--batch-size", type=int, default=16, help="games per worker task (default: 16)")
+    parser.add_argument("--policy", choices=POLICIES, default="random", help="move choice (default: random)")
+    parser.add_argument("--depth", type=int, default=1, help="search depth of the search policy (default: 1)")
+    parser.add_argument("--max-plies", type=int, default=200,
+                        help="plies after which a game is left unfinished (default: 200)")
+    parser.add_argument("--random-plies", type=int, default=8,
+                        help="opening plies played at random by the greedy and search policies (default: 8)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+    parser.add_argument("--shard-positions", type=int, default=SHARD_RECORDS,
+                        help=f"positions per shard (default: {SHARD_RECORDS})")
+    parser.add_argument("--backend", default="bitboard", help="ChessLogic position backend (default: bitboard)")
+    parser.add_argument("--json", action="store_true", help="print the final statistics as JSON")
+    args = parser.parse_args(argv)
+    setup_from_environment()
+    if args.games < 1 or args.batch_size < 1 or args.shard_positions < 1:
+        parser.error("--games, --batch-size and --shard-positions must be positive")
+
+    def progress(stats: dict):
+        print(f"\r{stats['games']}/{args.games} games, {stats['positions']} positions, "
+              f"{stats['positions_per_second']:.0f} positions/s, {stats['positions_per_core']:.0f} per core",
+              end="", file=sys.stderr, flush=True)
+
+    stats = generate(args.directory, args.games, args.workers, args.batch_size, args.seed, args.shard_positions,
+                     None if args.json else progress, policy=args.policy, depth=args.depth,
+                     max_plies=args.max_plies, random_plies=args.random_plies, backend=args.backend)
+
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    else:
+        print(file=sys.stderr)
+        print(f"{stats['games']} games, {stats['positions']} positions in {len(stats['shards'])} shards, "
+              f"{stats['seconds']:.1f}s, {stats['positions_per_second']:.0f} positions/s, "
+              f"{stats['positions_per_core']:.0f} positions/s per core ({stats['workers']} workers)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""
+Host many concurrent games over a JSON lines protocol (see logic/game_server.py).
+
+Usage (from the pychess directory):
+    python server.py --port 8765 --max-games 10000
+"""
+
+import argparse
+import asyncio
+import sys
+
+from logic.game_server import GameServer
+from logic.instrumentation import get_logger, setup_from_environment
+
+logger = get_logger("server")
+
+
+async def serve(args) -> None:
+    server = GameServer(args.max_games, args.engine_threads, args.backend)
+    await server.start(args.host, args.port)
+    print(f"Serving games on {args.host}:{server.port}", file=sys.stderr)
+    try:
+        while True:
+            await asyncio.sleep(args.stats_interval)
+            logger.info("Stats: %s", server.stats.snapshot(len(server.games)))
+    finally:
+        await server.close()
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Multi-game ChessLogic server")
+    parser.add_argument("--host", default="127.0.0.1", help="interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="port to bind (default: 8765)")
+    parser.add_argument("--max-games", type=int, default=10000, help="games hosted at once (default: 10000)")
+    parser.add_argument("--engine-threads", type=int, default=1, help="threads for engine moves (default: 1)")
+    parser.add_argument("--backend", default="bitboard", help="ChessLogic position backend (default: bitboard)")
+    parser.add_argument("--stats-interval", type=float, default=10.0,
+                        help="seconds between stats log lines, shown with PYCHESS_LOG_LEVEL=INFO (default: 10)")
+    args = parser.parse_args(argv)
+    setup_from_environment()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,302 @@
+"""
+Headless UCI front-end: plays ChessLogic's engine in tournament GUIs and match runners.
+
+Only the logic package is imported, so this starts fast and runs without pygame or a display.
+Searches run on a background thread so "stop" and "isready" are answered while thinking.
+
+Supported commands: uci, isready, setoption, ucinewgame, position, go, stop, ponderhit, quit,
+plus "d" to print the current position (FEN) for debugging.
+
+Options:
+    Hash            transposition table size in MB
+    BookFile        opening book built with book.py, empty for none
+    TablebasePath   directory of endgame tables generated with endgames.py, empty for none
+    Ponder          accepted for GUIs that only send "go ponder" when it is advertised
+
+Usage (from the pychess directory):
+    python uci.py
+"""
+
+import argparse
+import sys
+import threading
+import time
+
+from logic.chess_logic import ChessLogic
+from logic.engine import MATE_SCORE, MATE_THRESHOLD, MAX_PLY, Searcher, TranspositionTable
+from logic.fen import STARTING_FEN
+from logic.instrumentation import get_logger, setup_from_environment
+from logic.opening_book import OpeningBook
+from logic.tablebase import Tablebases
+
+logger = get_logger("uci")
+
+ENGINE_NAME = "PyChess"
+ENGINE_AUTHOR = "PyChess developers"
+
+DEFAULT_HASH_MB = 64
+MAX_HASH_MB = 4096
+TABLE_ENTRIES_PER_MB = 4096  # TranspositionTable entries are Python objects, roughly 256 bytes each
+MOVES_TO_GO = 30  # Moves the remaining clock is spread over when the GUI does not say
+TIME_MARGIN = 0.05  # Seconds kept back from every budget for process and pipe overhead
+
+
+def format_score(score: int) -> str:
+    """
+    Search score in UCI "score" syntax
+
+    Args:
+        score (int): Centipawns from the side to move's view, or a mate score
+
+    Returns:
+        str: "cp <n>" or "mate <moves>" (negative when getting mated)
+    """
+    if score >= MATE_THRESHOLD:
+        return f"mate {(MATE_SCORE - score + 1) // 2}"
+    if score <= -MATE_THRESHOLD:
+        return f"mate -{(MATE_SCORE + score) // 2}"
+    return f"cp {score}"
+
+
+def think_time(arguments: dict, turn: str) -> float | None:
+    """
+    Time budget of a "go" command
+
+    Args:
+        arguments (dict): Parsed "go" arguments (milliseconds, as sent by the GUI)
+        turn (str): Side to move
+
+    Returns:
+        float | None: Seconds to think, None for no limit
+    """
+    if "movetime" in arguments:
+        return max(0.01, arguments["movetime"] / 1000 - TIME_MARGIN)
+    remaining = arguments.get("wtime" if turn == "w" else "btime")
+    if remaining is None:
+        return None
+    increment = arguments.get("winc" if turn == "w" else "binc", 0)
+    moves_to_go = arguments.get("movestogo", MOVES_TO_GO)
+    budget = remaining / max(moves_to_go, 1) + increment * 0.8
+    return max(0.01, min(budget, remaining / 2) / 1000 - TIME_MARGIN)
+
+
+class UCIEngine:
+    def __init__(self, output=None):
+        """
+        State of one UCI session
+
+        Args:
+            output: Text stream the protocol is written to, sys.stdout if None
+        """
+        self.output = output or sys.stdout
+        self.output_lock = threading.Lock()  # The search thread writes too
+        self.logic = ChessLogic.from_fen(STARTING_FEN, "bitboard")
+        self.table = TranspositionTable(DEFAULT_HASH_MB * TABLE_ENTRIES_PER_MB)
+        self.book = None
+        self.tablebases = None
+        self.searcher = None
+        self.search_thread = None
+        self.stop_requested = threading.Event()
+        self.infinite = False
+        self.ponder_time = None  # Budget of a "go ponder" search, applied on "ponderhit"
+        self.ponder_deadline = None
+
+    def send(self, line: str):
+        """
+        Write one protocol line and flush it straight away
+        """
+        with self.output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def handle(self, line: str) -> bool:
+        """
+        Run one command line
+
+        Args:
+            line (str): Command as received
+
+        Returns:
+            bool: False once "quit" was received
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, arguments = tokens[0], tokens[1:]
+        if command == "quit":
+            self.stop()
+            return False
+        handler = getattr(self, f"_command_{command}", None)
+        if handler is None:
+            logger.info("Unknown command: %s", line.strip())
+        else:
+            handler(arguments)
+        return True
+
+    def stop(self):
+        """
+        Stop a running search and wait for it to report its best move
+        """
+        self.stop_requested.set()
+        searcher = self.searcher
+        if searcher is not None:
+            searcher.stop()
+        if self.search_thread is not None:
+            self.search_thread.join()
+            self.search_thread = None
+
+    def _command_uci(self, arguments: list[str]):
+        self.send(f"id name {ENGINE_NAME}")
+        self.send(f"id author {ENGINE_AUTHOR}")
+        self.send(f"option name Hash type spin default {DEFAULT_HASH_MB} min 1 max {MAX_HASH_MB}")
+        self.send("option name BookFile type string default <empty>")
+        self.send("option name TablebasePath type string default <empty>")
+        self.send("option name Ponder type check default false")
+        self.send("uciok")
+
+    def _command_isready(self, arguments: list[str]):
+        self.send("readyok")
+
+    def _command_ucinewgame(self, arguments: list[str]):
+        self.stop()
+        self.table.clear()
+        self.logic = ChessLogic.from_fen(STARTING_FEN, "bitboard")
+
+    def _command_setoption(self, arguments: list[str]):
+        # setoption name <name with spaces> [value <value with spaces>]
+        if "name" not in arguments:
+            return
+        rest = arguments[arguments.index("name") + 1:]
+        if "value" in rest:
+            split = rest.index("value")
+            name, value = " ".join(rest[:split]), " ".join(rest[split + 1:])
+        else:
+            name, value = " ".join(rest), ""
+        if value == "<empty>":
+            value = ""
+        self.stop()
+        try:
+            if name.lower() == "hash":
+                size = min(max(int(value), 1), MAX_HASH_MB)
+                self.table = TranspositionTable(size * TABLE_ENTRIES_PER_MB)
+            elif name.lower() == "bookfile":
+                if self.book is not None:
+                    self.book.close()
+                self.book = OpeningBook(value) if value else None
+            elif name.lower() == "tablebasepath":
+                if self.tablebases is not None:
+                    self.tablebases.close()
+                self.tablebases = Tablebases(value) if value else None
+            elif name.lower() == "ponder":
+                pass  # Pondering needs no setup, "go ponder" works either way
+            else:
+                logger.info("Unknown option: %s", name)
+        except (ValueError, OSError) as error:
+            self.send(f"info string Cannot set {name}: {error}")
+
+    def _command_position(self, arguments: list[str]):
+        # position (startpos | fen <fen>) [moves <move> ...]
+        self.stop()
+        moves = []
+        if "moves" in arguments:
+            split = arguments.index("moves")
+            arguments, moves = arguments[:split], arguments[split + 1:]
+        if arguments[:1] == ["startpos"]:
+            fen = STARTING_FEN
+        elif arguments[:1] == ["fen"]:
+            fen = " ".join(arguments[1:])
+        else:
+            self.send("info string position needs startpos or fen")
+            return
+        try:
+            logic = ChessLogic.from_fen(fen, "bitboard")
+        except ValueError as error:
+            self.send(f"info string Invalid FEN: {error}")
+            return
+        for move in moves:
+            if logic.play_move(move) == "":
+                self.send(f"info string Illegal move: {move}")
+                break
+        self.logic = logic
+
+    def _command_go(self, arguments: list[str]):
+        self.stop()
+        parsed = {}
+        self.infinite = False
+        self.ponder_deadline = None
+        for index, token in enumerate(arguments):
+            if token in ("infinite", "ponder"):
+                self.infinite = True
+            elif token in ("wtime", "btime", "winc", "binc", "movestogo", "movetime", "depth"):
+                try:
+                    parsed[token] = int(arguments[index + 1])
+                except (IndexError, ValueError):
+                    pass
+        time_limit = None if self.infinite else think_time(parsed, self.logic.turn)
+        # The clock fields of "go ponder" are the ones to use once the ponder move is played
+        self.ponder_time = think_time(parsed, self.logic.turn) if "ponder" in arguments else None
+        depth = parsed.get("depth", MAX_PLY)
+        self.stop_requested.clear()
+        self.search_thread = threading.Thread(target=self._search, args=(self.logic.copy(), depth, time_limit),
+                                              name="pychess-uci-search", daemon=True)
+        self.search_thread.start()
+
+    def _command_stop(self, arguments: list[str]):
+        self.stop()
+
+    def _command_ponderhit(self, arguments: list[str]):
+        # Keep the running search, but from now on within the budget of the "go ponder" clocks
+        time_limit, self.ponder_time = self.ponder_time, None
+        if time_limit is not None:
+            self.ponder_deadline = time.perf_counter() + time_limit
+            searcher = self.searcher
+            if searcher is not None:
+                searcher.deadline = self.ponder_deadline
+        self.infinite = False  # Report as soon as the search ends
+
+    def _command_d(self, arguments: list[str]):
+        self.send(f"info string {self.logic.to_fen()}")
+
+    def _search(self, logic: ChessLogic, depth: int, time_limit: float | None):
+        best_move = None
+        if self.book is not None:
+            book_move = self.book.choose_move(logic)
+            if book_move is not None:
+                best_move = book_move
+        if best_move is None:
+            searcher = Searcher(logic, self.table, self.tablebases)
+            searcher.on_iteration = self._report
+            self.searcher = searcher
+            result = searcher.search(depth, time_limit)
+            self.searcher = None
+            best_move = result.best_move or None
+        # "go infinite" and pondering must not answer before "stop" (or "ponderhit")
+        while self.infinite and not self.stop_requested.wait(0.01):
+            pass
+        self.send(f"bestmove {best_move or '0000'}")
+
+    def _report(self, result):
+        if self.stop_requested.is_set() and self.searcher is not None:
+            self.searcher.stop()  # A stop that came in while the search was starting
+        if self.ponder_deadline is not None and self.searcher is not None:
+            self.searcher.deadline = self.ponder_deadline  # A ponderhit that came in while the search was starting
+        milliseconds = int(result.seconds * 1000)
+        nps = int(result.nodes / result.seconds) if result.seconds > 0 else 0
+        self.send(f"info depth {result.depth} score {format_score(result.score)} nodes {result.nodes} "
+                  f"nps {nps} time {milliseconds} pv {' '.join(result.pv)}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="UCI front-end for the ChessLogic engine (commands on stdin)")
+    parser.parse_args(argv)
+    setup_from_environment()
+    engine = UCIEngine()
+    for line in iter(sys.stdin.readline, ""):
+        if not engine.handle(line):
+            break
+    engine.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
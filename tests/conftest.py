@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+# The modules import each other as top-level packages (logic, display) from the pychess directory
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pychess"))
+
+
+@pytest.fixture(scope="session")
+def tablebases(tmp_path_factory):
+    # KRK and KBK, generated once and saved, so probes read mapped files as in play
+    from logic.tablebase import TABLE_SUFFIX, Tablebases, generate_table
+
+    directory = tmp_path_factory.mktemp("tablebases")
+    generated = Tablebases()
+    for material in ("KRK", "KBK"):
+        generate_table(material, generated).save(str(directory / (material + TABLE_SUFFIX)))
+    generated.close()
+    loaded = Tablebases(str(directory))
+    yield loaded
+    loaded.close()
@@ -0,0 +1,71 @@
+import time
+
+from logic.background import BackgroundWorker
+from logic.chess_logic import ChessLogic
+from logic.engine import Searcher
+
+
+def wait_until(condition, timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_cancel_stops_stale_search():
+    logic = ChessLogic("bitboard")
+    worker = BackgroundWorker(logic, engine_color="w", think_time=30.0)
+    try:
+        # Cancelled while the search runs
+        worker.request_engine_move()
+        wait_until(lambda: worker._searcher is not None)
+        start = time.perf_counter()
+        worker.cancel()
+        wait_until(lambda: not worker.busy)
+        assert time.perf_counter() - start < 5.0
+
+        # Cancelled right after the request, before or while the search starts
+        for _ in range(20):
+            start = time.perf_counter()
+            worker.request_engine_move()
+            worker.cancel()
+            wait_until(lambda: not worker.busy)
+            assert time.perf_counter() - start < 5.0
+
+        assert worker.poll() == []  # No stale engine move was played or reported
+        assert logic.move_history == []
+    finally:
+        worker.close()
+
+
+def test_stop_before_search_is_kept():
+    searcher = Searcher(ChessLogic("bitboard"))
+    searcher.stop()
+    start = time.perf_counter()
+    result = searcher.search(time_limit=30.0)
+    assert time.perf_counter() - start < 5.0
+    assert result.best_move != ""
+
+
+def test_seek_to_engine_turn_starts_engine():
+    logic = ChessLogic("bitboard")
+    worker = BackgroundWorker(logic, engine_color="b", think_time=0.05)
+    try:
+        worker.submit_move("e2e4")
+        wait_until(lambda: not worker.busy)
+        assert [event[0] for event in worker.poll()] == ["move", "engine"]
+        assert len(logic.move_history) == 2
+
+        # Taking back the engine's reply leaves the engine to move again
+        assert worker.seek(1)
+        wait_until(lambda: not worker.busy)
+        assert [event[0] for event in worker.poll()] == ["engine"]
+        assert len(logic.move_history) == 2
+
+        # With the user to move nothing happens
+        assert worker.seek(0)
+        wait_until(lambda: not worker.busy)
+        assert worker.poll() == []
+        assert logic.move_history == []
+    finally:
+        worker.close()
@@ -0,0 +1,65 @@
+import collections
+
+from logic.chess_logic import ChessLogic
+from logic.move_encoding import to_coordinate_move
+from logic.opening_book import OpeningBook, build_book
+
+GAMES = [
+    ("e2e4 e7e5 g1f3 b8c6 f1c4 g8f6 O-O f8c5", "w"),
+    ("e2e4 e7e5 g1f3 b8c6 f1b5 a7a6", "b"),
+    ("e2e4 c7c5 g1f3 d7d6", "d"),
+    ("d2d4 d7d5 c2c4 e7e6", None),
+    ("e2e4 e7e5 g1f3 g8f6 f1c4 f8c5 0-0 O-O", "d"),
+    ("e2e4 e7e5 d1h5 b8c6 f1c4 g8f6 h5f7#", None),  # Scholar's mate: the result comes from the moves
+]
+
+
+def games():
+    for moves, result in GAMES:
+        yield ChessLogic("bitboard"), moves.split(), result
+
+
+def expected_statistics(max_plies):
+    # (position key, move) -> [games, white wins, black wins, draws], counted by replaying every game
+    counts = collections.defaultdict(lambda: [0, 0, 0, 0])
+    for logic, moves, result in games():
+        played = []
+        for move in moves[:max_plies]:
+            key = logic.zobrist_key
+            assert logic.play_move(to_coordinate_move(move, logic.turn)) != ""
+            played.append((key, logic.last_move))
+        result = result or logic.result
+        for entry in played:
+            counts[entry][0] += 1
+            if result:
+                counts[entry]["wbd".index(result) + 1] += 1
+    return counts
+
+
+def test_build_then_lookup(tmp_path):
+    path = str(tmp_path / "book.bin")
+    # A handful of entries per run, so the book is merged from many runs sharing positions
+    summary = build_book(games(), path, max_plies=8, max_entries=4, temp_directory=str(tmp_path))
+    assert summary["games"] == len(GAMES)
+    assert summary["runs"] > 1
+    assert sorted(tmp_path.iterdir()) == [tmp_path / "book.bin"]  # Run files are removed
+
+    expected = expected_statistics(8)
+    with OpeningBook(path) as book:
+        assert book.max_plies == 8
+        assert len(book) == summary["records"] == len(expected)
+        found = {}
+        for key in {key for key, _ in expected}:
+            for move in book.lookup(key):
+                found[key, move.move] = [move.games, move.white_wins, move.black_wins, move.draws]
+        assert found == expected
+
+        start = ChessLogic("bitboard")
+        first = {start.move_to_notation(move.move): move.games for move in book.probe(start)}
+        assert first == {"e2e4": 5, "d2d4": 1}
+        castled = ChessLogic("bitboard")
+        for move in "e2e4 e7e5 g1f3 g8f6 f1c4 f8c5".split():
+            castled.play_move(move)
+        assert [(castled.move_to_notation(move.move), move.games, move.draws) for move in book.probe(castled)] == [
+            ("e1g1", 1, 1)]
+        assert book.probe(ChessLogic.from_fen("4k3/8/8/8/8/8/8/4K3 w - - 0 1", "bitboard")) == []
@@ -0,0 +1,55 @@
+import pytest
+
+from logic.chess_logic import ChessLogic
+from logic.engine import MATE_SCORE, Searcher
+
+BACKENDS = ["list", "bitboard"]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("fen, best_move, plies", [
+    ("k7/8/1K6/8/8/8/8/7R w - - 0 1", "h1h8", 1),
+    ("3k4/8/2K5/8/8/8/8/5R2 w - - 0 1", "f1e1", 3),  # Quiet first move, the only mate in two
+    ("1k6/8/8/1K6/8/8/R7/8 w - - 0 1", "b5c6", 3),
+])
+def test_finds_mate(fen, best_move, plies, backend):
+    logic = ChessLogic.from_fen(fen, backend)
+    result = Searcher(logic).search(depth=4)
+    assert result.best_move == best_move
+    assert result.score == MATE_SCORE - plies
+    assert len(result.pv) == plies
+    assert logic.to_fen() == fen  # Searched in place and restored
+
+
+def test_mated_and_stalemated():
+    result = Searcher(ChessLogic.from_fen("k6R/8/1K6/8/8/8/8/8 b - - 0 1", "bitboard")).search(depth=2)
+    assert result.best_move == "" and result.score == -MATE_SCORE
+    result = Searcher(ChessLogic.from_fen("k7/8/1Q6/8/8/8/8/7K b - - 0 1", "bitboard")).search(depth=2)
+    assert result.best_move == "" and result.score == 0
+
+
+def test_tablebase_root(tablebases):
+    # Covered at the root: the table's move is played without searching
+    logic = ChessLogic.from_fen("3k4/8/2K5/8/8/8/8/5R2 w - - 0 1", "bitboard")
+    result = Searcher(logic, tablebases=tablebases).search(depth=4)
+    assert result.best_move == "f1e1"
+    assert result.score == MATE_SCORE - 3
+    assert result.depth == 0
+
+
+def test_tablebase_scores_leaves(tablebases):
+    # No KRKB table: winning the bishop reaches KRK, which the tables score as a forced mate
+    # far beyond the search depth
+    fen = "k7/8/8/3b4/8/8/8/3R2K1 w - - 0 1"
+    logic = ChessLogic.from_fen(fen, "bitboard")
+    assert tablebases.probe(logic) is None
+    result = Searcher(logic, tablebases=tablebases).search(depth=2)
+    assert result.best_move == "d1d5"
+
+    logic.play_move("d1d5")
+    _, plies = tablebases.probe(logic)
+    assert plies > 3
+    assert result.score == MATE_SCORE - 1 - plies
+
+    without = Searcher(ChessLogic.from_fen(fen, "bitboard")).search(depth=2)
+    assert without.best_move == "d1d5" and without.score < MATE_SCORE - 1000
@@ -0,0 +1,80 @@
+import pytest
+
+from logic.chess_logic import ChessLogic
+from logic.fen import STARTING_FEN
+
+BACKENDS = ["list", "bitboard"]
+FENS = [
+    STARTING_FEN,
+    "r3k2r/8/8/8/8/8/8/R3K2R w Kq - 0 1",  # Some castling rights only
+    "r3k2r/8/8/8/8/8/8/R3K2R b - - 7 31",  # None
+    "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3",  # En passant square, white to take
+    "rnbqkbnr/pppp1ppp/8/8/3Pp3/8/PPP1PPPP/RNBQKBNR b KQkq d3 0 2",  # Black to take
+    "8/5k2/8/8/8/8/2K5/8 w - - 99 120",  # Large move counters
+]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("fen", FENS)
+def test_round_trip(fen, backend):
+    logic = ChessLogic.from_fen(fen, backend)
+    assert logic.to_fen() == fen
+    assert ChessLogic.from_fen(logic.to_fen(), backend).zobrist_key == logic.zobrist_key
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_fields_after_moves(backend):
+    logic = ChessLogic(backend)
+    logic.play_move("e2e4")
+    assert logic.to_fen() == "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1"
+    logic.play_move("g8f6")  # Quiet move: the en passant square goes, the halfmove clock counts
+    assert logic.to_fen() == "rnbqkb1r/pppppppp/5n2/8/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 1 2"
+    for move in ["g1f3", "h8g8", "f1e2", "g8h8", "e1g1"]:
+        assert logic.play_move(move) != "", move
+    assert logic.to_fen() == "rnbqkb1r/pppppppp/5n2/8/4P3/5N2/PPPPBPPP/RNBQ1RK1 b q - 6 4"
+    logic.play_move("f6e4")  # A capture resets the halfmove clock
+    assert logic.to_fen() == "rnbqkb1r/pppppppp/8/8/4n3/5N2/PPPPBPPP/RNBQ1RK1 w q - 0 5"
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_imported_fields_are_played_by(backend):
+    # Castling rights from the FEN decide which castling moves are legal
+    logic = ChessLogic.from_fen("r3k2r/8/8/8/8/8/8/R3K2R w Kq - 0 1", backend)
+    assert logic.play_move("e1c1") == ""
+    assert logic.play_move("e1g1") != ""
+    assert logic.play_move("e8g8") == ""
+    assert logic.play_move("e8c8") != ""
+    assert logic.to_fen() == "2kr3r/8/8/8/8/8/8/R4RK1 w - - 2 2"
+
+    # So does the en passant square
+    logic = ChessLogic.from_fen("rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3", backend)
+    assert logic.play_move("e5f6") != ""
+    assert logic.board[3][5] == ""  # The f5 pawn was taken
+    logic = ChessLogic.from_fen("rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq - 0 3", backend)
+    assert logic.play_move("e5f6") == ""
+    assert logic.play_move("e5d6") == ""
+
+    # The counters carry on from the FEN's values
+    logic = ChessLogic.from_fen("8/5k2/8/8/8/8/2K5/8 b - - 40 57", backend)
+    logic.play_move("f7e7")
+    assert logic.to_fen() == "8/4k3/8/8/8/8/2K5/8 w - - 41 58"
+
+
+def test_clocks_default():
+    assert ChessLogic.from_fen("8/5k2/8/8/8/8/2K5/8 w - -", "bitboard").to_fen() == "8/5k2/8/8/8/8/2K5/8 w - - 0 1"
+
+
+@pytest.mark.parametrize("fen", [
+    "",
+    "8/8/8/8/8/8/8/8 w - - 0",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP w KQkq - 0 1",
+    "rnbqkbnr/pppppppp/9/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNX w KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR x KQkq - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KX - 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq e4 0 1",
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - x 1",
+])
+def test_invalid(fen):
+    with pytest.raises(ValueError):
+        ChessLogic.from_fen(fen, "bitboard")
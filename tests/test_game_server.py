@@ -0,0 +1,27 @@
+import asyncio
+
+from logic.game_server import GameServer
+
+
+def test_one_latency_sample_per_move():
+    async def run():
+        server = GameServer()
+        try:
+            game = (await server.handle_request({"op": "new"}))["game"]
+            response = await server.handle_request({"op": "moves", "game": game,
+                                                    "moves": ["e2e4", "e7e5", "g1f3", "b8c6"]})
+            assert response["ok"] and len(response["played"]) == 4
+            assert len(server.stats.latencies) == 4
+            assert (await server.handle_request({"op": "move", "game": game, "move": "f1c4"}))["ok"]
+            assert len(server.stats.latencies) == 5
+
+            # A batch stops at its first illegal move, which is timed like a rejected "move"
+            response = await server.handle_request({"op": "moves", "game": game, "moves": ["g8f6", "e1e3", "d2d3"]})
+            assert response["played"] == ["g8f6"] and not response["ok"]
+            assert len(server.stats.latencies) == 7
+            stats = await server.handle_request({"op": "stats"})
+            assert stats["moves"] == 6
+        finally:
+            await server.close()
+
+    asyncio.run(run())
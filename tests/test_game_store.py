@@ -0,0 +1,61 @@
+from logic.chess_logic import ChessLogic
+from logic.game_store import GameStore, GameStoreWriter
+
+GAME = ["e2e4", "e7e5", "g1f3", "b8c6", "f1c4", "g8f6"]
+
+
+def packed_game(moves):
+    logic = ChessLogic("bitboard")
+    for move in moves:
+        assert logic.play_move(move) != ""
+    return logic.packed_moves()
+
+
+def read_all(path):
+    with GameStore(path) as store:
+        games = []
+        for number in range(len(store)):
+            fen, codes, result = store.game(number)
+            games.append((fen, list(codes), result))
+            if isinstance(codes, memoryview):
+                codes.release()
+        return games
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "games.bin")
+    fen = "4k3/8/8/8/8/8/4P3/4K3 w - - 0 1"
+    with GameStoreWriter(path) as writer:
+        assert writer.append(packed_game(GAME), "w") == 0
+        assert writer.append([], "d", fen) == 1
+    with GameStoreWriter(path) as writer:
+        assert writer.append(packed_game(GAME[:3])) == 2
+
+    assert read_all(path) == [
+        (None, list(packed_game(GAME)), "w"),
+        (fen, [], "d"),
+        (None, list(packed_game(GAME[:3])), ""),
+    ]
+
+
+def test_append_after_torn_entry(tmp_path):
+    path = str(tmp_path / "games.bin")
+    with GameStoreWriter(path) as writer:
+        writer.append(packed_game(GAME), "w")
+
+    # A crash in the middle of the next append: its moves and half of its index entry were written
+    with open(path, "ab") as data:
+        data.write(bytes(packed_game(GAME[:2])))
+    with open(path + ".idx", "ab") as index:
+        index.write(b"\x01" * 7)
+
+    with GameStoreWriter(path) as writer:
+        assert writer.count == 1
+        assert writer.append(packed_game(GAME[:4]), "b") == 1
+        assert writer.append(packed_game(GAME[:1]), "d") == 2
+
+    assert read_all(path) == [
+        (None, list(packed_game(GAME)), "w"),
+        (None, list(packed_game(GAME[:4])), "b"),
+        (None, list(packed_game(GAME[:1])), "d"),
+    ]
@@ -0,0 +1,58 @@
+import pytest
+
+from logic.chess_logic import ChessLogic
+from logic.move_encoding import (CASTLING, EN_PASSANT, NO_MOVE, NORMAL, PROMOTION, decode_move, encode_move,
+                                 from_notation, move_flag, to_notation)
+from perft import REFERENCE_POSITIONS
+
+EN_PASSANT_FEN = "rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3"
+FENS = [fen for fen, _ in REFERENCE_POSITIONS.values()] + [EN_PASSANT_FEN]
+
+
+def packed_code(logic, move):
+    # The code ChessLogic stores for a move, with the castling and en passant flags it knows about
+    notation = logic.make_move(move)
+    code = logic.packed_moves()[-1]
+    logic.unmake_move()
+    return code, notation
+
+
+@pytest.mark.parametrize("fen", FENS)
+def test_round_trip(fen):
+    logic = ChessLogic.from_fen(fen, "bitboard")
+    for move in logic.generate_legal_moves():
+        code, notation = packed_code(logic, move)
+        assert code != NO_MOVE
+        assert decode_move(code) == move
+        assert to_notation(code) == notation
+        if move_flag(code) == EN_PASSANT:
+            assert from_notation(notation, logic.turn) == encode_move(move, NORMAL)  # Notation does not mark it
+        else:
+            assert from_notation(notation, logic.turn) == code
+
+
+def test_flags():
+    flags = set()
+    for fen in FENS:
+        logic = ChessLogic.from_fen(fen, "bitboard")
+        flags.update(move_flag(packed_code(logic, move)[0]) for move in logic.generate_legal_moves())
+    assert flags == {NORMAL, PROMOTION, CASTLING, EN_PASSANT}
+
+
+def test_replay_packed_game():
+    logic = ChessLogic("bitboard")
+    for move in ["e2e4", "g8f6", "e4e5", "d7d5", "e5d6", "c8f5", "d6c7", "b8c6", "g1f3", "e7e6", "f1e2", "f8e7",
+                 "e1g1", "e8g8", "c7d8q", "a8d8"]:
+        assert logic.play_move(move) != "", move
+
+    replayed = ChessLogic("bitboard")
+    for code in logic.packed_moves():
+        replayed.play_legal_move(decode_move(code))
+    assert replayed.to_fen() == logic.to_fen()
+    assert replayed.move_history == logic.move_history
+
+
+def test_invalid_notation():
+    for notation in ["", "e2", "e2e9", "i2e4", "e7e8k"]:
+        with pytest.raises(ValueError):
+            from_notation(notation, "w")
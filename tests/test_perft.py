@@ -0,0 +1,45 @@
+import random
+
+import pytest
+
+from logic.attack_map import AttackMap
+from logic.chess_logic import ChessLogic
+from perft import REFERENCE_POSITIONS, perft
+
+BACKENDS = ["list", "bitboard"]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name", sorted(REFERENCE_POSITIONS))
+def test_perft(name, backend):
+    fen, counts = REFERENCE_POSITIONS[name]
+    logic = ChessLogic.from_fen(fen, backend)
+    depth = 3 if counts[2] < 10000 else 2
+    assert perft(logic, depth) == counts[depth - 1]
+    assert logic.to_fen() == fen  # make_move / unmake_move left the position untouched
+
+
+def assert_attack_map_matches_rebuild(logic):
+    rebuilt = AttackMap(logic.position)
+    for field in AttackMap.__slots__:
+        assert getattr(logic.attack_map, field) == getattr(rebuilt, field), field
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("name", ["start", "kiwipete", "position4"])
+def test_attack_map_matches_rebuild(name, backend):
+    logic = ChessLogic.from_fen(REFERENCE_POSITIONS[name][0], backend)
+    generator = random.Random(name)
+    for _ in range(20):
+        # Play a random line, checking after every move and every takeback
+        played = 0
+        while played < 12:
+            moves = logic.generate_legal_moves()
+            if not moves:
+                break
+            logic.make_move(generator.choice(moves))
+            played += 1
+            assert_attack_map_matches_rebuild(logic)
+        for _ in range(generator.randint(0, played)):
+            logic.unmake_move()
+            assert_attack_map_matches_rebuild(logic)
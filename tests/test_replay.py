@@ -0,0 +1,54 @@
+import io
+
+from logic.move_encoding import to_coordinate_move
+from replay import read_games, validate_game
+
+SCHOLARS_MATE = ["e2e4", "e7e5", "d1h5", "b8c6", "f1c4", "g8f6", "h5f7"]
+
+
+def games(text):
+    return list(read_games(io.StringIO(text)))
+
+
+def test_comment_with_spaces():
+    text = "e2e4 {the king's pawn, as usual} e7e5 d1h5 {an early queen sortie} b8c6 f1c4 g8f6 h5f7 1-0\n"
+    assert games(text) == [(0, None, SCHOLARS_MATE, "1-0")]
+
+
+def test_comment_across_lines():
+    text = ('[Event "Test"]\n'
+            '[Result "1-0"]\n'
+            '\n'
+            '1. e2e4 e7e5 {a comment that goes on\n'
+            'over the next line, and\n'
+            '\n'
+            'past a blank one} 2. d1h5 b8c6 3. f1c4 {another one\n'
+            '} g8f6 4. h5f7 1-0\n'
+            '\n'
+            'd2d4 d7d5 {spans\n'
+            'lines in a one-game-per-line file} c2c4\n'
+            'g1f3\n')
+    assert games(text) == [
+        (0, None, SCHOLARS_MATE, "1-0"),
+        (1, None, ["d2d4", "d7d5", "c2c4"], None),
+        (2, None, ["g1f3"], None),
+    ]
+    report = validate_game(games(text)[0])
+    assert report["result"] == "1-0" and report["plies"] == 7 and report["illegal_move"] is None
+
+
+def test_fen_tag_and_castling_tokens():
+    text = ('[FEN "r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1"]\n'
+            '0-0 {short} O-O-O+ *\n')
+    (game,) = games(text)
+    assert game == (0, "r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1", ["0-0", "O-O-O+"], "*")
+    report = validate_game(game)
+    assert report["illegal_move"] is None
+    assert report["fen"] == "2kr3r/8/8/8/8/8/8/R4RK1 w - - 2 2"
+
+
+def test_to_coordinate_move():
+    assert to_coordinate_move("O-O", "w") == "e1g1"
+    assert to_coordinate_move("0-0-0", "b") == "e8c8"
+    assert to_coordinate_move("e7e8=Q+", "w") == "e7e8q"
+    assert to_coordinate_move("h5f7#", "w") == "h5f7"
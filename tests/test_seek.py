@@ -0,0 +1,122 @@
+import random
+
+import pytest
+
+from logic.chess_logic import KEYFRAME_INTERVAL, ChessLogic
+
+BACKENDS = ["list", "bitboard"]
+PLIES = 3 * KEYFRAME_INTERVAL + 5
+
+
+def random_game(backend, seed=0):
+    # A game of random legal moves, with the FEN of every ply it went through
+    logic = ChessLogic(backend)
+    generator = random.Random(seed)
+    fens = [logic.to_fen()]
+    while len(logic.move_history) < PLIES:
+        moves = sorted(logic.legal_move_set())
+        assert moves, "the test game ended early, pick another seed"
+        logic.play_legal_move(generator.choice(moves))
+        fens.append(logic.to_fen())
+    return logic, fens
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_seek_across_keyframes(backend):
+    logic, fens = random_game(backend)
+    history = list(logic.move_history)
+    boundary = KEYFRAME_INTERVAL
+    targets = [0, PLIES, boundary - 1, boundary, boundary + 1, 2 * boundary, PLIES - 1, 1, 3 * boundary + 1,
+               2 * boundary - 1, boundary, 0]
+    for ply in targets:
+        assert logic.seek(ply)
+        assert logic.to_fen() == fens[ply], ply
+        assert logic.move_history == history[:ply]
+        assert logic.line_length == PLIES
+    assert not logic.seek(PLIES + 1)
+    assert not logic.seek(-1)
+    assert logic.to_fen() == fens[0]
+
+    while logic.line_length > len(logic.move_history):
+        logic.seek(len(logic.move_history) + 1)
+    assert logic.to_fen() == fens[PLIES]
+    while logic.undo():
+        pass
+    assert logic.to_fen() == fens[0]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_new_move_drops_redo_line(backend):
+    logic, fens = random_game(backend)
+    ply = 2 * KEYFRAME_INTERVAL + 3
+    assert logic.seek(ply)
+    assert logic.seek(ply + 1)
+    next_move = logic.last_move
+    assert logic.seek(ply)
+    other = next(move for move in sorted(logic.legal_move_set()) if move != next_move)
+    logic.play_legal_move(other)
+
+    assert logic.line_length == ply + 1
+    assert not logic.seek(ply + 2)
+
+    # Continue the new line past the next keyframe ply: seeks must not reach the old line's keyframes
+    new_fens = fens[:ply + 1] + [logic.to_fen()]
+    generator = random.Random(2)
+    while len(logic.move_history) < PLIES:
+        logic.play_legal_move(generator.choice(sorted(logic.legal_move_set())))
+        new_fens.append(logic.to_fen())
+    assert new_fens[3 * KEYFRAME_INTERVAL] != fens[3 * KEYFRAME_INTERVAL]
+    for target in [0, 3 * KEYFRAME_INTERVAL, KEYFRAME_INTERVAL - 1, ply + 1, PLIES, 2 * KEYFRAME_INTERVAL]:
+        assert logic.seek(target)
+        assert logic.to_fen() == new_fens[target], target
+        assert logic.line_length == PLIES
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_redo_survives_search_excursion(backend):
+    logic, fens = random_game(backend)
+    ply = KEYFRAME_INTERVAL + 7
+    assert logic.seek(ply)
+
+    # What a search does on the game: make and take back moves, several plies deep
+    generator = random.Random(1)
+    for _ in range(30):
+        depth = 0
+        while depth < 4 and logic.generate_legal_moves():
+            logic.make_move(generator.choice(logic.generate_legal_moves()))
+            depth += 1
+        for _ in range(depth):
+            logic.unmake_move()
+
+    assert logic.to_fen() == fens[ply]
+    assert logic.line_length == PLIES
+    assert logic.seek(PLIES)
+    assert logic.to_fen() == fens[PLIES]
+    assert logic.seek(ply - KEYFRAME_INTERVAL)
+    assert logic.to_fen() == fens[ply - KEYFRAME_INTERVAL]
+
+    # A move made and kept leaves the line, like play_move does
+    assert logic.seek(ply)
+    assert logic.seek(ply + 1)
+    next_move = logic.last_move
+    assert logic.seek(ply)
+    logic.make_move(next(move for move in sorted(logic.legal_move_set()) if move != next_move))
+    assert logic.line_length == ply + 1
+    assert not logic.seek(ply + 2)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_seek_deltas_rebuild_board(backend):
+    logic, _ = random_game(backend)
+    mirror = [list(row) for row in logic.board]
+
+    def apply(delta):
+        for row, col, piece in delta.changes:
+            mirror[row][col] = piece
+
+    logic.subscribe(apply)
+    for ply in [0, PLIES, 5, 2 * KEYFRAME_INTERVAL + 2, 2 * KEYFRAME_INTERVAL + 1, KEYFRAME_INTERVAL,
+                PLIES - 2, 1]:
+        logic.seek(ply)
+        assert mirror == [list(row) for row in logic.board], ply
+    logic.unsubscribe(apply)
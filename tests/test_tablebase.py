@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from logic.chess_logic import ChessLogic
+from logic.tablebase import DRAW, LOSS, WIN, Tablebases, generate_table, parse_material
+
+KRK_LONGEST_MATE = 31  # Plies: mate in 16 moves
+
+
+def probe(tablebases, fen):
+    return tablebases.probe(ChessLogic.from_fen(fen, "bitboard"))
+
+
+def test_probe(tablebases):
+    assert probe(tablebases, "k7/8/1K6/8/8/8/8/7R w - - 0 1") == (WIN, 1)
+    assert probe(tablebases, "k6R/8/1K6/8/8/8/8/8 b - - 0 1") == (LOSS, 0)
+    assert probe(tablebases, "k7/8/1K6/8/8/8/8/7R b - - 0 1") == (LOSS, 2)
+    assert probe(tablebases, "8/8/8/3k4/8/8/8/R3K3 b - - 0 1")[0] == LOSS
+    # Rook en prise with the defending king to move
+    assert probe(tablebases, "8/8/8/8/8/8/1kR5/4K3 b - - 0 1") == (DRAW, 0)
+    assert probe(tablebases, "8/8/8/3k4/8/8/8/B3K3 w - - 0 1") == (DRAW, 0)
+
+
+def test_probe_mirrored(tablebases):
+    # Only the orientation with the stronger side as white is stored
+    assert probe(tablebases, "K7/8/1k6/8/8/8/8/7r b - - 0 1") == (WIN, 1)
+    assert probe(tablebases, "K6r/8/1k6/8/8/8/8/8 w - - 0 1") == (LOSS, 0)
+
+
+def test_not_covered(tablebases):
+    assert probe(tablebases, "4k3/8/8/8/8/8/8/4K2R w K - 0 1") is None  # Castling rights
+    assert probe(tablebases, "4k3/8/8/8/8/8/8/3QK3 w - - 0 1") is None  # No KQK table
+    assert probe(tablebases, "4k3/8/8/8/8/8/8/R3K2R w - - 0 1") is None  # No KRRK table
+    assert probe(tablebases, "4k3/8/8/8/8/8/8/4K3 w - - 0 1") == (DRAW, 0)  # Bare kings
+
+
+def test_parse_material():
+    assert parse_material("KRK") == ("KR", "K", False)
+    assert parse_material("KKQ") == ("KQ", "K", True)
+    assert parse_material("KPKR") == ("KR", "KP", True)
+    for material in ("KPKP", "KKRQQ", "KRR", "RKK", "KXK"):
+        with pytest.raises(ValueError):
+            parse_material(material)
+
+
+def test_pawns_on_both_sides_rejected(tablebases):
+    with pytest.raises(ValueError):
+        generate_table("KPKP", Tablebases())
+    # Not covered, rather than an error, when such a position is probed
+    assert probe(tablebases, "4k3/4p3/8/8/8/8/4P3/4K3 w - - 0 1") is None
+
+
+def test_longest_mate(tablebases):
+    assert max(tablebases.table("KRK").values[0]) == KRK_LONGEST_MATE
+
+
+def test_best_move_keeps_distance(tablebases):
+    generator = random.Random(0)
+    checked = 0
+    while checked < 25:
+        squares = generator.sample(range(64), 3)
+        fen_rows = [["1"] * 8 for _ in range(8)]
+        for piece, square in zip("KRk", squares):
+            fen_rows[square >> 3][square & 7] = piece
+        placement = "/".join("".join(row) for row in fen_rows)
+        logic = ChessLogic.from_fen(f"{placement} {generator.choice('wb')} - - 0 1", "bitboard")
+        if logic.is_king_in_check("b" if logic.turn == "w" else "w") or not logic.generate_legal_moves():
+            continue  # Unreachable, or the game is over
+        result = tablebases.probe(logic)
+        hit = tablebases.best_move(logic)
+        assert result is not None and hit is not None
+        wdl, plies = result
+        move, value = hit
+        # The chosen move must realise the probed result exactly one ply later
+        logic.make_move(move)
+        child = tablebases.probe(logic)
+        if wdl == WIN:
+            assert value == plies and child == (LOSS, plies - 1)
+        elif wdl == LOSS:
+            assert child == (WIN, plies - 1)
+        else:
+            assert child == (DRAW, 0)
+        checked += 1
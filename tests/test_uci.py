@@ -0,0 +1,68 @@
+import io
+import time
+
+from uci import UCIEngine, think_time
+
+CLOCKS = {"wtime": 20000, "btime": 20000}
+
+
+class Output(io.StringIO):
+    def lines(self):
+        return self.getvalue().splitlines()
+
+    def bestmoves(self):
+        return [line for line in self.lines() if line.startswith("bestmove")]
+
+
+def wait_for_bestmove(output, timeout):
+    deadline = time.perf_counter() + timeout
+    while not output.bestmoves():
+        if time.perf_counter() >= deadline:
+            return False
+        time.sleep(0.005)
+    return True
+
+
+def test_ponderhit_answers_within_budget():
+    output = Output()
+    engine = UCIEngine(output)
+    try:
+        engine.handle("position startpos moves e2e4")
+        engine.handle(f"go ponder wtime {CLOCKS['wtime']} btime {CLOCKS['btime']}")
+        budget = think_time(CLOCKS, "b")
+        time.sleep(budget + 0.5)
+        assert output.bestmoves() == []  # Pondering never answers on its own
+
+        start = time.perf_counter()
+        engine.handle("ponderhit")
+        assert wait_for_bestmove(output, budget + 2.0)
+        assert time.perf_counter() - start < budget + 2.0
+        assert output.bestmoves()[0].split()[1] in {
+            engine.logic.move_to_notation(move) for move in engine.logic.generate_legal_moves()}
+    finally:
+        engine.stop()
+    assert len(output.bestmoves()) == 1
+
+
+def test_ponderhit_right_after_go():
+    # The ponderhit may arrive before the search thread has started its first iteration
+    output = Output()
+    engine = UCIEngine(output)
+    try:
+        engine.handle("position startpos")
+        engine.handle(f"go ponder wtime {CLOCKS['wtime']} btime {CLOCKS['btime']}")
+        engine.handle("ponderhit")
+        assert wait_for_bestmove(output, think_time(CLOCKS, "w") + 2.0)
+    finally:
+        engine.stop()
+    assert len(output.bestmoves()) == 1
+
+
+def test_stop_ends_ponder_search():
+    output = Output()
+    engine = UCIEngine(output)
+    engine.handle("position startpos")
+    engine.handle("go ponder wtime 3000 btime 3000")
+    time.sleep(0.1)
+    engine.handle("stop")
+    assert len(output.bestmoves()) == 1
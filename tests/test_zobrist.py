@@ -0,0 +1,94 @@
+import random
+
+import pytest
+
+from logic.chess_logic import ChessLogic
+from logic.zobrist import hash_position
+from perft import REFERENCE_POSITIONS
+
+BACKENDS = ["list", "bitboard"]
+FENS = [fen for fen, _ in REFERENCE_POSITIONS.values()]
+
+
+def scratch_key(logic):
+    return hash_position(logic.position, logic.turn, logic.castling_rights, logic.last_pawn_move)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("fen", FENS)
+def test_incremental_key_matches_scratch(fen, backend):
+    logic = ChessLogic.from_fen(fen, backend)
+    root = logic.zobrist_key
+    assert root == scratch_key(logic)
+    # Every move two plies deep: captures, promotions, castling, en passant and lost castling rights
+    for move in logic.generate_legal_moves():
+        logic.make_move(move)
+        assert logic.zobrist_key == scratch_key(logic), move
+        key = logic.zobrist_key
+        for reply in logic.generate_legal_moves():
+            logic.make_move(reply)
+            assert logic.zobrist_key == scratch_key(logic), (move, reply)
+            logic.unmake_move()
+            assert logic.zobrist_key == key
+        logic.unmake_move()
+        assert logic.zobrist_key == root
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_key_along_a_game(backend):
+    logic = ChessLogic(backend)
+    generator = random.Random(3)
+    keys = [logic.zobrist_key]
+    while logic.result == "" and len(keys) < 120:
+        logic.play_legal_move(generator.choice(sorted(logic.legal_move_set())))
+        assert logic.zobrist_key == scratch_key(logic)
+        assert logic.zobrist_key == ChessLogic.from_fen(logic.to_fen(), backend).zobrist_key
+        keys.append(logic.zobrist_key)
+    assert logic.hash_history == keys
+    while logic.move_history:
+        logic.unmake_move()
+        keys.pop()
+        assert logic.zobrist_key == keys[-1]
+
+
+def test_unusable_en_passant_square_is_not_hashed():
+    # After e2e4 no black pawn can take en passant, so the key is that of the same position without e3
+    logic = ChessLogic("bitboard")
+    logic.play_move("e2e4")
+    without = ChessLogic.from_fen(logic.to_fen().replace(" e3 ", " - "), "bitboard")
+    assert logic.zobrist_key == without.zobrist_key
+    # With a pawn that can take, the square counts
+    usable = ChessLogic.from_fen("rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq f6 0 3", "bitboard")
+    unusable = ChessLogic.from_fen("rnbqkbnr/ppp1p1pp/8/3pPp2/8/8/PPPP1PPP/RNBQKBNR w KQkq - 0 3", "bitboard")
+    assert usable.zobrist_key != unusable.zobrist_key
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_threefold_repetition(backend):
+    logic = ChessLogic(backend)
+    shuffle = ["g1f3", "g8f6", "f3g1", "f6g8"]
+    for move in shuffle:
+        assert logic.play_move(move) != ""
+    assert logic.repetition_count() == 2
+    assert logic.result == ""
+    for move in shuffle[:3]:
+        logic.play_move(move)
+    assert logic.result == ""
+    logic.play_move(shuffle[3])  # The starting position, for the third time
+    assert logic.repetition_count() == 3
+    assert logic.is_threefold_repetition()
+    assert logic.result == "d"
+    assert logic.play_move("e2e4") == ""  # The game is over
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_lost_castling_rights_break_repetition(backend):
+    # The kings walk back to where they were, but without their castling rights it is another position
+    logic = ChessLogic.from_fen("r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1", backend)
+    for move in ["e1e2", "e8e7", "e2e1", "e7e8"]:
+        logic.play_move(move)
+    assert logic.repetition_count() == 1
+    for move in ["e1e2", "e8e7", "e2e1", "e7e8"] * 2:
+        logic.play_move(move)
+    assert logic.repetition_count() == 3
+    assert logic.result == "d"